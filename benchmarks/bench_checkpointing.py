@@ -0,0 +1,130 @@
+"""
+Benchmark: per-epoch checkpointing cost and exact resume (training/checkpoint.py).
+
+  none:  the notebook loop without checkpoints
+  sync:  training_state written with torch.save at the end of every epoch
+  async: the same snapshots handed to AsyncCheckpointer (written by a background thread)
+
+Then checks exact resume: a run interrupted after --stop-after epochs and resumed from its
+checkpoint with a fresh model / optimizer / loaders must end with the same weights, history
+and early-stopping state as the uninterrupted run (compared bitwise).
+
+    python benchmarks/bench_checkpointing.py --matches 100 --epochs 4 --hidden-dim 512
+"""
+from __future__ import annotations
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT / "src"))
+sys.path.append(str(ROOT / "benchmarks"))
+
+import numpy as np
+import torch
+
+from config import Config
+from data.labeling import add_future_labels
+from data.preprocessing import FEATURE_COLS, basic_clean, build_features
+from data.split import order_by_match
+from models.pvnet import PVNet
+from synthetic import make_matches
+from training.checkpoint import AsyncCheckpointer, data_fingerprint, resume_or_start, run_signature, training_state
+from training.train_loop import eval_one_epoch, make_loader, train_one_epoch
+from training.utils import fit_scaler, set_seed
+
+def run(cfg: Config, data: dict, epochs: int, mode: str = "none", path: Path | None = None,
+        stop_after: int | None = None) -> dict:
+    """
+    The notebook loop for `epochs` epochs (or until stop_after), resuming from path if it exists.
+    """
+    X, y_shot, y_goal, train_rows, val_rows, scaler = (data[k] for k in
+                                                       ("X", "y_shot", "y_goal", "train", "val", "scaler"))
+    set_seed(cfg.RANDOM_SEED)
+    train_loader = make_loader(X, y_shot, y_goal, batch_size=cfg.BATCH_SIZE, rows=train_rows, scaler=scaler)
+    val_loader = make_loader(X, y_shot, y_goal, batch_size=cfg.BATCH_SIZE, shuffle=False, rows=val_rows, scaler=scaler)
+    model = PVNet(in_dim=X.shape[1], hidden_dim=cfg.HIDDEN_DIM, dropout=cfg.DROPOUT)
+    criterion = torch.nn.BCEWithLogitsLoss()
+    optimizer = torch.optim.AdamW(model.parameters(), lr=cfg.LR, weight_decay=cfg.WEIGHT_DECAY)
+
+    signature = run_signature(cfg, in_dim=X.shape[1], data=data_fingerprint(X, y_shot, y_goal, train_rows))
+    state = resume_or_start(path, model, optimizer, signature=signature, resume=path is not None)
+    best_val, best_state, pat, history = state["best_val"], state["best_state"], state["pat"], state["history"]
+    checkpointer = AsyncCheckpointer(path) if mode == "async" else None
+    seconds, save_seconds = [], []
+    for epoch in range(state["epoch"] + 1, epochs + 1):
+        if state["stopped"] or (stop_after is not None and epoch > stop_after):
+            break
+        t0 = time.perf_counter()
+        tr_loss = train_one_epoch(model, train_loader, optimizer, criterion, "cpu")
+        va_loss, _, _ = eval_one_epoch(model, val_loader, criterion, "cpu")
+        history.append({"epoch": epoch, "train_loss": tr_loss, "val_loss": va_loss})
+        if va_loss < best_val - 1e-5:
+            best_val, pat = va_loss, 0
+            best_state = {k: v.detach().cpu().clone() for k, v in model.state_dict().items()}
+        else:
+            pat += 1
+        stopped = pat >= cfg.EARLY_STOPPING_PATIENCE
+
+        t1 = time.perf_counter()
+        if mode != "none":
+            snapshot = training_state(model, optimizer, epoch, best_val, best_state, pat, history,
+                                      stopped=stopped, signature=signature)
+            if checkpointer is not None:
+                checkpointer.save(snapshot)
+            else:
+                torch.save(snapshot, path)
+        save_seconds.append(time.perf_counter() - t1)
+        seconds.append(time.perf_counter() - t0)
+        if stopped:
+            break
+    if checkpointer is not None:
+        checkpointer.close()
+    return {"model": model, "history": history, "best_val": best_val, "pat": pat,
+            "seconds": seconds, "save_seconds": save_seconds}
+
+def same_run(a: dict, b: dict) -> bool:
+    sa, sb = a["model"].state_dict(), b["model"].state_dict()
+    return (all(torch.equal(sa[k], sb[k]) for k in sa) and a["history"] == b["history"]
+            and a["best_val"] == b["best_val"] and a["pat"] == b["pat"])
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--matches", type=int, default=100)
+    ap.add_argument("--epochs", type=int, default=4)
+    ap.add_argument("--stop-after", type=int, default=2, help="epochs before the simulated interruption")
+    ap.add_argument("--batch-size", type=int, default=4096)
+    ap.add_argument("--hidden-dim", type=int, default=512, help="larger models make the checkpoint cost visible")
+    args = ap.parse_args()
+
+    df = add_future_labels(build_features(basic_clean(make_matches(args.matches), copy=False), copy=False))
+    df, index = order_by_match(df)
+    X = df[FEATURE_COLS].to_numpy(dtype=np.float32)
+    train_rows, val_rows, _ = index.split()
+    data = {"X": X, "y_shot": df["shot_within_k"].to_numpy(dtype=np.float32),
+            "y_goal": df["goal_within_k"].to_numpy(dtype=np.float32),
+            "train": train_rows, "val": val_rows, "scaler": fit_scaler(X, train_rows)}
+    cfg = Config(BATCH_SIZE=args.batch_size, HIDDEN_DIM=args.hidden_dim, EARLY_STOPPING_PATIENCE=args.epochs)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base = None
+        for mode in ("none", "sync", "async"):
+            path = Path(tmp) / f"{mode}.pt"
+            r = run(cfg, data, args.epochs, mode=mode, path=path if mode != "none" else None)
+            epoch_s = float(np.median(r["seconds"]))
+            base = base or epoch_s
+            size = f"{path.stat().st_size / 2**20:6.1f} MiB" if path.exists() else "      -   "
+            print(f"{mode:<5s} epoch {epoch_s:6.3f}s ({epoch_s / base:.2f}x) | "
+                  f"in-loop checkpoint {np.median(r['save_seconds']) * 1e3:7.1f} ms | {size}")
+
+        full = run(cfg, data, args.epochs)
+        path = Path(tmp) / "resume.pt"
+        run(cfg, data, args.epochs, mode="async", path=path, stop_after=args.stop_after)
+        resumed = run(cfg, data, args.epochs, mode="async", path=path)
+        print(f"resume after epoch {args.stop_after} of {args.epochs}: "
+              f"bitwise equal to the uninterrupted run = {same_run(full, resumed)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark: default vs compact-schema pipeline (basic_clean -> build_features -> add_future_labels).
+
+Prints time per mode, the per-column memory comparison (data/memory.py) and the
+model-input check (float32 tolerance, identical labels).
+
+    python benchmarks/bench_compact_schema.py --matches 100
+"""
+from __future__ import annotations
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT / "src"))
+sys.path.append(str(ROOT / "benchmarks"))
+
+import pandas as pd
+
+from data.labeling import add_future_labels
+from data.memory import check_model_inputs, compare_memory
+from data.preprocessing import basic_clean, build_features
+from synthetic import make_matches
+
+def pipeline(events: pd.DataFrame, compact: bool) -> pd.DataFrame:
+    df = basic_clean(events, compact=compact)
+    df = build_features(df, copy=False, compact=compact)
+    return add_future_labels(df, compact=compact)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--matches", type=int, default=100)
+    ap.add_argument("--rows", type=int, default=15, help="columns shown in the memory table")
+    args = ap.parse_args()
+
+    events = make_matches(args.matches)
+    frames, seconds = {}, {}
+    for compact in (False, True):
+        t0 = time.perf_counter()
+        frames[compact] = pipeline(events, compact)
+        seconds[compact] = time.perf_counter() - t0
+
+    derived = [c for c in frames[True].columns if c not in events.columns]
+    report = compare_memory(frames[False], frames[True])
+    derived_report = compare_memory(frames[False][derived], frames[True][derived])
+    check = check_model_inputs(frames[False], frames[True])
+
+    print(f"{len(events):,d} events: default {seconds[False]:.2f}s, compact {seconds[True]:.2f}s")
+    with pd.option_context("display.width", 140, "display.max_columns", 10):
+        print(report.head(args.rows + 1))
+    print(f"whole frame:     {report.loc['TOTAL', 'mib_reference']:.1f} -> {report.loc['TOTAL', 'mib_compact']:.1f} MiB")
+    print(f"derived columns: {derived_report.loc['TOTAL', 'mib_reference']:.1f} -> "
+          f"{derived_report.loc['TOTAL', 'mib_compact']:.1f} MiB ({derived_report.loc['TOTAL', 'ratio']:.1f}x)")
+    print(f"model inputs: max |diff| {check['max_abs_diff']:.2e} ({check['worst_feature']}), labels identical")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark: dashboard reads of one (team, match) from a predictions file.
+
+  full:     pd.read_parquet(file) + boolean filter (previous load_parquet path)
+  pushdown: read_parquet_filtered with team/match filters + column projection
+            on the file written by write_sorted_parquet
+
+    python benchmarks/bench_dashboard_io.py --matches 380
+"""
+from __future__ import annotations
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT / "src"))
+sys.path.append(str(ROOT / "benchmarks"))
+sys.path.append(str(ROOT / "dashboard"))
+
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import torch
+from sklearn.preprocessing import StandardScaler
+
+from data.preprocessing import FEATURE_COLS
+from data.streaming import process_match
+from inference.aggregates import write_sorted_parquet
+from inference.predict import score_frame
+from models.pvnet import PVNet
+from synthetic import make_matches
+from utils.query import filter_expression, read_parquet_filtered
+
+PAGE_COLS = ("player_name", "type_name", "minute", "second", "start_x", "start_y", "end_x", "end_y", "action_value_dashboard")
+
+def make_predictions(n_matches: int, seed: int = 0):
+    df = process_match(make_matches(n_matches, seed=seed))
+    scaler = StandardScaler().fit(df[FEATURE_COLS].astype(float).values)
+    torch.manual_seed(seed)
+    return score_frame(df, PVNet(in_dim=len(FEATURE_COLS)).eval(), scaler)
+
+def row_groups_touched(path: Path, filters) -> tuple[int, int]:
+    fragment = next(ds.dataset(path, format="parquet").get_fragments())
+    return len(fragment.split_by_row_group(filter_expression(filters))), pq.ParquetFile(path).metadata.num_row_groups
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--matches", type=int, default=380)
+    ap.add_argument("--queries", type=int, default=20)
+    ap.add_argument("--row-group-size", type=int, default=65536)
+    args = ap.parse_args()
+
+    preds = make_predictions(args.matches)
+    pairs = preds[["team_name", "match_id"]].drop_duplicates().to_numpy().tolist()
+    rng = np.random.default_rng(0)
+    picks = [pairs[i] for i in rng.choice(len(pairs), size=min(args.queries, len(pairs)), replace=False)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        plain = Path(tmp) / "plain.parquet"
+        sorted_path = Path(tmp) / "sorted.parquet"
+        preds.to_parquet(plain, index=False)
+        write_sorted_parquet(preds, sorted_path, row_group_size=args.row_group_size)
+
+        t0 = time.perf_counter()
+        full = pd.read_parquet(plain)
+        t_load = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for team, mid in picks:
+            full[(full["team_name"] == team) & (full["match_id"] == mid)].copy()
+        t_filter = (time.perf_counter() - t0) / len(picks)
+        full_mb = full.memory_usage(deep=True).sum() / 2**20
+
+        t0 = time.perf_counter()
+        sizes = []
+        for team, mid in picks:
+            sel = read_parquet_filtered(sorted_path, PAGE_COLS, (("team_name", "==", team), ("match_id", "==", int(mid))))
+            sizes.append(sel.memory_usage(deep=True).sum() / 2**20)
+        t_query = (time.perf_counter() - t0) / len(picks)
+        touched, total = row_groups_touched(sorted_path, (("team_name", "==", picks[0][0]), ("match_id", "==", int(picks[0][1]))))
+
+    print(f"{len(preds):,d} events, {len(pairs)} (team, match) pairs")
+    print(f"full:     first load {t_load:.3f}s, then {t_filter * 1e3:.1f} ms/selection, {full_mb:.1f} MiB held")
+    print(f"pushdown: {t_query * 1e3:.1f} ms/selection (no first load), {np.mean(sizes):.2f} MiB per selection, "
+          f"{touched}/{total} row groups read")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Microbenchmark: decode_xy vs series.apply(extract_xy) + zip for location columns.
+
+    python benchmarks/bench_decode_xy.py --sizes 100000 1000000
+"""
+from __future__ import annotations
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT / "src"))
+sys.path.append(str(ROOT / "benchmarks"))
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from data.preprocessing import decode_xy, extract_xy
+from synthetic import make_events
+
+def apply_extract_xy(series):
+    x, y = zip(*series.apply(extract_xy))
+    return np.asarray(x), np.asarray(y)
+
+def _best_of(fn, arg, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        res = fn(arg)
+        best = min(best, time.perf_counter() - t0)
+    return res, best
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = ap.parse_args()
+
+    for n in args.sizes:
+        loc = make_events(n, seed=n)["location"]
+        (rx, ry), t_ref = _best_of(apply_extract_xy, loc)
+
+        inputs = {
+            "object lists": loc,
+            "arrow list": pa.array(loc, from_pandas=True),
+            "split columns": (pd.Series(rx), pd.Series(ry)),
+        }
+        line = f"n={n:>10,d} | apply(extract_xy)={t_ref:7.3f}s"
+        for name, values in inputs.items():
+            (x, y), t = _best_of(lambda v: decode_xy(v, dtype=np.float64), values)
+            assert np.array_equal(x, rx, equal_nan=True) and np.array_equal(y, ry, equal_nan=True)
+            line += f" | {name}={t:7.4f}s ({t_ref / max(t, 1e-9):6.1f}x)"
+        print(line, flush=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark: fast CPU training mode (Config.TRAIN_BF16 / TRAIN_COMPILE / TORCH_THREADS) vs fp32 eager.
+
+Each mode trains PVNet with the same seed and data (synthetic matches, MatchIndex split),
+reports epoch throughput (first epoch, which includes compilation, reported apart) and
+checks that validation metrics stay within --atol of the baseline (check_metrics_close).
+
+    python benchmarks/bench_fast_training.py --matches 100 --epochs 4 --threads 0
+"""
+from __future__ import annotations
+import argparse
+import dataclasses
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT / "src"))
+sys.path.append(str(ROOT / "benchmarks"))
+
+import numpy as np
+import torch
+
+from config import Config
+from data.labeling import add_future_labels
+from data.preprocessing import FEATURE_COLS, basic_clean, build_features
+from data.split import order_by_match
+from models.losses import WeightedMultiTaskBCE
+from models.pvnet import PVNet
+from synthetic import make_matches
+from training.evaluate import check_metrics_close, compute_metrics
+from training.train_loop import eval_one_epoch, make_loader, train_one_epoch
+from training.utils import fast_training, fit_scaler, set_seed
+
+MODES = {
+    "fp32 eager": {},
+    "bf16 autocast": {"TRAIN_BF16": True},
+    "compile": {"TRAIN_COMPILE": True},
+    "bf16 + compile": {"TRAIN_BF16": True, "TRAIN_COMPILE": True},
+}
+
+def train(cfg: Config, X, y_shot, y_goal, train_rows, val_rows, scaler, epochs: int) -> dict:
+    set_seed(cfg.RANDOM_SEED)
+    device = torch.device("cpu")
+    train_loader = make_loader(X, y_shot, y_goal, batch_size=cfg.BATCH_SIZE, rows=train_rows, scaler=scaler)
+    val_loader = make_loader(X, y_shot, y_goal, batch_size=cfg.BATCH_SIZE, shuffle=False, rows=val_rows, scaler=scaler)
+
+    pos_shot, pos_goal = y_shot[train_rows].mean(), y_goal[train_rows].mean()
+    model = PVNet(in_dim=X.shape[1], hidden_dim=cfg.HIDDEN_DIM, dropout=cfg.DROPOUT)
+    criterion = WeightedMultiTaskBCE((1 - pos_shot) / pos_shot, (1 - pos_goal) / pos_goal)
+    optimizer = torch.optim.AdamW(model.parameters(), lr=cfg.LR, weight_decay=cfg.WEIGHT_DECAY)
+    train_model, train_criterion = fast_training(model, criterion, cfg)
+
+    seconds = []
+    for _ in range(epochs):
+        t0 = time.perf_counter()
+        train_one_epoch(train_model, train_loader, optimizer, train_criterion, device, autocast=cfg.TRAIN_BF16)
+        seconds.append(time.perf_counter() - t0)
+
+    # metrics from the trained weights, evaluated the same way for every mode
+    _, logits, y = eval_one_epoch(model, val_loader, criterion, device)
+    metrics, _ = compute_metrics(logits, y)
+    return {"first": seconds[0], "steady": float(np.median(seconds[1:])) if epochs > 1 else seconds[0], "metrics": metrics}
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--matches", type=int, default=100)
+    ap.add_argument("--epochs", type=int, default=4)
+    ap.add_argument("--batch-size", type=int, default=4096)
+    ap.add_argument("--threads", type=int, default=0, help="Config.TORCH_THREADS (0 = PyTorch default)")
+    ap.add_argument("--atol", type=float, default=0.01, help="max |diff| of any validation metric vs fp32 eager")
+    ap.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES))
+    args = ap.parse_args()
+
+    df = add_future_labels(build_features(basic_clean(make_matches(args.matches), copy=False), copy=False))
+    df, index = order_by_match(df)
+    X = df[FEATURE_COLS].to_numpy(dtype=np.float32)
+    y_shot = df["shot_within_k"].to_numpy(dtype=np.float32)
+    y_goal = df["goal_within_k"].to_numpy(dtype=np.float32)
+    train_rows, val_rows, _ = index.split()
+    scaler = fit_scaler(X, train_rows)
+
+    base_cfg = Config(BATCH_SIZE=args.batch_size, TORCH_THREADS=args.threads)
+    print(f"{len(train_rows):,d} train / {len(val_rows):,d} val events, {torch.get_num_threads()} threads, "
+          f"{args.epochs} epochs")
+
+    baseline = None
+    for name in ["fp32 eager"] + [m for m in args.modes if m != "fp32 eager"]:
+        cfg = dataclasses.replace(base_cfg, **MODES[name])
+        r = train(cfg, X, y_shot, y_goal, train_rows, val_rows, scaler, args.epochs)
+        rate = len(train_rows) / r["steady"]
+        if baseline is None:
+            baseline = r | {"rate": rate}
+            check = "reference"
+        else:
+            try:
+                diffs = check_metrics_close(baseline["metrics"], r["metrics"], atol=args.atol)
+                worst = max(diffs, key=diffs.get)
+                check = f"metrics ok (max |diff| {diffs[worst]:.4f} {worst})"
+            except ValueError as e:
+                check = f"FAILED: {e}"
+        auc = r["metrics"]["shot"]["roc_auc"]
+        print(f"{name:<15s} first epoch {r['first']:6.2f}s | steady {r['steady']:6.2f}s "
+              f"{rate / 1e3:8.1f}k events/s ({rate / baseline['rate']:.2f}x) | shot AUC {auc:.4f} | {check}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark: shot freeze frames as an object column vs the memory-mapped store (data/freeze_frames.py).
+
+  object: shot_freeze_frame lists of player dicts kept in the events frame, context
+          features computed per shot in Python
+  store:  FreezeFrameBuilder per match -> write -> FreezeFrameStore.open (mmap) ->
+          freeze_frame_features on the shots
+
+    python benchmarks/bench_freeze_frames.py --matches 100
+"""
+from __future__ import annotations
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT / "src"))
+sys.path.append(str(ROOT / "benchmarks"))
+
+import numpy as np
+import pandas as pd
+
+from data.freeze_frames import FreezeFrameBuilder, FreezeFrameStore, freeze_frame_features
+from data.preprocessing import basic_clean, build_features
+from synthetic import make_matches
+
+POSITIONS = ["Goalkeeper", "Right Back", "Right Center Back", "Left Center Back", "Left Back",
+             "Right Center Midfield", "Left Center Midfield", "Right Wing", "Left Wing", "Center Forward"]
+
+def add_freeze_frames(events: pd.DataFrame, seed: int = 0) -> pd.DataFrame:
+    """
+    StatsBomb-like ids and shot_freeze_frame lists (8-20 players around the shot, the
+    opposing keeper near the goal line) on the Shot events.
+    """
+    rng = np.random.default_rng(seed)
+    out = events.copy()
+    out["id"] = [f"{i:08x}-0000-4000-8000-{rng.integers(1 << 47):012x}" for i in range(len(out))]
+    frames = np.full(len(out), None, dtype=object)
+    for i in np.flatnonzero(out["type"].to_numpy() == "Shot"):
+        sx, sy = out["location"].iat[i] or (110.0, 40.0)
+        k = int(rng.integers(8, 21))
+        px = np.clip(sx + rng.normal(5, 8, size=k), 60, 120).round(1)
+        py = np.clip(sy + rng.normal(0, 10, size=k), 0, 80).round(1)
+        px[0], py[0] = 118.5, 40.0 + rng.normal(0, 1)
+        frames[i] = [
+            {"location": [float(px[j]), float(py[j])],
+             "player": {"id": int(j), "name": f"Player {j}"},
+             "position": {"id": int(j % 10), "name": POSITIONS[0 if j == 0 else 1 + j % 9]},
+             "teammate": bool(j > 0 and j % 2 == 0)}
+            for j in range(k)
+        ]
+    out["shot_freeze_frame"] = frames
+    return out
+
+def object_features(shots: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reference: nearest opponent and opponents per shot from the object column.
+    """
+    nearest, opponents = [], []
+    for (sx, sy), frame in zip(zip(shots["start_x"], shots["start_y"]), shots["shot_freeze_frame"]):
+        opp = [p["location"] for p in frame or [] if not p["teammate"]]
+        opponents.append(len(opp))
+        nearest.append(min((float(np.hypot(x - sx, y - sy)) for x, y in opp), default=np.nan))
+    return pd.DataFrame({"ff_nearest_opponent": nearest, "ff_opponents": opponents}, index=shots.index)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--matches", type=int, default=100)
+    args = ap.parse_args()
+
+    events = add_freeze_frames(make_matches(args.matches))
+    df = build_features(basic_clean(events, copy=False), copy=False)
+    col_mib = df["shot_freeze_frame"].memory_usage(index=False, deep=True) / 2**20
+
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        builder = FreezeFrameBuilder()
+        for _, g in events.groupby("match_id", sort=False):
+            builder.add(g)
+        builder.write(Path(tmp) / "freeze_frames")
+        t_build = time.perf_counter() - t0
+        disk_mib = sum(p.stat().st_size for p in (Path(tmp) / "freeze_frames").iterdir()) / 2**20
+
+        shots = df.loc[df["type_name"] == "Shot"].drop(columns="shot_freeze_frame")
+        t0 = time.perf_counter()
+        store = FreezeFrameStore.open(Path(tmp) / "freeze_frames")
+        feats = freeze_frame_features(store, shots)
+        t_store = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        ref = object_features(df.loc[df["type_name"] == "Shot"])
+        t_object = time.perf_counter() - t0
+
+        err = np.nanmax(np.abs(feats["ff_nearest_opponent"].to_numpy() - ref["ff_nearest_opponent"].to_numpy()))
+        same_counts = np.array_equal(feats["ff_opponents"].to_numpy(), ref["ff_opponents"].to_numpy())
+
+        print(f"{len(events):,d} events, {len(store):,d} shots with frames, {store.n_players:,d} players")
+        print(f"object column: {col_mib:8.1f} MiB in the frame (pandas deep size: lists only, player dicts not counted)")
+        print(f"store:         {disk_mib:8.1f} MiB on disk (memory-mapped), built in {t_build:.2f}s")
+        print(f"shot context:  object {t_object * 1e3:.1f} ms | store {t_store * 1e3:.1f} ms "
+              f"({t_object / t_store:.1f}x); nearest opponent max |diff| {err:.1e}, opponent counts equal={same_counts}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark: CPU scoring latency/throughput of the PVNet backends at batch sizes 1, 64, 65536,
+with a parity check of p_shot/p_goal against the eager model + sklearn scaler.
+
+    python benchmarks/bench_inference_backends.py --artifacts artifacts
+"""
+from __future__ import annotations
+import argparse
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT / "src"))
+sys.path.append(str(ROOT / "benchmarks"))
+
+import joblib
+import numpy as np
+import torch
+
+from data.preprocessing import FEATURE_COLS, basic_clean, build_features
+from inference.export import (
+    SCORER_ONNX, SCORER_TS, export_onnx, export_torchscript, fold_scaler, parity, quantize_int8,
+)
+from inference.predict import load_model
+from synthetic import make_events
+
+def _latency(fn, x, min_seconds: float, min_calls: int = 5) -> np.ndarray:
+    fn(x)  # warm-up
+    times = []
+    t_end = time.perf_counter() + min_seconds
+    while len(times) < min_calls or time.perf_counter() < t_end:
+        t0 = time.perf_counter()
+        fn(x)
+        times.append(time.perf_counter() - t0)
+    return np.array(times)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--artifacts", default=str(ROOT / "artifacts"))
+    ap.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 64, 65536])
+    ap.add_argument("--seconds", type=float, default=1.0, help="timing budget per backend and batch size")
+    args = ap.parse_args()
+    warnings.filterwarnings("ignore")
+
+    artifacts = Path(args.artifacts)
+    model, meta = load_model(artifacts / "model.pth")
+    scaler = joblib.load(artifacts / "scaler.joblib")
+    in_dim = meta["in_dim"]
+
+    feats = build_features(basic_clean(make_events(max(args.batch_sizes), seed=0)))
+    X = feats[meta.get("feature_cols", FEATURE_COLS)].astype(float).values
+
+    def eager(x):
+        with torch.no_grad():
+            xb = torch.as_tensor(scaler.transform(x), dtype=torch.float32)
+            return torch.sigmoid(model(xb)).numpy()
+
+    scorer = fold_scaler(model, scaler)
+    tmp = Path(tempfile.mkdtemp())
+    ts = torch.jit.load(str(export_torchscript(scorer, tmp / SCORER_TS, in_dim)))
+    int8 = torch.jit.load(str(export_torchscript(quantize_int8(model, scaler), tmp / "int8.pt", in_dim)))
+
+    def torch_backend(m):
+        def run(x):
+            with torch.no_grad():
+                return m(torch.as_tensor(x, dtype=torch.float32)).numpy()
+        return run
+
+    backends = {
+        "eager+scaler": eager,
+        "folded eager": torch_backend(scorer),
+        "torchscript": torch_backend(ts),
+        "torchscript int8": torch_backend(int8),
+    }
+    try:
+        import onnxruntime as ort
+        sess = ort.InferenceSession(str(export_onnx(scorer, tmp / SCORER_ONNX, in_dim)), providers=["CPUExecutionProvider"])
+        backends["onnxruntime"] = lambda x: sess.run(None, {"features": x.astype(np.float32)})[0]
+    except ImportError:
+        print("onnxruntime not installed: skipping ONNX backend")
+
+    reference = eager(X)
+    print(f"torch threads={torch.get_num_threads()}")
+    for name, fn in backends.items():
+        p = parity(reference, fn(X))
+        print(f"{name:18s} parity: max|dp_shot|={p['p_shot_max_abs']:.2e} max|dp_goal|={p['p_goal_max_abs']:.2e}")
+
+    for bs in args.batch_sizes:
+        x = X[:bs]
+        for name, fn in backends.items():
+            t = _latency(fn, x, args.seconds)
+            med = float(np.median(t))
+            print(
+                f"batch={bs:>6d} | {name:18s} | p50={med * 1e3:9.3f}ms p99={np.quantile(t, 0.99) * 1e3:9.3f}ms"
+                f" | {bs / med:14,.0f} events/s",
+                flush=True,
+            )
+
+if __name__ == "__main__":
+    main()
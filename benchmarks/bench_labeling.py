@@ -0,0 +1,52 @@
+"""
+Benchmark: vectorized add_future_labels vs the per-group loop reference.
+
+    python benchmarks/bench_labeling.py --sizes 1000000 10000000
+"""
+from __future__ import annotations
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT / "src"))
+sys.path.append(str(ROOT / "benchmarks"))
+
+import pandas as pd
+
+from data.labeling import add_future_labels, add_future_labels_loop
+from synthetic import make_events
+
+LABEL_COLS = ["is_shot_event", "is_goal_event", "shot_within_k", "goal_within_k"]
+
+def _timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    res = fn(*args, **kwargs)
+    return res, time.perf_counter() - t0
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--reference-max", type=int, default=10_000_000,
+                    help="skip the loop reference above this many events")
+    args = ap.parse_args()
+
+    for n in args.sizes:
+        df = make_events(n, seed=n, with_locations=False)
+        df["type_name"] = df["type"].astype(str)
+
+        fast, t_fast = _timed(add_future_labels, df, k=args.k)
+        line = f"n={n:>10,d} | vectorized={t_fast:8.3f}s"
+
+        if n <= args.reference_max:
+            ref, t_ref = _timed(add_future_labels_loop, df, k=args.k)
+            pd.testing.assert_frame_equal(fast[LABEL_COLS], ref[LABEL_COLS], check_exact=True)
+            line += f" | loop={t_ref:8.3f}s | speedup={t_ref / max(t_fast, 1e-9):7.1f}x | identical=True"
+        else:
+            line += " | loop=skipped"
+        print(line, flush=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Load test: replay synthetic matches through the asyncio live scoring service and report
+end-to-end latency (arrival -> action value emitted).
+
+    python benchmarks/bench_live.py --matches 8 --rate 500
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT / "src"))
+sys.path.append(str(ROOT / "benchmarks"))
+
+import torch
+
+from inference.live import LiveScorer, LiveScoringService, latency_summary, replay_file
+from synthetic import EVENTS_PER_MATCH, make_events
+
+def write_feeds(n_matches: int, folder: Path) -> list[Path]:
+    events = make_events(n_matches * EVENTS_PER_MATCH, seed=0)
+    paths = []
+    for mid, g in events.groupby("match_id", sort=True):
+        path = folder / f"{mid}.jsonl"
+        with open(path, "w") as f:
+            for rec in g.to_dict("records"):
+                f.write(json.dumps(rec, default=str) + "\n")
+        paths.append(path)
+    return paths
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--artifacts", default=str(ROOT / "artifacts"))
+    ap.add_argument("--matches", type=int, default=8, help="concurrent matches")
+    ap.add_argument("--rate", type=float, default=500.0, help="events/s per match (0 = as fast as possible)")
+    ap.add_argument("--max-batch", type=int, default=64)
+    args = ap.parse_args()
+    warnings.filterwarnings("ignore")
+    torch.set_num_threads(1)
+
+    feeds_dir = Path(tempfile.mkdtemp())
+    paths = write_feeds(args.matches, feeds_dir)
+
+    scorer = LiveScorer.from_artifacts(args.artifacts)
+    service = LiveScoringService(scorer, max_batch=args.max_batch)
+    latencies = []
+
+    t0 = time.perf_counter()
+    asyncio.run(service.run(
+        [replay_file(p, rate=args.rate or None) for p in paths],
+        lambda res: latencies.append(res["latency_ms"]),
+    ))
+    elapsed = time.perf_counter() - t0
+
+    s = latency_summary(latencies)
+    print(
+        f"matches={args.matches} rate={args.rate:g}/s/match | {s['events']} events in {elapsed:.2f}s"
+        f" ({s['events'] / elapsed:,.0f} events/s) | p50={s['p50_ms']:.3f}ms p99={s['p99_ms']:.3f}ms max={s['max_ms']:.3f}ms"
+    )
+
+if __name__ == "__main__":
+    main()
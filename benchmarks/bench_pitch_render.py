@@ -0,0 +1,96 @@
+"""
+Benchmark: rendering the Pitch Maps arrow figure (pitch + top-N arrows, PNG bytes).
+
+  annotate: one ax.annotate per arrow (previous plot_action_arrows, copied below)
+  batched:  plot_action_arrows, all arrows in one LineCollection
+  cached:   FigureCache hit for an already rendered key
+
+    python benchmarks/bench_pitch_render.py --arrows 60 250 1000
+"""
+from __future__ import annotations
+import argparse
+import io
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT / "dashboard"))
+
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+
+from components.figure_cache import FigureCache
+from components.pitch import PITCH_LENGTH, PITCH_WIDTH, draw_pitch, plot_action_arrows
+
+VALUE_COL = "action_value_dashboard"
+
+def make_actions(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    x0 = rng.uniform(5, PITCH_LENGTH - 5, n)
+    y0 = rng.uniform(5, PITCH_WIDTH - 5, n)
+    return pd.DataFrame({
+        "start_x": x0,
+        "start_y": y0,
+        "end_x": np.clip(x0 + rng.normal(8, 12, n), 2, PITCH_LENGTH - 2),
+        "end_y": np.clip(y0 + rng.normal(0, 10, n), 2, PITCH_WIDTH - 2),
+        VALUE_COL: rng.normal(0, 0.05, n),
+    })
+
+def annotate_arrows(ax, d, alpha=0.70, lw_min=0.6, lw_max=3.2):
+    v = d[VALUE_COL].astype(float).values
+    vmax = float(np.max(np.abs(v))) or 1.0
+    lw = lw_min + (np.clip(np.abs(v) / vmax, 0, 1) * (lw_max - lw_min))
+    for i, row in enumerate(d.itertuples(index=False)):
+        ax.annotate(
+            "",
+            xy=(row.end_x, row.end_y),
+            xytext=(row.start_x, row.start_y),
+            arrowprops=dict(arrowstyle="->", lw=float(lw[i]), color="green" if v[i] > 0 else "red", alpha=alpha),
+        )
+
+def render(draw_arrows, d) -> bytes:
+    fig = Figure()
+    ax = fig.add_subplot(111)
+    draw_pitch(ax)
+    draw_arrows(ax, d)
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=150, bbox_inches="tight")
+    return buf.getvalue()
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--arrows", type=int, nargs="+", default=[60, 250, 1000])
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    batched = lambda ax, d: plot_action_arrows(ax, d, max_arrows=len(d))
+    for n in args.arrows:
+        d = make_actions(n)
+        t_annotate = best_of(lambda: render(annotate_arrows, d), args.repeat)
+        t_batched = best_of(lambda: render(batched, d), args.repeat)
+
+        def draw(fig):
+            ax = fig.add_subplot(111)
+            draw_pitch(ax)
+            plot_action_arrows(ax, d, max_arrows=len(d))
+            return fig
+
+        cache = FigureCache(maxsize=8)
+        cache.get_or_render(("arrows", n), draw)
+        t_cached = best_of(lambda: cache.get_or_render(("arrows", n), draw), args.repeat)
+
+        print(f"{n:>5d} arrows: annotate {t_annotate * 1e3:8.1f} ms  batched {t_batched * 1e3:8.1f} ms "
+              f"({t_annotate / t_batched:4.1f}x)  cached {t_cached * 1e6:6.1f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: adding a matchday to the player / team rankings.
+
+  full:        groupby over every scored event so far (previous notebook cell)
+  incremental: RankingState.update with the new matchday + player_ranking / team_match_ranking
+
+    python benchmarks/bench_rankings.py --matches 380 --matchday 10
+"""
+from __future__ import annotations
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT / "src"))
+sys.path.append(str(ROOT / "benchmarks"))
+sys.path.append(str(ROOT / "dashboard"))
+
+import numpy as np
+
+from bench_dashboard_io import make_predictions
+from inference.rankings import VALUE_COL, RankingState, ranking_actions
+
+def full_rankings(events):
+    a = ranking_actions(events)
+    depth = (
+        a.assign(is_deep=(a["start_x"] < 20).astype(int))
+        .groupby(["player_name", "team_name"])["is_deep"].mean()
+        .reset_index().rename(columns={"is_deep": "deep_action_rate"})
+    )
+    players = (
+        a.groupby(["player_name", "team_name"], dropna=False)
+        .agg(
+            value_total=(VALUE_COL, "sum"),
+            actions=(VALUE_COL, "size"),
+            value_mean=(VALUE_COL, "mean"),
+            value_median=(VALUE_COL, "median"),
+            value_pos_total=("value_pos", "sum"),
+            value_neg_total=("value_neg", "sum"),
+        )
+        .reset_index()
+        .merge(depth, on=["player_name", "team_name"], how="left")
+    )
+    team_match = a.groupby(["match_id", "team_name"], dropna=False).agg(
+        team_value_total=(VALUE_COL, "sum"), actions=(VALUE_COL, "size")
+    )
+    return players, team_match
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--matches", type=int, default=380)
+    ap.add_argument("--matchday", type=int, default=10, help="matches added per update")
+    args = ap.parse_args()
+
+    preds = make_predictions(args.matches)
+    mids = np.sort(preds["match_id"].unique())
+    new = mids[-args.matchday:]
+    history, matchday = preds[~preds["match_id"].isin(new)], preds[preds["match_id"].isin(new)]
+    state = RankingState.from_events(history)
+
+    t0 = time.perf_counter()
+    full_players, _ = full_rankings(preds)
+    t_full = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    updated = state.update(matchday)
+    players = updated.player_ranking()
+    updated.team_match_ranking()
+    t_inc = time.perf_counter() - t0
+
+    err = np.abs(players["value_median"].to_numpy() - full_players["value_median"].to_numpy())
+    rel = err / np.maximum(np.abs(full_players["value_median"].to_numpy()), 1e-12)
+    print(f"{len(preds):,d} events, +{len(matchday):,d} ({args.matchday} matches); state: "
+          f"{len(state.players):,d} players, {len(state.sketch):,d} sketch buckets")
+    print(f"full:        {t_full * 1e3:8.1f} ms")
+    print(f"incremental: {t_inc * 1e3:8.1f} ms  ({t_full / t_inc:.1f}x), value_median max rel error {rel.max():.4f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark: per-event PVNet vs SequencePVNet on possession sequences, same token budget per batch.
+
+  per-event:  TensorBatchLoader + PVNet
+  bucketed:   SequenceBatchLoader (length-bucketed) + SequencePVNet
+  unbucketed: same model, sequences batched in shuffled order (padding to the longest in each batch)
+
+Reports padding waste and training time per million events.
+
+    python benchmarks/bench_sequence_batching.py --matches 100 --batch-size 4096
+"""
+from __future__ import annotations
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT / "src"))
+sys.path.append(str(ROOT / "benchmarks"))
+
+import numpy as np
+import torch
+
+from data.labeling import add_future_labels
+from data.preprocessing import FEATURE_COLS, basic_clean, build_features
+from data.sequences import padding_waste, possession_sequences
+from data.split import order_by_match
+from models.pvnet import PVNet, SequencePVNet
+from synthetic import make_matches
+from training.train_loop import SequenceBatchLoader, make_loader, make_sequence_loader, train_one_epoch
+from training.utils import fit_scaler
+
+class UnbucketedLoader(SequenceBatchLoader):
+    """
+    Shuffled sequences cut into batches in that order (same token budget, no length sorting).
+    """
+    def plan(self, rng=None):
+        order = rng.permutation(len(self.lengths)) if rng is not None else np.arange(len(self.lengths))
+        batches, start, longest = [], 0, 0
+        for i, s in enumerate(order):
+            longest = max(longest, self.lengths[s])
+            if (i - start + 1) * longest > self.batch_size and i > start:
+                batches.append(order[start:i])
+                start, longest = i, self.lengths[s]
+        batches.append(order[start:])
+        return batches
+
+def _epochs(model, loader, epochs: int) -> float:
+    optimizer = torch.optim.AdamW(model.parameters(), lr=1e-3)
+    criterion = torch.nn.BCEWithLogitsLoss()
+    train_one_epoch(model, loader, optimizer, criterion, "cpu")  # warmup
+    best = float("inf")
+    for _ in range(epochs):
+        t0 = time.perf_counter()
+        train_one_epoch(model, loader, optimizer, criterion, "cpu")
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--matches", type=int, default=100)
+    ap.add_argument("--batch-size", type=int, default=4096)
+    ap.add_argument("--max-len", type=int, default=64)
+    ap.add_argument("--context", type=int, default=8)
+    ap.add_argument("--epochs", type=int, default=2)
+    args = ap.parse_args()
+    torch.manual_seed(0)
+
+    df = add_future_labels(build_features(basic_clean(make_matches(args.matches), copy=False), copy=False))
+    df, index = order_by_match(df)
+    X = df[FEATURE_COLS].to_numpy(dtype=np.float32)
+    y_shot, y_goal = df["shot_within_k"].to_numpy(), df["goal_within_k"].to_numpy()
+    rows, _, _ = index.split()
+    scaler = fit_scaler(X, rows)
+
+    offsets = possession_sequences(df, rows, max_len=args.max_len)
+    lengths = np.diff(offsets)
+    flat = make_loader(X, y_shot, y_goal, batch_size=args.batch_size, rows=rows, scaler=scaler)
+    bucketed = make_sequence_loader(X, y_shot, y_goal, offsets, batch_size=args.batch_size, rows=rows, scaler=scaler)
+    unbucketed = UnbucketedLoader(X, y_shot, y_goal, offsets, batch_size=args.batch_size, rows=rows, scaler=scaler)
+    rng = np.random.default_rng(0)
+
+    print(f"{len(rows):,d} train events, {len(lengths):,d} sequences "
+          f"(mean {lengths.mean():.1f}, p99 {np.percentile(lengths, 99):.0f}, max {lengths.max()} events)")
+    print(f"padding waste: bucketed {padding_waste(lengths, bucketed.plan(rng)):.1%} "
+          f"({len(bucketed)} batches) | unbucketed {padding_waste(lengths, unbucketed.plan(rng)):.1%} "
+          f"({len(unbucketed.plan(rng))} batches)")
+
+    runs = [
+        ("per-event PVNet", PVNet(X.shape[1]), flat),
+        ("SequencePVNet, bucketed", SequencePVNet(X.shape[1], context=args.context), bucketed),
+        ("SequencePVNet, unbucketed", SequencePVNet(X.shape[1], context=args.context), unbucketed),
+    ]
+    base = None
+    for name, model, loader in runs:
+        seconds = _epochs(model, loader, args.epochs)
+        per_m = seconds / len(rows) * 1e6
+        base = base or per_m
+        print(f"{name:<27s} epoch {seconds:6.2f}s  {per_m:6.2f} s per 1M events ({per_m / base:.2f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark: epoch time with TensorDataset + DataLoader vs TensorBatchLoader.
+
+    python benchmarks/bench_train_loader.py --sizes 200000 1000000 --batch-size 4096
+"""
+from __future__ import annotations
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT / "src"))
+
+import numpy as np
+import torch
+from torch.utils.data import DataLoader, TensorDataset
+
+from models.losses import WeightedMultiTaskBCE
+from models.pvnet import PVNet
+from training.train_loop import make_loader, train_one_epoch
+
+def dataloader_baseline(X, y_shot, y_goal, batch_size, shuffle=True):
+    ds = TensorDataset(
+        torch.tensor(X, dtype=torch.float32),
+        torch.tensor(y_shot, dtype=torch.float32),
+        torch.tensor(y_goal, dtype=torch.float32),
+    )
+    return DataLoader(ds, batch_size=batch_size, shuffle=shuffle, num_workers=0)
+
+def _iterate(loader):
+    t0 = time.perf_counter()
+    for _ in loader:
+        pass
+    return time.perf_counter() - t0
+
+def _epoch(loader, in_dim, device, seed=0):
+    torch.manual_seed(seed)
+    model = PVNet(in_dim=in_dim).to(device)
+    optimizer = torch.optim.Adam(model.parameters(), lr=1e-3)
+    criterion = WeightedMultiTaskBCE(pos_weight_shot=19.0, pos_weight_goal=199.0)
+    t0 = time.perf_counter()
+    loss = train_one_epoch(model, loader, optimizer, criterion, device)
+    return loss, time.perf_counter() - t0
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[200_000, 1_000_000])
+    ap.add_argument("--batch-size", type=int, default=4096)
+    ap.add_argument("--in-dim", type=int, default=16)
+    args = ap.parse_args()
+    device = torch.device("cpu")
+
+    for n in args.sizes:
+        rng = np.random.default_rng(n)
+        X = rng.standard_normal((n, args.in_dim)).astype(np.float32)
+        y_shot = (rng.random(n) < 0.05).astype(np.float32)
+        y_goal = y_shot * (rng.random(n) < 0.1)
+
+        old = dataloader_baseline(X, y_shot, y_goal, args.batch_size)
+        new = make_loader(X, y_shot, y_goal, batch_size=args.batch_size, shuffle=True)
+
+        it_old, it_new = _iterate(old), _iterate(new)
+        loss_old, ep_old = _epoch(old, args.in_dim, device)
+        loss_new, ep_new = _epoch(new, args.in_dim, device)
+        print(
+            f"n={n:>9,d} | iterate: DataLoader={it_old:7.3f}s fast={it_new:7.3f}s ({it_old / max(it_new, 1e-9):6.1f}x)"
+            f" | epoch: DataLoader={ep_old:7.3f}s fast={ep_new:7.3f}s ({ep_old / max(ep_new, 1e-9):5.1f}x)"
+            f" | loss {loss_old:.4f} / {loss_new:.4f}",
+            flush=True,
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark: heatmap cells for a match, a team's season and all teams.
+
+  events: filter the scored events + np.histogram2d (sum and count), as heatmap_value does
+  cube:   ValueGrid.histograms on dashboard_value_grid.npz (inference/value_grid.py)
+
+    python benchmarks/bench_value_grid.py --matches 380
+"""
+from __future__ import annotations
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT / "src"))
+sys.path.append(str(ROOT / "benchmarks"))
+sys.path.append(str(ROOT / "dashboard"))
+
+import numpy as np
+
+from bench_dashboard_io import make_predictions
+from inference.value_grid import VALUE_COL, write_value_grid
+from utils.grid import ValueGrid
+
+def event_histograms(preds, team, match_id, mode, min_abs_value, bins):
+    d = preds
+    if team is not None:
+        d = d[d["team_name"] == team]
+    if match_id is not None:
+        d = d[d["match_id"] == match_id]
+    d = d[d["start_x"].notna() & d["start_y"].notna() & d[VALUE_COL].notna() & (d[VALUE_COL] != 0)]
+    if mode == "positive":
+        d = d[d[VALUE_COL] > 0]
+    d = d[d[VALUE_COL].abs() >= min_abs_value]
+    x, y = d["start_x"].to_numpy(dtype=float), d["start_y"].to_numpy(dtype=float)
+    extent = [[0, 120], [0, 80]]
+    H_sum = np.histogram2d(x, y, bins=bins, range=extent, weights=d[VALUE_COL].to_numpy(dtype=float))[0]
+    H_cnt = np.histogram2d(x, y, bins=bins, range=extent)[0]
+    return H_sum, H_cnt
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--matches", type=int, default=380)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    preds = make_predictions(args.matches)
+    team, match_id = preds["team_name"].iloc[0], int(preds["match_id"].iloc[0])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        path = write_value_grid(preds, tmp)
+        t_build = time.perf_counter() - t0
+        size_mb = path.stat().st_size / 2**20
+        t0 = time.perf_counter()
+        grid = ValueGrid.load(path)
+        t_load = time.perf_counter() - t0
+
+    print(f"{len(preds):,d} events -> {len(grid.sum):,d} cube entries, {size_mb:.2f} MiB "
+          f"(build {t_build:.2f}s, load {t_load * 1e3:.1f} ms)")
+    for label, sel in (("match", (team, match_id)), ("team season", (team, None)), ("all teams", (None, None))):
+        query = dict(mode="positive", min_abs_value=0.03, bins=(12, 8))
+        t_events = best_of(lambda: event_histograms(preds, *sel, **query), args.repeat)
+        t_cube = best_of(lambda: grid.histograms(*sel, **query), args.repeat)
+        print(f"  {label:<12s} events {t_events * 1e3:8.2f} ms  cube {t_cube * 1e3:6.2f} ms  ({t_events / t_cube:5.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+End-to-end benchmark suite on synthetic matches (make_matches).
+
+Times every pipeline stage at several data scales and writes one JSON file per run,
+to compare across commits:
+
+    python benchmarks/run_suite.py --scales 50000 250000 1000000
+    python benchmarks/run_suite.py --compare benchmarks/results/<old>.json
+
+Stages: basic_clean, build_features, add_future_labels, split_by_match,
+match_index_split (order_by_match + MatchIndex.split row indices),
+train_epoch (one PVNet epoch on the train split), score_frame (test split),
+heatmap_value and plot_action_arrows (both including a canvas draw).
+Each stage reports the best of --repeat runs.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT / "src"))
+sys.path.append(str(ROOT / "benchmarks"))
+sys.path.append(str(ROOT / "dashboard"))
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import torch
+from sklearn.preprocessing import StandardScaler
+
+from components.pitch import draw_pitch, heatmap_value, plot_action_arrows
+from data.labeling import add_future_labels
+from data.preprocessing import FEATURE_COLS, basic_clean, build_features
+from data.split import order_by_match, split_by_match
+from inference.predict import score_frame
+from models.pvnet import PVNet
+from synthetic import EVENTS_PER_MATCH, make_matches
+from training.train_loop import make_loader, train_one_epoch
+
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _best_of(fn, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return result, best
+
+def _render(draw):
+    fig, ax = plt.subplots(figsize=(10, 6.5))
+    draw_pitch(ax)
+    draw(ax)
+    fig.canvas.draw()
+    plt.close(fig)
+
+def run_scale(n_events: int, repeat: int, seed: int = 0) -> list[dict]:
+    n_matches = max(2, int(np.ceil(n_events / EVENTS_PER_MATCH)))
+    events = make_matches(n_matches, seed=seed)
+    rows = []
+
+    def record(stage, fn, n_rows, rep=repeat):
+        result, seconds = _best_of(fn, rep)
+        rows.append({
+            "stage": stage,
+            "n_events": len(events),
+            "rows": int(n_rows),
+            "seconds": seconds,
+            "rows_per_second": n_rows / max(seconds, 1e-9),
+            "repeat": rep,
+        })
+        print(f"  {stage:<20s} rows={n_rows:>10,d}  {seconds:8.3f}s", flush=True)
+        return result
+
+    df = record("basic_clean", lambda: basic_clean(events), len(events))
+    df = record("build_features", lambda: build_features(df), len(df))
+    df = record("add_future_labels", lambda: add_future_labels(df, k=10), len(df))
+    train_df, val_df, test_df = record("split_by_match", lambda: split_by_match(df), len(df))
+    record("match_index_split", lambda: order_by_match(df)[1].split(), len(df))
+
+    scaler = StandardScaler().fit(train_df[FEATURE_COLS].astype(float).values)
+    X_train = scaler.transform(train_df[FEATURE_COLS].astype(float).values)
+    loader = make_loader(X_train, train_df["shot_within_k"].values, train_df["goal_within_k"].values, batch_size=4096)
+    torch.manual_seed(seed)
+    model = PVNet(in_dim=len(FEATURE_COLS))
+    optimizer = torch.optim.AdamW(model.parameters(), lr=1e-3, weight_decay=1e-4)
+    criterion = torch.nn.BCEWithLogitsLoss()
+    device = torch.device("cpu")
+    record("train_epoch", lambda: train_one_epoch(model, loader, optimizer, criterion, device), len(train_df))
+
+    model.eval()
+    scored = record("score_frame", lambda: score_frame(test_df, model, scaler), len(test_df))
+
+    record("heatmap_value", lambda: _render(lambda ax: heatmap_value(ax, scored, statistic="sum")), len(scored))
+    record("plot_action_arrows", lambda: _render(lambda ax: plot_action_arrows(ax, scored, max_arrows=250)), len(scored))
+    return rows
+
+def compare(current: dict, baseline: dict):
+    base = {(r["stage"], r["n_events"]): r["seconds"] for r in baseline["results"]}
+    print(f"\nvs {baseline['meta'].get('commit') or baseline['meta']['created']}:")
+    for r in current["results"]:
+        old = base.get((r["stage"], r["n_events"]))
+        if old is None:
+            continue
+        print(f"  {r['stage']:<20s} n={r['n_events']:>10,d}  {old:8.3f}s -> {r['seconds']:8.3f}s  ({old / max(r['seconds'], 1e-9):5.2f}x)")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scales", type=int, nargs="+", default=[50_000, 250_000, 1_000_000],
+                    help="approximate number of events per scale")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", default=None, help="results JSON (default: benchmarks/results/<commit>.json)")
+    ap.add_argument("--compare", default=None, help="earlier results JSON to print speedups against")
+    args = ap.parse_args()
+
+    commit = _git_commit()
+    results = []
+    for n in args.scales:
+        print(f"scale ~{n:,d} events", flush=True)
+        results.extend(run_scale(n, args.repeat, seed=args.seed))
+
+    report = {
+        "meta": {
+            "commit": commit,
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "torch_threads": torch.get_num_threads(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "torch": torch.__version__,
+            "scales": args.scales,
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+    out = Path(args.out) if args.out else RESULTS_DIR / f"{(commit or 'nocommit')[:10]}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"Saved: {out}")
+
+    if args.compare:
+        compare(report, json.loads(Path(args.compare).read_text()))
+
+if __name__ == "__main__":
+    main()
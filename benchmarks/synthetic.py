@@ -0,0 +1,202 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+EVENTS_PER_MATCH = 3500
+MEAN_POSSESSION_LEN = 6.0
+
+EVENT_TYPES = ["Pass", "Carry", "Ball Receipt*", "Pressure", "Dribble", "Shot", "Clearance"]
+EVENT_PROBS = [0.34, 0.28, 0.26, 0.07, 0.015, 0.01, 0.025]
+
+def make_events(n_events: int, seed: int = 0, with_locations: bool = True) -> pd.DataFrame:
+    """
+    Synthetic StatsBomb-like raw events (same columns as sb.events + match_id).
+    Possessions are contiguous runs inside each match; locations are [x, y] lists.
+    with_locations=False skips the list-valued columns (cheap frames for labeling benchmarks).
+    """
+    rng = np.random.default_rng(seed)
+    n = int(n_events)
+
+    match_id = np.arange(n, dtype=np.int64) // EVENTS_PER_MATCH + 1_000_000
+    index = np.arange(n, dtype=np.int64) % EVENTS_PER_MATCH + 1
+
+    # possession id restarts at 1 in every match
+    new_poss = rng.random(n) < (1.0 / MEAN_POSSESSION_LEN)
+    new_poss[index == 1] = True
+    poss_global = np.cumsum(new_poss)
+    first_of_match = np.maximum.accumulate(np.where(index == 1, poss_global, 0))
+    possession = poss_global - first_of_match + 1
+
+    type_name = rng.choice(np.array(EVENT_TYPES, dtype=object), size=n, p=EVENT_PROBS)
+    is_shot = type_name == "Shot"
+    shot_outcome = np.where(
+        is_shot,
+        rng.choice(np.array(["Goal", "Saved", "Off T", "Blocked"], dtype=object), size=n, p=[0.11, 0.3, 0.35, 0.24]),
+        None,
+    )
+
+    teams = np.array(["Home FC", "Away FC"], dtype=object)
+    poss_team = teams[possession % 2]
+    team = np.where(rng.random(n) < 0.9, poss_team, teams[(possession + 1) % 2])
+    player = np.array([f"Player {i}" for i in range(22)], dtype=object)[
+        rng.integers(0, 11, size=n) + 11 * (team == teams[1])
+    ]
+
+    period = np.where(index <= EVENTS_PER_MATCH // 2, 1, 2)
+    seconds = (index * (5400 // EVENTS_PER_MATCH + 1)).astype(np.int64)
+    minute = seconds // 60
+    second = seconds % 60
+
+    events = pd.DataFrame({
+        "match_id": match_id,
+        "period": period,
+        "index": index,
+        "minute": minute,
+        "second": second,
+        "possession": possession,
+        "possession_team": poss_team,
+        "team": team,
+        "player": player,
+        "type": type_name,
+        "pass_outcome": np.where((type_name == "Pass") & (rng.random(n) < 0.2), "Incomplete", None),
+        "dribble_outcome": np.where((type_name == "Dribble") & (rng.random(n) < 0.4), "Incomplete", None),
+        "shot_outcome": shot_outcome,
+    })
+
+    if with_locations:
+        sx = rng.uniform(0, 120, size=n).round(1)
+        sy = rng.uniform(0, 80, size=n).round(1)
+        ex = np.clip(sx + rng.normal(8, 15, size=n), 0, 120).round(1)
+        ey = np.clip(sy + rng.normal(0, 12, size=n), 0, 80).round(1)
+
+        start = np.stack([sx, sy], axis=1).tolist()
+        end = np.stack([ex, ey], axis=1).tolist()
+        has_loc = rng.random(n) < 0.97
+
+        loc = pd.Series(start, dtype=object).where(has_loc, None)
+        end_s = pd.Series(end, dtype=object)
+        events["location"] = loc
+        events["pass_end_location"] = end_s.where(type_name == "Pass", None)
+        events["carry_end_location"] = end_s.where(type_name == "Carry", None)
+        events["shot_end_location"] = end_s.where(is_shot, None)
+
+    return events
+
+TEAMS = [f"Team {chr(ord('A') + i)}" for i in range(20)]
+MEAN_PASSES_PER_POSSESSION = 3.0
+TURNOVER_TYPES = ["Pass", "Miscontrol", "Dispossessed", "Clearance"]
+TURNOVER_PROBS = [0.55, 0.15, 0.15, 0.15]
+
+def _xy_lists(x: np.ndarray, y: np.ndarray, mask: np.ndarray) -> pd.Series:
+    out = np.full(len(x), None, dtype=object)
+    idx = np.flatnonzero(mask)
+    out[idx] = np.stack([x[idx], y[idx]], axis=1).round(1).tolist()
+    return pd.Series(out, dtype=object)
+
+def make_matches(n_matches: int, seed: int = 0, events_per_match: int = EVENTS_PER_MATCH) -> pd.DataFrame:
+    """
+    Possession-structured synthetic matches (same columns as make_events).
+
+    Each possession is a chain of Pass -> Ball Receipt* -> Carry steps by the team in
+    possession (with opponent Pressure events mixed in) that moves the ball towards x=120.
+    Pass/Carry end locations are the next event's location, and the possession ends in a
+    Shot (more likely the closer the ball is to goal; goal probability falls with distance)
+    or a turnover. Matches pair two of 20 teams with 11 named players each.
+    """
+    rng = np.random.default_rng(seed)
+
+    # possessions: 3 events per pass step plus a final action
+    n_poss_per_match = int(np.ceil(events_per_match / (3 * MEAN_PASSES_PER_POSSESSION + 1)))
+    n_poss = n_matches * n_poss_per_match
+    steps = rng.geometric(1.0 / (MEAN_PASSES_PER_POSSESSION + 1), size=n_poss) - 1
+    lengths = 3 * steps + 1
+    poss_match = np.repeat(np.arange(n_matches), n_poss_per_match)
+    poss_number = np.tile(np.arange(1, n_poss_per_match + 1), n_matches)
+
+    # events of each possession
+    n = int(lengths.sum())
+    ev_poss = np.repeat(np.arange(n_poss), lengths)
+    poss_start = np.cumsum(lengths) - lengths
+    j = np.arange(n) - poss_start[ev_poss]
+    last = j == lengths[ev_poss] - 1
+
+    type_name = np.array(["Pass", "Ball Receipt*", "Carry"], dtype=object)[j % 3]
+    dribble = (type_name == "Carry") & (rng.random(n) < 0.05)
+    type_name[dribble] = "Dribble"
+
+    # ball path: start deep-ish, drift forward with noise
+    def walk(start, step):
+        step[j == 0] = 0.0
+        c = np.cumsum(step)
+        return start[ev_poss] + c - c[poss_start][ev_poss]
+
+    x = np.clip(walk(rng.uniform(5, 75, size=n_poss), rng.normal(2.5, 6.0, size=n)), 1.0, 119.0)
+    y = np.clip(walk(rng.uniform(5, 75, size=n_poss), rng.normal(0.0, 6.0, size=n)), 1.0, 79.0)
+
+    # final action: shot near goal, otherwise a turnover
+    p_shot = 0.6 / (1.0 + np.exp(-(x - 106.0) / 4.0))
+    shoots = last & (rng.random(n) < p_shot)
+    type_name[last & ~shoots] = rng.choice(np.array(TURNOVER_TYPES, dtype=object), size=int((last & ~shoots).sum()), p=TURNOVER_PROBS)
+    type_name[shoots] = "Shot"
+
+    dist = np.hypot(120.0 - x, 40.0 - y)
+    p_goal = 1.0 / (1.0 + np.exp((dist - 4.0) / 4.0))
+    goal = shoots & (rng.random(n) < p_goal)
+    shot_outcome = np.full(n, None, dtype=object)
+    shot_outcome[shoots] = rng.choice(np.array(["Saved", "Off T", "Blocked"], dtype=object), size=int(shoots.sum()))
+    shot_outcome[goal] = "Goal"
+
+    # teams and players
+    pair = np.stack([rng.permutation(len(TEAMS))[:2] for _ in range(n_matches)])
+    side = poss_number % 2
+    poss_team_idx = pair[poss_match, side]
+    opp_team_idx = pair[poss_match, 1 - side]
+    ev_team_idx = poss_team_idx[ev_poss]
+    pressure = (~last) & (j % 3 == 1) & (rng.random(n) < 0.1)
+    type_name[pressure] = "Pressure"
+    ev_team_idx = np.where(pressure, opp_team_idx[ev_poss], ev_team_idx)
+    teams = np.array(TEAMS, dtype=object)
+    player_idx = rng.integers(0, 11, size=n)
+    player = teams[ev_team_idx] + " Player " + (player_idx + 1).astype(str).astype(object)
+
+    # end locations: next event of the possession for passes/carries
+    nx = np.append(x[1:], np.nan)
+    ny = np.append(y[1:], np.nan)
+    turnover_pass = last & (type_name == "Pass")
+    nx[turnover_pass] = np.clip(x[turnover_pass] + rng.normal(15, 12, size=int(turnover_pass.sum())), 1, 119)
+    ny[turnover_pass] = np.clip(y[turnover_pass] + rng.normal(0, 15, size=int(turnover_pass.sum())), 1, 79)
+    pass_outcome = np.where(turnover_pass, "Incomplete", None)
+    dribble_outcome = np.where(dribble & (rng.random(n) < 0.4), "Incomplete", None)
+
+    # match clock
+    ev_match = poss_match[ev_poss]
+    match_start = np.searchsorted(ev_match, np.arange(n_matches))
+    match_len = np.diff(np.append(match_start, n))
+    index = np.arange(n) - match_start[ev_match] + 1
+    frac = (index - 1) / match_len[ev_match]
+    period = np.where(frac < 0.5, 1, 2)
+    seconds = (frac * 5400 + (period == 2) * 60).astype(np.int64)
+
+    events = pd.DataFrame({
+        "match_id": ev_match.astype(np.int64) + 3_000_000,
+        "period": period,
+        "index": index,
+        "minute": seconds // 60,
+        "second": seconds % 60,
+        "possession": poss_number[ev_poss],
+        "possession_team": teams[poss_team_idx[ev_poss]],
+        "team": teams[ev_team_idx],
+        "player": player,
+        "type": type_name,
+        "pass_outcome": pass_outcome,
+        "dribble_outcome": dribble_outcome,
+        "shot_outcome": shot_outcome,
+    })
+
+    has_loc = rng.random(n) < 0.99
+    events["location"] = _xy_lists(x, y, has_loc)
+    events["pass_end_location"] = _xy_lists(nx, ny, (type_name == "Pass") & np.isfinite(nx))
+    events["carry_end_location"] = _xy_lists(nx, ny, (type_name == "Carry") & np.isfinite(nx))
+    gy = rng.uniform(34, 46, size=n)
+    events["shot_end_location"] = _xy_lists(np.full(n, 120.0), gy, shoots)
+    return events
@@ -0,0 +1,50 @@
+import io
+import threading
+from collections import OrderedDict
+
+from matplotlib.figure import Figure
+
+class FigureCache:
+    """
+    Bounded LRU cache of rendered figures (PNG bytes) keyed by the parameters that produced them.
+    Keys must include the version of the data files drawn from (utils/io.py artifact_version:
+    path, mtime, size); otherwise a re-exported artifact keeps showing the old figures.
+    Figures are rendered once per key with matplotlib.figure.Figure (no pyplot global state,
+    nothing left open) and evicted least-recently-used beyond maxsize.
+    """
+    def __init__(self, maxsize: int = 128, dpi: int = 150):
+        self.maxsize = maxsize
+        self.dpi = dpi
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_render(self, key, draw):
+        """
+        PNG bytes for key; on a miss draw(fig) fills a new Figure. draw may return None
+        (nothing to show): that is cached too and returned as None.
+        """
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+
+        fig = Figure()
+        png = None
+        if draw(fig) is not None:
+            buf = io.BytesIO()
+            fig.savefig(buf, format="png", dpi=self.dpi, bbox_inches="tight")
+            png = buf.getvalue()
+
+        with self._lock:
+            self.misses += 1
+            self._items[key] = png
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+        return png
+
+    def __len__(self):
+        return len(self._items)
@@ -1,9 +1,15 @@
 import numpy as np
-import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+from matplotlib.patches import Circle
 
 PITCH_LENGTH = 120
 PITCH_WIDTH = 80
 
+# arrow head: length in pitch units (+ a bit per point of linewidth), half-angle in degrees
+ARROW_HEAD_LENGTH = 1.6
+ARROW_HEAD_PER_LW = 0.35
+ARROW_HEAD_ANGLE = 28.0
+
 
 def draw_pitch(ax):
     ax.set_xlim(0, PITCH_LENGTH)
@@ -17,7 +23,7 @@ def draw_pitch(ax):
     ax.plot([PITCH_LENGTH / 2, PITCH_LENGTH / 2], [0, PITCH_WIDTH])
 
     # center circle
-    cc = plt.Circle((PITCH_LENGTH / 2, PITCH_WIDTH / 2), 10, fill=False)
+    cc = Circle((PITCH_LENGTH / 2, PITCH_WIDTH / 2), 10, fill=False)
     ax.add_patch(cc)
 
     # boxes (simple)
@@ -32,6 +38,29 @@ def draw_pitch(ax):
     ax.axis("off")
 
 
+def arrow_segments(x0, y0, x1, y1, head_length):
+    """
+    (3 * N, 2, 2) line segments: for every arrow the shaft start->end and the two strokes
+    of an open head at the end point (head_length scalar or per arrow).
+    """
+    dx, dy = x1 - x0, y1 - y0
+    norm = np.hypot(dx, dy)
+    norm = np.where(norm > 0, norm, 1.0)
+    ux, uy = dx / norm, dy / norm
+    head = np.broadcast_to(np.asarray(head_length, dtype=float), ux.shape)
+
+    c, s = np.cos(np.radians(ARROW_HEAD_ANGLE)), np.sin(np.radians(ARROW_HEAD_ANGLE))
+    # head strokes point backwards from the tip, rotated by +/- ARROW_HEAD_ANGLE
+    lx, ly = -(ux * c - uy * s) * head, -(uy * c + ux * s) * head
+    rx, ry = -(ux * c + uy * s) * head, -(uy * c - ux * s) * head
+
+    tip = np.stack([x1, y1], axis=1)
+    shaft = np.stack([np.stack([x0, y0], axis=1), tip], axis=1)
+    left = np.stack([tip, tip + np.stack([lx, ly], axis=1)], axis=1)
+    right = np.stack([tip, tip + np.stack([rx, ry], axis=1)], axis=1)
+    return np.stack([shaft, left, right], axis=1).reshape(-1, 2, 2)
+
+
 def plot_action_arrows(
     ax,
     df,
@@ -52,13 +81,14 @@ def plot_action_arrows(
       - top-N by magnitude
       - color: green (positive), red (negative)
       - linewidth proportional to |value|
+      - all arrows drawn as one LineCollection (no per-arrow artists), so hundreds of arrows are cheap
       - FIX: remove suspicious end points pinned to pitch borders (e.g., end_x=0)
              especially when the movement length is very large (artifact).
     """
     if df is None or len(df) == 0:
         return
 
-    d = df.copy()
+    d = df  # every filter below returns a new frame
 
     # Need start/end coords and value
     d = d[
@@ -113,22 +143,24 @@ def plot_action_arrows(
     # linewidth scaling
     lw = lw_min + (np.clip(np.abs(v) / vmax, 0, 1) * (lw_max - lw_min))
 
-    # draw
-    for i, row in enumerate(d.itertuples(index=False)):
-        val = float(getattr(row, value_col))
-        color = "green" if val > 0 else "red"
-
-        ax.annotate(
-            "",
-            xy=(row.end_x, row.end_y),
-            xytext=(row.start_x, row.start_y),
-            arrowprops=dict(
-                arrowstyle="->",
-                lw=float(lw[i]),
-                color=color,
-                alpha=alpha,
-            ),
+    # draw: one LineCollection for all arrows (shaft + two head strokes each, like arrowstyle "->")
+    x0 = d["start_x"].astype(float).values
+    y0 = d["start_y"].astype(float).values
+    x1 = d["end_x"].astype(float).values
+    y1 = d["end_y"].astype(float).values
+    segments = arrow_segments(x0, y0, x1, y1, head_length=ARROW_HEAD_LENGTH + ARROW_HEAD_PER_LW * lw)
+
+    colors = np.where(v > 0, "green", "red")
+    ax.add_collection(
+        LineCollection(
+            segments,
+            colors=np.repeat(colors, 3),
+            linewidths=np.repeat(lw, 3),
+            alpha=alpha,
+            capstyle="round",
+            joinstyle="round",
         )
+    )
 
 def heatmap_value(
     ax,
@@ -151,7 +183,7 @@ def heatmap_value(
         # return an empty image-like object? caller can handle None
         return None
 
-    d = df.copy()
+    d = df  # every filter below returns a new frame
     d = d[d["start_x"].notna() & d["start_y"].notna() & d[value_col].notna()]
     if len(d) == 0:
         return None
@@ -184,17 +216,30 @@ def heatmap_value(
         range=[[0, PITCH_LENGTH], [0, PITCH_WIDTH]],
         weights=w,
     )
-
-    if statistic == "sum":
-        Z = H_sum
-    else:
-        # mean: divide by counts
+    H_cnt = None
+    if statistic != "sum":
         H_cnt, _, _ = np.histogram2d(
             x,
             y,
             bins=bins,
             range=[[0, PITCH_LENGTH], [0, PITCH_WIDTH]],
         )
+    return draw_value_grid(ax, H_sum, H_cnt, statistic=statistic, alpha=alpha)
+
+
+def draw_value_grid(ax, H_sum, H_cnt=None, statistic="mean", alpha=0.75):
+    """
+    Draw a value heatmap from binned sums/counts (np.histogram2d(x, y) orientation),
+    e.g. from heatmap_value or the precomputed value grid (utils/grid.py).
+    None if no cell holds an action.
+    """
+    if H_cnt is not None and not np.any(H_cnt):
+        return None
+
+    if statistic == "sum":
+        Z = H_sum
+    else:
+        # mean: divide by counts
         Z = np.divide(H_sum, np.maximum(H_cnt, 1.0))
 
     # histogram2d returns shape (xbins, ybins) so transpose for imshow with origin lower
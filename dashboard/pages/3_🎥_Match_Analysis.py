@@ -1,45 +1,48 @@
 import streamlit as st
-from utils.io import load_parquet, assert_artifacts_exist
+from utils.io import load_parquet, load_team_match, query_parquet, assert_artifacts_exist
 from components.filters import select_team
 from components.charts import plot_timeline
 
-REQUIRED = ["test_predictions.parquet", "team_match_ranking.parquet"]
+# pre-aggregated per (team, match) by inference/aggregates.py (export cell / predict CLI --aggregates)
+REQUIRED = [
+    "dashboard_match_index.parquet",
+    "dashboard_timeline.parquet",
+    "dashboard_top_actions.parquet",
+    "team_match_ranking.parquet",
+]
 
 st.header("🎥 Match Analysis")
 
 missing = assert_artifacts_exist(REQUIRED)
 if missing:
     st.error(f"These files are missing from artifacts/: {missing}")
+    st.caption("Regenerate them with the export cell or `python -m inference.predict ... --aggregates`.")
     st.stop()
 
-events = load_parquet("test_predictions.parquet")
-team_match = load_parquet("team_match_ranking.parquet")
+match_index = load_parquet("dashboard_match_index.parquet")
 
 # =========================
 # NEW FILTER FLOW:
 # Team -> Match (of that team)
 # =========================
-team = select_team(events, "Team")
+team = select_team(match_index, "Team")
 if team == "All":
     st.warning("Select a team to see available matches.")
     st.stop()
 
-team_events = events[events["team_name"] == team].copy()
-
-matches = sorted(team_events["match_id"].dropna().unique().tolist())
+matches = sorted(match_index.loc[match_index["team_name"] == team, "match_id"].dropna().unique().tolist())
 if not matches:
     st.error("No matches found for the selected team.")
     st.stop()
 
 match_id = st.selectbox("Match", matches)
-match_events = team_events[team_events["match_id"] == match_id].copy()
 
 # =========================
 # SUMMARY TEAM-MATCH
 # =========================
 st.subheader("Team summary (match)")
 tm = (
-    team_match[team_match["match_id"] == match_id]
+    query_parquet("team_match_ranking.parquet", filters=(("match_id", "==", int(match_id)),))
     .sort_values("team_value_total", ascending=False)
 )
 st.dataframe(tm, use_container_width=True)
@@ -49,17 +52,7 @@ st.dataframe(tm, use_container_width=True)
 # =========================
 st.subheader("Timeline (5-min buckets)")
 
-if "minute_bucket" not in match_events.columns:
-    st.error("The minute_bucket column does not exist. Regenerate test_predictions.parquet (export cell).")
-    st.stop()
-
-timeline = (
-    match_events.groupby(["minute_bucket"])["action_value_dashboard"]
-    .sum()
-    .reset_index()
-    .sort_values("minute_bucket")
-)
-timeline["cum_value"] = timeline["action_value_dashboard"].cumsum()
+timeline = load_team_match("dashboard_timeline.parquet", team, match_id)
 
 c1, c2 = st.columns(2)
 with c1:
@@ -91,8 +84,6 @@ with c2:
 # =========================
 st.subheader("Top actions (match)")
 
-top_actions = match_events.sort_values("action_value_dashboard", ascending=False).head(30)
-
 cols = [
     "minute", "second",
     "team_name", "player_name", "type_name",
@@ -101,6 +92,9 @@ cols = [
     "action_value_dashboard"
 ]
 
+# already sorted by value (desc) per team/match
+top_actions = load_team_match("dashboard_top_actions.parquet", team, match_id, columns=tuple(cols)).head(30)
+
 # alcune colonne potrebbero mancare a seconda della pipeline: filtriamo solo quelle presenti
 cols = [c for c in cols if c in top_actions.columns]
 
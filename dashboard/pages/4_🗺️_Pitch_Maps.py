@@ -1,43 +1,48 @@
 import streamlit as st
-import matplotlib.pyplot as plt
 
-from utils.io import load_parquet, assert_artifacts_exist
+from utils.io import artifact_version, load_parquet, load_team_match, load_value_grid, assert_artifacts_exist
+from components.figure_cache import FigureCache
 from components.filters import select_team
-from components.pitch import draw_pitch, plot_action_arrows, heatmap_value
+from components.pitch import draw_pitch, plot_action_arrows, draw_value_grid
 
-REQUIRED = ["test_predictions.parquet"]
+# pre-aggregated per (team, match) by inference/aggregates.py (export cell / predict CLI --aggregates)
+REQUIRED = ["dashboard_match_index.parquet", "dashboard_actions.parquet", "dashboard_value_grid.npz"]
 VALUE_COL = "action_value_dashboard"
+ACTION_COLS = ("player_name", "start_x", "start_y", "end_x", "end_y", VALUE_COL)
 
 st.header("🗺️ Pitch Maps")
 
+@st.cache_resource
+def figure_cache() -> FigureCache:
+    # rendered PNGs shared by all sessions; scrubbing back to a seen setting is a lookup
+    return FigureCache(maxsize=256)
+
 missing = assert_artifacts_exist(REQUIRED)
 if missing:
     st.error(f"These files are missing from artifacts/: {missing}")
+    st.caption("Regenerate them with the export cell or `python -m inference.predict ... --aggregates`.")
     st.stop()
 
-events = load_parquet("test_predictions.parquet")
+match_index = load_parquet("dashboard_match_index.parquet")
 
 # =========================
 # FILTER FLOW:
 # Team -> Match -> Player (optional)
 # =========================
-team = select_team(events, "Team")
+team = select_team(match_index, "Team")
 if team == "All":
     st.warning("Select a team to see available matches.")
     st.stop()
 
-team_events = events[events["team_name"] == team].copy()
-
-matches = sorted(team_events["match_id"].dropna().unique().tolist())
+matches = sorted(match_index.loc[match_index["team_name"] == team, "match_id"].dropna().unique().tolist())
 if not matches:
     st.error("No matches found for the selected team.")
     st.stop()
 
 match_id = st.selectbox("Match", matches)
-match_events = team_events[team_events["match_id"] == match_id].copy()
 
-# Keep only actions that contribute to the dashboard (can be negative too)
-match_actions = match_events[match_events[VALUE_COL] != 0.0].copy()
+# Only actions that contribute to the dashboard (can be negative too): non-zero values are pre-filtered
+match_actions = load_team_match("dashboard_actions.parquet", team, match_id, columns=ACTION_COLS)
 
 if len(match_actions) == 0:
     st.warning("No non-zero action values found for this team/match selection.")
@@ -57,7 +62,7 @@ with cB:
     min_abs_value = st.slider("Minimum |value|", 0.0, 0.30, 0.05, 0.01)
 
 with cC:
-    top_n = st.slider("Top N arrows", 5, 60, 20, 5)
+    top_n = st.slider("Top N arrows", 5, 250, 20, 5)
 
 with cD:
     heat_stat = st.selectbox("Heatmap statistic", ["mean", "sum"], index=0)
@@ -70,7 +75,7 @@ mode_map = {
 mode = mode_map[show_mode_ui]
 
 # Data for arrows (need end_x/end_y)
-df_arrows = match_actions.copy()
+df_arrows = match_actions
 
 # Filter by sign + threshold
 if mode == "positive":
@@ -81,63 +86,80 @@ elif mode == "negative":
 df_arrows = df_arrows[df_arrows[VALUE_COL].abs() >= float(min_abs_value)]
 df_arrows = df_arrows.reindex(df_arrows[VALUE_COL].abs().sort_values(ascending=False).index).head(int(top_n))
 
-# Data for heatmap (start location only, can ignore end_x/end_y)
+# Heatmap (start location) from the precomputed value grid: any scope/resolution is an array sum
 # Make it "not banal": default is positive-only and thresholded
-min_abs_value_heat = st.slider("Heatmap min |value|", 0.0, 0.30, 0.03, 0.01)
-
-df_heat = match_actions.copy()
-if mode == "positive":
-    df_heat = df_heat[df_heat[VALUE_COL] > 0]
-elif mode == "negative":
-    df_heat = df_heat[df_heat[VALUE_COL] < 0]
+cH1, cH2, cH3 = st.columns([2, 1, 1])
+with cH1:
+    min_abs_value_heat = st.slider("Heatmap min |value|", 0.0, 0.30, 0.03, 0.01)
+with cH2:
+    heat_scope = st.selectbox("Heatmap scope", ["This match", "All matches of team", "All teams"], index=0)
+with cH3:
+    heat_bins = st.selectbox("Heatmap grid", [(12, 8), (24, 16), (6, 4), (48, 32)], format_func=lambda b: f"{b[0]}x{b[1]}")
 
-df_heat = df_heat[df_heat[VALUE_COL].abs() >= float(min_abs_value_heat)]
+heat_team = None if heat_scope == "All teams" else team
+heat_match = int(match_id) if heat_scope == "This match" else None
 
 # =========================
 # PITCH MAPS
 # =========================
-c1, c2 = st.columns(2)
-
-with c1:
-    st.subheader("Heatmap value (start location)")
-    fig = plt.figure()
+cache = figure_cache()
+# everything the figures depend on, source files (path, mtime, size) included: same key -> same image
+base_key = (artifact_version("dashboard_actions.parquet"), team, int(match_id), mode, float(min_abs_value), int(top_n))
+heat_key = (artifact_version("dashboard_value_grid.npz"), heat_team, heat_match, mode, float(min_abs_value_heat),
+            heat_bins, heat_stat)
+
+
+def draw_heatmap(fig):
+    H_sum, H_cnt = load_value_grid().histograms(
+        team=heat_team,
+        match_id=heat_match,
+        mode=mode,
+        min_abs_value=round(float(min_abs_value_heat), 2),
+        bins=heat_bins,
+    )
     ax = fig.add_subplot(111)
     draw_pitch(ax)
+    im = draw_value_grid(ax, H_sum, H_cnt, statistic=heat_stat)
+    if im is not None:
+        fig.colorbar(im, ax=ax, fraction=0.046, pad=0.04)
+    return im
+
+
+def arrows_drawer(actions):
+    def draw(fig):
+        if len(actions) == 0:
+            return None
+        ax = fig.add_subplot(111)
+        draw_pitch(ax)
+        plot_action_arrows(
+            ax,
+            actions,
+            value_col=VALUE_COL,
+            max_arrows=int(top_n),
+            mode="both",  # already filtered
+            min_abs_value=0.0,  # already filtered
+        )
+        return fig
+    return draw
 
-    im = heatmap_value(
-        ax,
-        df_heat,
-        value_col=VALUE_COL,
-        bins=(12, 8),
-        mode="both" if mode == "both" else mode,
-        min_abs_value=0.0,  # already applied
-        statistic=heat_stat,
-    )
 
-    if im is None:
+c1, c2 = st.columns(2)
+
+with c1:
+    st.subheader("Heatmap value (start location)")
+    png = cache.get_or_render(("heatmap",) + heat_key, draw_heatmap)
+    if png is None:
         st.info("No events available for heatmap with the current filters.")
     else:
-        plt.colorbar(im, ax=ax, fraction=0.046, pad=0.04)
-        st.pyplot(fig)
+        st.image(png, use_container_width=True)
 
 with c2:
     st.subheader("Top arrows (highest value actions)")
-    fig = plt.figure()
-    ax = fig.add_subplot(111)
-    draw_pitch(ax)
-
-    if len(df_arrows) == 0:
+    png = cache.get_or_render(("arrows", "All") + base_key, arrows_drawer(df_arrows))
+    if png is None:
         st.info("No actions available for arrows with the current filters.")
     else:
-        plot_action_arrows(
-            ax,
-            df_arrows,
-            value_col=VALUE_COL,
-            max_arrows=int(top_n),
-            mode="both",  # df_arrows already filtered
-            min_abs_value=0.0,  # already filtered
-        )
-        st.pyplot(fig)
+        st.image(png, use_container_width=True)
 
 # =========================
 # PLAYER FILTER (optional)
@@ -147,12 +169,12 @@ st.subheader("Filter by player (optional)")
 players = sorted(match_actions["player_name"].dropna().unique().tolist())
 player = st.selectbox("Player", ["All"] + players)
 
-player_actions = match_actions.copy()
+player_actions = match_actions
 if player != "All":
     player_actions = player_actions[player_actions["player_name"] == player]
 
 # Apply same filtering logic for player view
-df_player = player_actions.copy()
+df_player = player_actions
 if mode == "positive":
     df_player = df_player[df_player[VALUE_COL] > 0]
 elif mode == "negative":
@@ -160,22 +182,11 @@ elif mode == "negative":
 df_player = df_player[df_player[VALUE_COL].abs() >= float(min_abs_value)]
 df_player = df_player.reindex(df_player[VALUE_COL].abs().sort_values(ascending=False).index).head(int(top_n))
 
-fig = plt.figure()
-ax = fig.add_subplot(111)
-draw_pitch(ax)
-
-if len(df_player) == 0:
+png = cache.get_or_render(("arrows", player) + base_key, arrows_drawer(df_player))
+if png is None:
     st.info("No player actions match the current filters.")
 else:
-    plot_action_arrows(
-        ax,
-        df_player,
-        value_col=VALUE_COL,
-        max_arrows=int(top_n),
-        mode="both",
-        min_abs_value=0.0,
-    )
-    st.pyplot(fig)
+    st.image(png, use_container_width=True)
 
 st.caption(
     "Tip: reduce clutter using the sliders (Minimum |value| and Top N). "
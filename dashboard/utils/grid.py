@@ -0,0 +1,90 @@
+from pathlib import Path
+
+import numpy as np
+
+class ValueGrid:
+    """
+    Reader for dashboard_value_grid.npz (written by inference/value_grid.py): sparse
+    (sum, count) entries per (team, match, player) group, value sign, |value| bucket and
+    cell of the base grid. Heatmaps of any group selection are sums over these arrays.
+    """
+    def __init__(self, arrays):
+        self.bins = tuple(int(b) for b in arrays["bins"])
+        self.mag_edges = arrays["mag_edges"]
+        self.teams = arrays["teams"]
+        self.players = arrays["players"]
+        self.group_team = arrays["group_team"]
+        self.group_match = arrays["group_match"]
+        self.group_player = arrays["group_player"]
+        self.group = arrays["group"]
+        self.positive = arrays["positive"]
+        self.mag = arrays["mag"]
+        self.cell = arrays["cell"].astype(np.intp)
+        self.sum = arrays["sum"].astype(np.float64)
+        self.count = arrays["count"].astype(np.float64)
+        # entries are sorted by group: group g owns entries offsets[g]:offsets[g + 1]
+        self.offsets = np.searchsorted(self.group, np.arange(len(self.group_team) + 1))
+
+    @classmethod
+    def load(cls, path: Path) -> "ValueGrid":
+        with np.load(path, allow_pickle=False) as npz:
+            return cls({k: npz[k] for k in npz.files})
+
+    def _code(self, names, name) -> int:
+        i = int(np.searchsorted(names, name))
+        return i if i < len(names) and names[i] == name else -1
+
+    def groups(self, team=None, match_id=None, player=None) -> np.ndarray:
+        """
+        Boolean mask over groups; None means all teams / matches / players.
+        """
+        m = np.ones(len(self.group_team), dtype=bool)
+        if team is not None:
+            m &= self.group_team == self._code(self.teams, team)
+        if match_id is not None:
+            m &= self.group_match == int(match_id)
+        if player is not None:
+            m &= self.group_player == self._code(self.players, player)
+        return m
+
+    def _entries(self, group_mask: np.ndarray) -> np.ndarray:
+        """
+        Entry indices of the selected groups (concatenated offset ranges, no scan of all entries).
+        """
+        g = np.flatnonzero(group_mask)
+        start, length = self.offsets[g], self.offsets[g + 1] - self.offsets[g]
+        # arange over every range at once: shift a global arange by each range's start
+        return np.arange(length.sum()) + np.repeat(start - (np.cumsum(length) - length), length)
+
+    def _mag_bucket(self, min_abs_value: float) -> int:
+        k = int(np.searchsorted(self.mag_edges, float(min_abs_value) - 1e-9))
+        if k >= len(self.mag_edges) or not np.isclose(self.mag_edges[k], min_abs_value):
+            raise ValueError(f"min_abs_value must be one of {self.mag_edges.tolist()}, got {min_abs_value}")
+        return k
+
+    def histograms(self, team=None, match_id=None, player=None, mode="positive", min_abs_value=0.0, bins=(12, 8)):
+        """
+        (H_sum, H_cnt) of shape bins, oriented like np.histogram2d(start_x, start_y) over the
+        pitch, for the non-zero actions of the selected groups. mode: "positive" | "negative" | "both".
+        """
+        nx, ny = (int(b) for b in bins)
+        bx, by = self.bins
+        if bx % nx or by % ny:
+            raise ValueError(f"bins must divide the stored grid {self.bins}, got {bins}")
+
+        rows = self._entries(self.groups(team, match_id, player))
+        m = np.ones(len(rows), dtype=bool)
+        if mode == "positive":
+            m &= self.positive[rows]
+        elif mode == "negative":
+            m &= ~self.positive[rows]
+        if min_abs_value and min_abs_value > 0:
+            m &= self.mag[rows] >= self._mag_bucket(min_abs_value)
+        rows = rows[m]
+
+        cell = self.cell[rows]
+        H_sum = np.bincount(cell, weights=self.sum[rows], minlength=bx * by)
+        H_cnt = np.bincount(cell, weights=self.count[rows], minlength=bx * by)
+        # base (bx, by) -> (nx, ny): sum blocks of (bx // nx, by // ny) cells
+        shape = (nx, bx // nx, ny, by // ny)
+        return H_sum.reshape(shape).sum(axis=(1, 3)), H_cnt.reshape(shape).sum(axis=(1, 3))
@@ -3,23 +3,66 @@ from pathlib import Path
 import pandas as pd
 import streamlit as st
 
+from utils.grid import ValueGrid
+from utils.query import file_version, read_parquet_filtered
+
 def get_artifacts_dir() -> Path:
     p = st.session_state.get("ARTIFACTS_DIR")
     if not p:
         p = str(Path(__file__).resolve().parents[2] / "artifacts")
     return Path(p)
 
-@st.cache_data(show_spinner=False)
-def load_json(filename: str) -> dict:
+def artifact_version(filename: str) -> tuple:
+    """
+    Cache key of an artifact: its path plus file_version (mtime, size), so the cached
+    reads below follow a re-export instead of serving the old file until a restart.
+    """
     path = get_artifacts_dir() / filename
+    return (str(path),) + file_version(path)
+
+@st.cache_data(show_spinner=False)
+def _load_json(path: str, *version) -> dict:
     with open(path, "r") as f:
         return json.load(f)
 
+def load_json(filename: str) -> dict:
+    return _load_json(*artifact_version(filename))
+
 @st.cache_data(show_spinner=False)
-def load_parquet(filename: str) -> pd.DataFrame:
-    path = get_artifacts_dir() / filename
+def _load_parquet(path: str, *version) -> pd.DataFrame:
     return pd.read_parquet(path)
 
+def load_parquet(filename: str) -> pd.DataFrame:
+    return _load_parquet(*artifact_version(filename))
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _query_parquet(version: tuple, columns: tuple | None, filters: tuple) -> pd.DataFrame:
+    return read_parquet_filtered(Path(version[0]), columns, filters)
+
+def query_parquet(filename: str, columns: tuple | None = None, filters: tuple = ()) -> pd.DataFrame:
+    """
+    Filtered, column-projected read of an artifact (see utils/query.py), cached per
+    (file version, columns, filters). Only the selection is kept in memory, never the whole file.
+    """
+    return _query_parquet(artifact_version(filename), columns, filters)
+
+def load_team_match(filename: str, team: str, match_id, columns: tuple | None = None) -> pd.DataFrame:
+    """
+    Rows of one (team_name, match_id) of a dashboard artifact.
+    """
+    return query_parquet(filename, columns, (("team_name", "==", team), ("match_id", "==", int(match_id))))
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _load_value_grid(path: str, *version) -> ValueGrid:
+    return ValueGrid.load(Path(path))
+
+def load_value_grid(filename: str = "dashboard_value_grid.npz") -> ValueGrid:
+    """
+    Value grid cube (utils/grid.py), loaded once per artifacts folder and file version
+    and shared across reruns.
+    """
+    return _load_value_grid(*artifact_version(filename))
+
 def assert_artifacts_exist(required: list[str]) -> list[str]:
     base = get_artifacts_dir()
     return [f for f in required if not (base / f).exists()]
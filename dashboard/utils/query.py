@@ -0,0 +1,54 @@
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+def file_version(path) -> tuple[int, int]:
+    """
+    (st_mtime_ns, st_size) of a file; for a directory (partitioned dataset) the latest
+    mtime and total size of the files under it. (0, 0) if missing. Part of every cache key
+    over an artifact, so re-exporting it over the same path invalidates the cached reads.
+    """
+    path = Path(path)
+    if path.is_dir():
+        stats = [p.stat() for p in path.rglob("*") if p.is_file()]
+        return (max((s.st_mtime_ns for s in stats), default=0), sum(s.st_size for s in stats))
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return (0, 0)
+    return (st.st_mtime_ns, st.st_size)
+
+def filter_expression(filters):
+    """
+    ((col, op, value), ...) -> pyarrow expression (AND of all terms); op in ==, in, >=, <=.
+    """
+    expr = None
+    for col, op, value in filters:
+        field = pc.field(col)
+        if op == "==":
+            e = field == value
+        elif op == "in":
+            e = field.isin(list(value))
+        elif op == ">=":
+            e = field >= value
+        elif op == "<=":
+            e = field <= value
+        else:
+            raise ValueError(f"Unsupported filter op: {op!r}")
+        expr = e if expr is None else expr & e
+    return expr
+
+def read_parquet_filtered(path: Path, columns=None, filters=()) -> pd.DataFrame:
+    """
+    Reads only `columns` and the rows matching `filters` from a Parquet file or directory.
+    Both are pushed down to the reader: row groups whose min/max statistics exclude the
+    filter are skipped, so files sorted by the filter columns (inference/aggregates.py)
+    only touch the row groups of the selection. Columns missing from the file are ignored.
+    """
+    dataset = ds.dataset(path, format="parquet")
+    if columns is not None:
+        columns = [c for c in columns if c in dataset.schema.names]
+    table = dataset.to_table(columns=columns, filter=filter_expression(filters))
+    return table.to_pandas()
@@ -3,9 +3,15 @@ from pathlib import Path
 
 @dataclass
 class Config:
+    # Data loading
+    LOADER_MAX_WORKERS: int = 8
+
     # Labels
     K_FUTURE_EVENTS: int = 10
 
+    # Compact event frames: categorical names, float32 features, int8 flags/labels (data/memory.py)
+    COMPACT_SCHEMA: bool = False
+
     # Split
     TRAIN_FRAC: float = 0.70
     VAL_FRAC: float = 0.15
@@ -16,6 +22,16 @@ class Config:
     HIDDEN_DIM: int = 128
     DROPOUT: float = 0.15
 
+    # Sequence model (models/pvnet.py SequencePVNet): whole possessions in length-bucketed
+    # padded batches (data/sequences.py); BATCH_SIZE then counts padded events per batch
+    SEQUENCE_MODEL: bool = False
+    SEQ_MAX_LEN: int = 64
+    SEQ_CONTEXT: int = 8
+
+    # Action value: V = p_shot + W_GOAL * p_goal; |values| below VALUE_EPS are zeroed in the dashboard
+    W_GOAL: float = 5.0
+    VALUE_EPS: float = 0.005
+
     # Training
     BATCH_SIZE: int = 4096
     LR: float = 1e-3
@@ -23,6 +39,29 @@ class Config:
     EPOCHS: int = 12
     EARLY_STOPPING_PATIENCE: int = 3
 
+    # Checkpoints (training/checkpoint.py): written every epoch by a background thread;
+    # a run with the same settings and training data continues from the last one
+    # (the notebook deletes it once model.pth is saved)
+    RESUME_TRAINING: bool = True
+
+    # Fast CPU training (training/utils.py fast_training): bfloat16 autocast in train/eval loops,
+    # torch.compile of model + loss, explicit intra-/inter-op thread counts (0 = PyTorch default).
+    # benchmarks/bench_fast_training.py measures each against fp32 eager and checks val metrics.
+    TRAIN_BF16: bool = False
+    TRAIN_COMPILE: bool = False
+    TORCH_THREADS: int = 0
+    TORCH_INTEROP_THREADS: int = 0
+
+    # Profiling (see tracing.py): per-stage spans + optional cProfile/torch profiler on one stage
+    PROFILE: bool = False
+    PROFILE_STAGE: str = ""
+    PROFILE_TOOL: str = "cprofile"  # "cprofile" | "torch"
+
     # Drive paths (Colab)
     PROJECT_ROOT: Path = Path("/content/drive/MyDrive/pvnet-football")
     ARTIFACTS_DIR: Path = PROJECT_ROOT / "artifacts"
+    EVENTS_CACHE_DIR: Path = PROJECT_ROOT / "cache" / "events"
+    EVENT_STORE_DIR: Path = PROJECT_ROOT / "event_store"
+    FREEZE_FRAME_DIR: Path = PROJECT_ROOT / "freeze_frames"
+    PROFILE_DIR: Path = PROJECT_ROOT / "profiles"
+    CHECKPOINT_DIR: Path = PROJECT_ROOT / "checkpoints"
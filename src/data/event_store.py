@@ -0,0 +1,151 @@
+from __future__ import annotations
+import os
+from pathlib import Path
+from typing import Iterable
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from data.load_statsbomb import StatsBombAPISource, _arrow_safe, iter_competition_events
+from data.preprocessing import basic_clean, build_features
+from tracing import traced
+
+PART_FILE = "part-0.parquet"
+
+class EventStore:
+    """
+    Parquet store of cleaned + featurized events, one file per match:
+
+        root/competition_id=<c>/season_id=<s>/match_id=<m>/part-0.parquet
+
+    Matches are immutable once written: ingestion only adds missing match_ids.
+    Labels are not stored (they depend on K and are cheap to recompute).
+    """
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+    def _match_dir(self, competition_id: int, season_id: int, match_id: int) -> Path:
+        return self.root / f"competition_id={competition_id}" / f"season_id={season_id}" / f"match_id={match_id}"
+
+    def _files(
+        self,
+        partitions: Iterable[tuple[int, int]] | None = None,
+        match_ids: Iterable[int] | None = None,
+    ) -> list[tuple[int, int, int, Path]]:
+        """
+        (competition_id, season_id, match_id, path) of stored matches, pruned by directory name.
+        """
+        wanted_parts = None if partitions is None else {(int(c), int(s)) for c, s in partitions}
+        wanted_matches = None if match_ids is None else {int(m) for m in match_ids}
+
+        files = []
+        for comp_dir in self.root.glob("competition_id=*"):
+            comp = int(comp_dir.name.split("=", 1)[1])
+            for season_dir in comp_dir.glob("season_id=*"):
+                season = int(season_dir.name.split("=", 1)[1])
+                if wanted_parts is not None and (comp, season) not in wanted_parts:
+                    continue
+                for match_dir in season_dir.glob("match_id=*"):
+                    mid = int(match_dir.name.split("=", 1)[1])
+                    if wanted_matches is not None and mid not in wanted_matches:
+                        continue
+                    path = match_dir / PART_FILE
+                    if path.exists():
+                        files.append((comp, season, mid, path))
+
+        # same row order as basic_clean on the concatenated events (sorted by match_id)
+        files.sort(key=lambda f: f[2])
+        return files
+
+    def match_ids(self, partitions: Iterable[tuple[int, int]] | None = None) -> set[int]:
+        return {mid for _, _, mid, _ in self._files(partitions=partitions)}
+
+    def write_match(self, df: pd.DataFrame, competition_id: int, season_id: int, match_id: int) -> Path:
+        match_dir = self._match_dir(competition_id, season_id, match_id)
+        match_dir.mkdir(parents=True, exist_ok=True)
+        path = match_dir / PART_FILE
+
+        # atomic write: a match is either fully stored or absent
+        tmp = match_dir / f".{PART_FILE}.{os.getpid()}.tmp"
+        _arrow_safe(df).to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+        return path
+
+    def append(self, df: pd.DataFrame) -> list[int]:
+        """
+        Writes every (competition_id, season_id, match_id) group of df that is not stored yet.
+        Returns the match_ids written.
+        """
+        stored = self.match_ids()
+        written = []
+        for (comp, season, mid), g in df.groupby(["competition_id", "season_id", "match_id"], sort=False):
+            if int(mid) in stored:
+                continue
+            self.write_match(g, int(comp), int(season), int(mid))
+            written.append(int(mid))
+        return written
+
+    @traced("data.event_store.read")
+    def read(
+        self,
+        columns: list[str] | None = None,
+        partitions: Iterable[tuple[int, int]] | None = None,
+        match_ids: Iterable[int] | None = None,
+    ) -> pd.DataFrame:
+        """
+        Reads only the requested columns from the requested (competition_id, season_id)
+        partitions and/or match_ids. Columns missing from some matches (or from all of
+        them) come back as nulls.
+        """
+        files = self._files(partitions=partitions, match_ids=match_ids)
+        if not files:
+            return pd.DataFrame(columns=columns)
+
+        paths = [str(p) for *_, p in files]
+        schema = pa.unify_schemas([pq.read_schema(p) for p in paths], promote_options="permissive")
+        if columns is not None:
+            schema = pa.schema([schema.field(c) if c in schema.names else pa.field(c, pa.null()) for c in columns])
+
+        table = ds.dataset(paths, schema=schema, format="parquet").to_table(columns=columns)
+        return table.to_pandas()
+
+@traced("data.ingest_competition", rows=None)
+def ingest_competition(
+    store: EventStore,
+    competition_id: int,
+    season_id: int,
+    source=None,
+    cache_dir: str | Path | None = None,
+    max_workers: int = 8,
+) -> list[int]:
+    """
+    Downloads, cleans and featurizes only the matches of (competition_id, season_id)
+    that are not in the store yet, writing each one as soon as it is ready.
+    Returns the match_ids added.
+    """
+    source = source if source is not None else StatsBombAPISource()
+
+    stored = store.match_ids()
+    missing = [mid for mid in source.match_ids(competition_id, season_id) if int(mid) not in stored]
+
+    frames = iter_competition_events(
+        competition_id,
+        season_id,
+        source=source,
+        cache_dir=cache_dir,
+        max_workers=max_workers,
+        match_ids=missing,
+    )
+
+    added = []
+    # frames come back in the order of match_ids
+    for mid, ev in zip(missing, frames):
+        ev["competition_id"] = competition_id
+        ev["season_id"] = season_id
+        # ev is owned here: no defensive copies needed
+        df = build_features(basic_clean(ev, copy=False), copy=False)
+        store.write_match(df, competition_id, season_id, int(mid))
+        added.append(int(mid))
+    return added
@@ -0,0 +1,412 @@
+"""
+Freeze frames (player positions at the moment of an event) as flat, memory-mapped arrays.
+
+StatsBomb shot events carry a `shot_freeze_frame` list of players ({"location": [x, y],
+"teammate": bool, "position": {"name": ...}}, 360 frames use "keeper"/"actor" instead of
+"position"). As an object column that is by far the largest part of an events frame, so
+load_competition_events drops it; this module keeps the positions as a ragged array instead:
+
+    root/event_ids.npy   S36    sorted event ids (StatsBomb UUIDs)
+    root/offsets.npy     int64  event i owns players offsets[i]:offsets[i + 1]
+    root/xy.npy          float32 (n_players, 2)
+    root/teammate.npy    bool   teammate of the acting player
+    root/keeper.npy      bool   goalkeeper
+    root/matches.npy     int64  matches already ingested (also those without frames)
+    root/parts/000001/   the same arrays for every later ingest (see ingest_freeze_frames)
+
+    ingest_freeze_frames(cfg.FREEZE_FRAME_DIR, comp_id, season_id, cache_dir=cfg.EVENTS_CACHE_DIR)
+    ff = FreezeFrameStore.open(cfg.FREEZE_FRAME_DIR)  # memory-mapped, nothing is read yet
+    shots = df[df["type_name"] == "Shot"]
+    shots = shots.join(freeze_frame_features(ff, shots))
+"""
+from __future__ import annotations
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from data.load_statsbomb import StatsBombAPISource, iter_competition_events
+from data.preprocessing import PITCH_LENGTH, PITCH_WIDTH, _xy_from_arrow_list
+from tracing import traced
+
+ID_DTYPE = "S36"
+STORE_ARRAYS = ("event_ids", "offsets", "xy", "teammate", "keeper", "matches")
+
+# goal posts at the attacking end (StatsBomb: 8 yards wide)
+GOAL_X = PITCH_LENGTH
+POST_Y = (PITCH_WIDTH / 2 - 4.0, PITCH_WIDTH / 2 + 4.0)
+
+def freeze_frame_columns(df: pd.DataFrame) -> list[str]:
+    return [c for c in df.columns if "freeze_frame" in c]
+
+def _player_record(p: dict) -> dict:
+    pos = p.get("position")
+    if isinstance(pos, dict):
+        pos = pos.get("name")
+    keeper = p["keeper"] if "keeper" in p else pos == "Goalkeeper"
+    return {"location": p.get("location"), "teammate": bool(p.get("teammate")), "keeper": bool(keeper)}
+
+def _frames_array(values: np.ndarray) -> pa.ListArray:
+    """
+    list<struct> Arrow array of one freeze-frame column. Frames stored as JSON strings
+    (EventStore._arrow_safe) are decoded; frames Arrow cannot type directly are normalized
+    to {location, teammate, keeper} per player first.
+    """
+    values = np.array([json.loads(v) if isinstance(v, str) else v for v in values], dtype=object)
+    try:
+        arr = pa.array(values, from_pandas=True)
+        if pa.types.is_list(arr.type) and pa.types.is_struct(arr.type.value_type):
+            return arr
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+        pass
+    frames = [
+        [_player_record(p) for p in v] if isinstance(v, (list, tuple, np.ndarray)) else None
+        for v in values
+    ]
+    return pa.array(frames, type=pa.list_(pa.struct([
+        ("location", pa.list_(pa.float64())), ("teammate", pa.bool_()), ("keeper", pa.bool_()),
+    ])))
+
+def _fields(arr: pa.StructArray) -> dict[str, pa.Array]:
+    # flatten() (unlike field()) applies the struct's own offset and nulls to its children
+    return dict(zip([f.name for f in arr.type], arr.flatten()))
+
+def _bool(arr: pa.Array) -> np.ndarray:
+    return arr.fill_null(False).to_numpy(zero_copy_only=False).astype(bool)
+
+def parse_freeze_frames(values) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (players per event, xy, teammate, keeper) of one freeze-frame column; missing frames
+    have 0 players. Parsing runs in Arrow, one pass over the column.
+    """
+    arr = _frames_array(np.asarray(values, dtype=object))
+    counts = arr.value_lengths().fill_null(0).to_numpy(zero_copy_only=False).astype(np.int64)
+    players = arr.flatten()
+    if len(players) == 0:
+        empty = np.zeros(0, dtype=bool)
+        return counts, np.zeros((0, 2), dtype=np.float32), empty, empty
+
+    fields = _fields(players)
+    x, y = _xy_from_arrow_list(fields["location"], np.float32)
+    teammate = _bool(fields["teammate"]) if "teammate" in fields else np.zeros(len(players), dtype=bool)
+    if "keeper" in fields:
+        keeper = _bool(fields["keeper"])
+    elif "position" in fields:
+        pos = fields["position"]
+        if pa.types.is_struct(pos.type):
+            pos = _fields(pos)["name"]
+        keeper = _bool(pc.equal(pos, "Goalkeeper"))
+    else:
+        keeper = np.zeros(len(players), dtype=bool)
+    return counts, np.stack([x, y], axis=1), teammate, keeper
+
+def _ranges(start: np.ndarray, length: np.ndarray) -> np.ndarray:
+    # start[i]:start[i] + length[i] for every i, concatenated: shift one arange by each block's start
+    ends = np.cumsum(length)
+    return np.arange(ends[-1] if len(ends) else 0) + np.repeat(start - (ends - length), length)
+
+def _part_dirs(root: Path) -> list[Path]:
+    parts = root / "parts"
+    return sorted(p for p in parts.iterdir() if p.is_dir() and p.name.isdigit()) if parts.is_dir() else []
+
+class FreezeFrameStore:
+    """
+    Ragged freeze-frame arrays keyed by event id (layout in the module docstring).
+    Opened stores are memory-mapped: lookups touch only the pages of the events asked for.
+    """
+    def __init__(self, event_ids, offsets, xy, teammate, keeper, matches=None):
+        self.event_ids = event_ids
+        self.offsets = offsets
+        self.xy = xy
+        self.teammate = teammate
+        self.keeper = keeper
+        self.matches = np.zeros(0, dtype=np.int64) if matches is None else matches
+
+    @classmethod
+    def open(cls, root: str | Path) -> "FreezeFrameStore | PartedFreezeFrameStore":
+        """
+        Memory-maps the store at root; with parts written by later ingests, a
+        PartedFreezeFrameStore over the root arrays and every part.
+        """
+        root = Path(root)
+        store = cls(**{name: np.load(root / f"{name}.npy", mmap_mode="r") for name in STORE_ARRAYS})
+        parts = _part_dirs(root)
+        return PartedFreezeFrameStore([store] + [cls.open(p) for p in parts]) if parts else store
+
+    def save(self, root: str | Path) -> Path:
+        """
+        Writes every array to root, replacing a previous store as a whole (written to a
+        sibling directory first, so readers never see a mix of old and new files).
+        """
+        root = Path(root)
+        tmp = root.with_name(f".{root.name}.{os.getpid()}.tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        for name in STORE_ARRAYS:
+            np.save(tmp / f"{name}.npy", np.asarray(getattr(self, name)))
+
+        old = root.with_name(f".{root.name}.{os.getpid()}.old")
+        if root.exists():
+            os.replace(root, old)
+        os.replace(tmp, root)
+        shutil.rmtree(old, ignore_errors=True)
+        return root
+
+    def __len__(self):
+        return len(self.event_ids)
+
+    @property
+    def n_players(self) -> int:
+        return int(self.offsets[-1])
+
+    def positions(self, event_ids) -> np.ndarray:
+        """
+        Position of every event id in the store, -1 where it has no freeze frame.
+        """
+        keys = np.asarray(pd.Series(event_ids, dtype=object).fillna("").to_numpy(), dtype=ID_DTYPE)
+        if len(self) == 0:
+            return np.full(len(keys), -1, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self.event_ids, keys), len(self) - 1)
+        return np.where(self.event_ids[pos] == keys, pos, -1)
+
+    def gather(self, event_ids) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (offsets, xy, teammate, keeper) of the given events, in their order: event i owns
+        players offsets[i]:offsets[i + 1] (none when it has no freeze frame).
+        """
+        return self._take(self.positions(event_ids))
+
+    def _take(self, pos: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        hit = pos >= 0
+        start = np.where(hit, self.offsets[np.maximum(pos, 0)], 0)
+        length = np.where(hit, self.offsets[np.maximum(pos, 0) + 1] - start, 0)
+        offsets = np.r_[0, np.cumsum(length)]
+        # arange over every block at once: shift a global arange by each block's start
+        rows = _ranges(start, length)
+        return offsets, np.asarray(self.xy[rows]), np.asarray(self.teammate[rows]), np.asarray(self.keeper[rows])
+
+    def frame(self, event_id: str) -> pd.DataFrame:
+        """
+        Players of one event: x, y, teammate, keeper (empty when it has no freeze frame).
+        """
+        _, xy, teammate, keeper = self.gather([event_id])
+        return pd.DataFrame({"x": xy[:, 0], "y": xy[:, 1], "teammate": teammate, "keeper": keeper})
+
+class PartedFreezeFrameStore(FreezeFrameStore):
+    """
+    A store plus the parts later ingests wrote next to it, read as one store. Only the event
+    ids are merged (at open time, into one sorted index); player arrays stay memory-mapped
+    in their parts. For an id in several parts the earliest part wins, as in build().
+    """
+    def __init__(self, parts: list[FreezeFrameStore]):
+        self.parts = parts
+        ids = np.concatenate([np.asarray(p.event_ids) for p in parts])
+        part = np.repeat(np.arange(len(parts)), [len(p) for p in parts])
+        local = np.concatenate([np.arange(len(p)) for p in parts])
+        order = np.argsort(ids, kind="stable")  # earlier parts first among equal ids
+        self.event_ids, first = np.unique(ids[order], return_index=True)
+        self._part, self._local = part[order][first], local[order][first]
+        self.matches = np.unique(np.concatenate([np.asarray(p.matches, dtype=np.int64) for p in parts]))
+
+    @property
+    def n_players(self) -> int:
+        return sum(p.n_players for p in self.parts)
+
+    def gather(self, event_ids) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        pos = self.positions(event_ids)
+        hit = pos >= 0
+        part = np.where(hit, self._part[np.maximum(pos, 0)], -1)
+        local = self._local[np.maximum(pos, 0)]
+        length = np.zeros(len(pos), dtype=np.int64)
+        for i, p in enumerate(self.parts):
+            sel = part == i
+            length[sel] = p.offsets[local[sel] + 1] - p.offsets[local[sel]]
+        offsets = np.r_[0, np.cumsum(length)]
+
+        xy = np.empty((offsets[-1], 2), dtype=np.float32)
+        teammate = np.empty(offsets[-1], dtype=bool)
+        keeper = np.empty(offsets[-1], dtype=bool)
+        for i, p in enumerate(self.parts):
+            sel = np.flatnonzero(part == i)
+            if len(sel):
+                rows = _ranges(offsets[sel], length[sel])
+                _, xy[rows], teammate[rows], keeper[rows] = p._take(local[sel])
+        return offsets, xy, teammate, keeper
+
+class FreezeFrameBuilder:
+    """
+    Collects freeze frames match by match, so the object columns can be dropped as soon as
+    each match is parsed; build() sorts everything into a FreezeFrameStore.
+    """
+    def __init__(self):
+        self._parts: list[tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = []
+        self._matches: list[np.ndarray] = []
+
+    def add_store(self, store: FreezeFrameStore) -> None:
+        if isinstance(store, PartedFreezeFrameStore):
+            for part in store.parts:
+                self.add_store(part)
+            return
+        counts = np.diff(np.asarray(store.offsets))
+        self._parts.append((np.asarray(store.event_ids), counts, np.asarray(store.xy),
+                            np.asarray(store.teammate), np.asarray(store.keeper)))
+        self._matches.append(np.asarray(store.matches, dtype=np.int64))
+
+    def add(self, events: pd.DataFrame, id_col: str = "id") -> int:
+        """
+        Parses every freeze-frame column of events (one match or many); returns the
+        number of events with a frame.
+        """
+        if "match_id" in events.columns:
+            self._matches.append(pd.unique(events["match_id"].dropna()).astype(np.int64))
+        added = 0
+        for c in freeze_frame_columns(events):
+            counts, xy, teammate, keeper = parse_freeze_frames(events[c])
+            has = counts > 0
+            ids = np.asarray(events[id_col].to_numpy(dtype=object)[has], dtype=ID_DTYPE)
+            self._parts.append((ids, counts[has], xy, teammate, keeper))
+            added += int(has.sum())
+        return added
+
+    @traced("data.freeze_frames.build")
+    def build(self) -> FreezeFrameStore:
+        """
+        Store sorted by event id; for an id added twice the first frame wins.
+        """
+        if not self._parts:
+            empty = np.zeros(0, dtype=bool)
+            return FreezeFrameStore(np.zeros(0, dtype=ID_DTYPE), np.zeros(1, dtype=np.int64),
+                                    np.zeros((0, 2), dtype=np.float32), empty, empty,
+                                    np.unique(np.concatenate(self._matches or [np.zeros(0, dtype=np.int64)])))
+
+        ids = np.concatenate([p[0] for p in self._parts]).astype(ID_DTYPE)
+        counts = np.concatenate([p[1] for p in self._parts]).astype(np.int64)
+        xy = np.concatenate([p[2] for p in self._parts]).astype(np.float32)
+        teammate = np.concatenate([p[3] for p in self._parts])
+        keeper = np.concatenate([p[4] for p in self._parts])
+
+        ids, first = np.unique(ids, return_index=True)  # sorted, first occurrence of each id
+        src_start = np.cumsum(counts) - counts
+        length = counts[first]
+        offsets = np.r_[0, np.cumsum(length)]
+        rows = _ranges(src_start[first], length)
+        matches = np.unique(np.concatenate(self._matches)) if self._matches else np.zeros(0, dtype=np.int64)
+        return FreezeFrameStore(ids, offsets, xy[rows], teammate[rows], keeper[rows], matches)
+
+    def write(self, root: str | Path) -> FreezeFrameStore:
+        self.build().save(root)
+        return FreezeFrameStore.open(root)
+
+@traced("data.ingest_freeze_frames", rows=None)
+def ingest_freeze_frames(
+    root: str | Path,
+    competition_id: int,
+    season_id: int,
+    source=None,
+    cache_dir: str | Path | None = None,
+    max_workers: int = 8,
+    compact: bool = False,
+) -> list[int]:
+    """
+    Adds the freeze frames of the matches of (competition_id, season_id) that the store
+    at root has not ingested yet (with cache_dir, matches already downloaded for the
+    EventStore are read from the cache). Returns the match_ids added.
+
+    The first ingest writes the store at root; later ones only write their own matches, as
+    a new part under root/parts, so ingest cost does not grow with the store. compact=True
+    instead rewrites the store and all its parts as one (see compact_freeze_frames).
+    """
+    root = Path(root)
+    exists = (root / "event_ids.npy").exists()
+    stored = {int(m) for m in FreezeFrameStore.open(root).matches} if exists else set()
+
+    source = source if source is not None else StatsBombAPISource()
+    missing = [mid for mid in source.match_ids(competition_id, season_id) if int(mid) not in stored]
+    if not missing:
+        return []
+
+    frames = iter_competition_events(
+        competition_id,
+        season_id,
+        include_freeze_frame=True,
+        source=source,
+        cache_dir=cache_dir,
+        max_workers=max_workers,
+        match_ids=missing,
+    )
+    builder = FreezeFrameBuilder()
+    for ev in frames:
+        builder.add(ev)
+    if not exists:
+        builder.write(root)
+    else:
+        parts = _part_dirs(root)
+        builder.build().save(root / "parts" / f"{int(parts[-1].name) + 1 if parts else 1:06d}")
+        if compact:
+            compact_freeze_frames(root)
+    return [int(m) for m in missing]
+
+def compact_freeze_frames(root: str | Path) -> FreezeFrameStore:
+    """
+    Rewrites the store at root and its parts as a single store (a full rewrite: every
+    array is read and written once). Lookups in a store with many parts do one pass per part.
+    """
+    builder = FreezeFrameBuilder()
+    builder.add_store(FreezeFrameStore.open(root))
+    return builder.write(root)
+
+def _segment_reduce(ufunc, values: np.ndarray, offsets: np.ndarray, empty: float) -> np.ndarray:
+    # ufunc.reduceat over the ragged segments; segments without players get `empty`
+    out = np.full(len(offsets) - 1, empty, dtype=np.float64)
+    nonempty = np.flatnonzero(np.diff(offsets) > 0)
+    if len(nonempty):
+        out[nonempty] = ufunc.reduceat(values, offsets[:-1][nonempty])
+    return out
+
+@traced("data.freeze_frame_features")
+def freeze_frame_features(store: FreezeFrameStore, df: pd.DataFrame, id_col: str = "id") -> pd.DataFrame:
+    """
+    Surrounding-player context of every event of df, on df's index (NaN / 0 without a frame):
+
+      ff_players              players in the freeze frame
+      ff_opponents            opponents in the freeze frame
+      ff_nearest_opponent     distance from (start_x, start_y) to the nearest opponent
+      ff_opponents_in_cone    opponents inside the triangle ball -> goal posts
+      ff_keeper_dist_to_goal  distance of the opposing goalkeeper to the goal centre
+    """
+    offsets, xy, teammate, keeper = store.gather(df[id_col])
+    n = len(df)
+    length = np.diff(offsets)
+    event = np.repeat(np.arange(n), length)
+
+    bx = df["start_x"].to_numpy(dtype=np.float64, na_value=np.nan)[event]
+    by = df["start_y"].to_numpy(dtype=np.float64, na_value=np.nan)[event]
+    px, py = xy[:, 0].astype(np.float64), xy[:, 1].astype(np.float64)
+    opp = ~teammate
+    dist = np.where(opp, np.hypot(px - bx, py - by), np.inf)
+
+    # inside the triangle (ball, post 1, post 2): same side of all three edges
+    def side(ax, ay, cx, cy):
+        return (cx - ax) * (py - ay) - (cy - ay) * (px - ax)
+    s1 = side(bx, by, GOAL_X, POST_Y[0])
+    s2 = side(GOAL_X, POST_Y[0], GOAL_X, POST_Y[1])
+    s3 = side(GOAL_X, POST_Y[1], bx, by)
+    in_cone = opp & (((s1 >= 0) & (s2 >= 0) & (s3 >= 0)) | ((s1 <= 0) & (s2 <= 0) & (s3 <= 0)))
+
+    gk = opp & keeper
+    gk_dist = np.where(gk, np.hypot(GOAL_X - px, PITCH_WIDTH / 2 - py), np.inf)
+
+    nearest = _segment_reduce(np.minimum, dist, offsets, np.inf)
+    keeper_dist = _segment_reduce(np.minimum, gk_dist, offsets, np.inf)
+    return pd.DataFrame({
+        "ff_players": length.astype(np.int16),
+        "ff_opponents": np.bincount(event, weights=opp, minlength=n).astype(np.int16),
+        "ff_nearest_opponent": np.where(np.isfinite(nearest), nearest, np.nan).astype(np.float32),
+        "ff_opponents_in_cone": np.bincount(event, weights=in_cone, minlength=n).astype(np.int16),
+        "ff_keeper_dist_to_goal": np.where(np.isfinite(keeper_dist), keeper_dist, np.nan).astype(np.float32),
+    }, index=df.index)
@@ -2,11 +2,84 @@ from __future__ import annotations
 import numpy as np
 import pandas as pd
 
-def add_future_labels(df: pd.DataFrame, k: int = 10) -> pd.DataFrame:
+from tracing import traced
+
+LABEL_COLS = ["is_shot_event", "is_goal_event", "shot_within_k", "goal_within_k"]
+
+def _possession_codes(out: pd.DataFrame) -> np.ndarray:
+    """
+    Group code per row for (match_id, possession), -1 where a key is missing
+    (same rows groupby drops by default).
+    """
+    codes = out.groupby(["match_id", "possession"], sort=False).ngroup()
+    return codes.fillna(-1).to_numpy(dtype=np.int64)
+
+def _any_within_next_k(flags: np.ndarray, codes: np.ndarray, k: int) -> np.ndarray:
+    """
+    For each row t: 1 if any flag is set in the next k rows of the same group, else 0.
+    Rows with code -1 are never labeled. Works on non-contiguous groups (stable sort by code).
+    """
+    n = len(flags)
+    result = np.zeros(n, dtype=np.int64)
+    if n == 0 or k <= 0:
+        return result
+
+    # stable sort keeps the original order inside each group, as groupby.indices does
+    if np.all(codes[1:] >= codes[:-1]):
+        order = None
+        c = codes
+        f = flags
+    else:
+        order = np.argsort(codes, kind="stable")
+        c = codes[order]
+        f = flags[order]
+
+    # group end (exclusive) for every row of the sorted layout
+    starts = np.flatnonzero(np.r_[True, c[1:] != c[:-1]])
+    ends = np.r_[starts[1:], n]
+    group_end = np.repeat(ends, np.diff(np.r_[starts, n]))
+
+    # cs[i] = number of flags in rows [0, i)
+    cs = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(f, out=cs[1:])
+
+    pos = np.arange(n, dtype=np.int64)
+    win_end = np.minimum(group_end, pos + k + 1)
+    hit = (cs[win_end] - cs[pos + 1]) > 0
+    hit &= c >= 0
+
+    if order is None:
+        result[:] = hit
+    else:
+        result[order] = hit
+    return result
+
+@traced("data.add_future_labels")
+def add_future_labels(df: pd.DataFrame, k: int = 10, compact: bool = False) -> pd.DataFrame:
     """
     For each possession event (match_id, possession):
       - shot_within_k = 1 if a shot occurs within the next k possession events
       - goal_within_k = 1 if a shot occurs within the next k events with shot_outcome == "Goal"
+
+    Vectorized: one prefix sum per label over the possession-ordered frame.
+    Output is identical to add_future_labels_loop; compact=True stores the four
+    LABEL_COLS as int8 instead of int64 (same values).
+    """
+    dtype = np.int8 if compact else int
+    out = df.copy()
+    is_shot = (out["type_name"] == "Shot").to_numpy()
+    out["is_shot_event"] = is_shot.astype(dtype)
+    out["is_goal_event"] = (is_shot & (out["shot_outcome"] == "Goal").to_numpy()).astype(dtype)
+
+    codes = _possession_codes(out)
+    out["shot_within_k"] = _any_within_next_k(out["is_shot_event"].to_numpy(), codes, k).astype(dtype, copy=False)
+    out["goal_within_k"] = _any_within_next_k(out["is_goal_event"].to_numpy(), codes, k).astype(dtype, copy=False)
+    return out
+
+def add_future_labels_loop(df: pd.DataFrame, k: int = 10) -> pd.DataFrame:
+    """
+    Reference (per-group Python loop) version of add_future_labels.
+    Kept for parity checks and benchmarks.
     """
     out = df.copy()
     out["is_shot_event"] = (out["type_name"] == "Shot").astype(int)
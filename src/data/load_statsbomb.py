@@ -1,31 +1,199 @@
 from __future__ import annotations
+import json
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator
+
 import pandas as pd
-from statsbombpy import sb
+import pyarrow as pa
+
+from tracing import traced
+
+class StatsBombAPISource:
+    """
+    Events/matches from statsbombpy (open data over HTTP, or the paid API if credentials are set).
+    """
+    def __init__(self, creds: dict | None = None):
+        from statsbombpy import sb
+        self._sb = sb
+        self.creds = creds
+
+    def _kwargs(self) -> dict:
+        return {"creds": self.creds} if self.creds else {}
+
+    def match_ids(self, competition_id: int, season_id: int) -> list[int]:
+        matches = self._sb.matches(competition_id=competition_id, season_id=season_id, **self._kwargs())
+        return matches["match_id"].tolist()
+
+    def events(self, match_id: int) -> pd.DataFrame:
+        return self._sb.events(match_id=match_id, fmt="dataframe", flatten_attrs=True, **self._kwargs())
+
+class LocalOpenDataSource:
+    """
+    Events/matches from a local clone of https://github.com/statsbomb/open-data.
+    root is the folder that contains matches/ and events/ (i.e. open-data/data).
+    Events are flattened like sb.events(fmt="dataframe", flatten_attrs=True).
+    """
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+    def match_ids(self, competition_id: int, season_id: int) -> list[int]:
+        path = self.root / "matches" / str(competition_id) / f"{season_id}.json"
+        with open(path, "r", encoding="utf-8") as f:
+            return [m["match_id"] for m in json.load(f)]
+
+    def events(self, match_id: int) -> pd.DataFrame:
+        path = self.root / "events" / f"{match_id}.json"
+        with open(path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+        return pd.DataFrame([flatten_event(ev) for ev in raw])
+
+def flatten_event(ev: dict) -> dict:
+    """
+    {"type": {"id": 30, "name": "Pass"}, "pass": {"outcome": {"name": ...}, "end_location": [...]}}
+    -> {"type": "Pass", "pass_outcome": ..., "pass_end_location": [...]}
+    """
+    flat = {}
+    for key, val in ev.items():
+        if isinstance(val, dict) and "name" in val:
+            flat[key] = val["name"]
+        elif isinstance(val, dict) and key != "tactics":
+            for sub_key, sub_val in val.items():
+                if isinstance(sub_val, dict) and "name" in sub_val:
+                    sub_val = sub_val["name"]
+                flat[f"{key}_{sub_key}"] = sub_val
+        else:
+            flat[key] = val
+    return flat
+
+def _arrow_safe(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Object columns that Arrow cannot type (e.g. dicts mixed with scalars) are stored as JSON strings.
+    """
+    out = df
+    for c in df.columns:
+        if df[c].dtype != object:
+            continue
+        try:
+            pa.array(df[c], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+            if out is df:
+                out = df.copy()
+            out[c] = df[c].map(lambda v: None if v is None else json.dumps(v, default=str))
+    return out
+
+def _drop_freeze_frame(ev: pd.DataFrame) -> pd.DataFrame:
+    cols = [c for c in ev.columns if "freeze_frame" in c]
+    return ev.drop(columns=cols) if cols else ev
 
+@traced("data.fetch_match")
+def _fetch_match(source, match_id: int, cache_dir: Path | None) -> pd.DataFrame:
+    """
+    Events for one match, read from cache_dir/<match_id>.pkl when present.
+    The cache always stores the full source frame (freeze frames included).
+    """
+    if cache_dir is not None:
+        path = cache_dir / f"{match_id}.pkl"
+        if path.exists():
+            return pd.read_pickle(path)
+
+    ev = source.events(match_id)
+
+    if cache_dir is not None:
+        # atomic write: a killed run never leaves a half-written cache file
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        ev.to_pickle(tmp)
+        os.replace(tmp, path)
+    return ev
+
+def iter_competition_events(
+    competition_id: int,
+    season_id: int,
+    include_freeze_frame: bool = False,
+    source=None,
+    cache_dir: str | Path | None = None,
+    max_workers: int = 8,
+    match_ids: list[int] | None = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yields one events dataframe per match (match order of the source), with match_id added.
+    Matches are fetched by a bounded thread pool; at most 2 * max_workers frames are in flight.
+    match_ids restricts the fetch to a subset of the competition's matches.
+    """
+    if cache_dir is not None:
+        cache_dir = Path(cache_dir)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+
+    source = source if source is not None else StatsBombAPISource()
+    if match_ids is None:
+        match_ids = source.match_ids(competition_id, season_id)
+
+    max_workers = max(1, int(max_workers))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = deque()
+        ids = iter(match_ids)
+
+        def submit_next() -> bool:
+            mid = next(ids, None)
+            if mid is None:
+                return False
+            pending.append((mid, pool.submit(_fetch_match, source, mid, cache_dir)))
+            return True
+
+        for _ in range(2 * max_workers):
+            if not submit_next():
+                break
+
+        while pending:
+            mid, fut = pending.popleft()
+            ev = fut.result()
+            submit_next()
+
+            if not include_freeze_frame:
+                # freeze_frame is huge: drop it per match so it never reaches the concat
+                # (data/freeze_frames.py keeps the player positions as memory-mapped arrays)
+                ev = _drop_freeze_frame(ev)
+            ev["match_id"] = mid
+            yield ev
+
+@traced("data.load_competition_events")
 def load_competition_events(
     competition_id: int,
     season_id: int,
-    include_freeze_frame: bool = False
+    include_freeze_frame: bool = False,
+    source=None,
+    cache_dir: str | Path | None = None,
+    max_workers: int = 8,
 ) -> pd.DataFrame:
     """
     Loads StatsBomb events for a competition and season into a single dataframe.
     Adds match_id.
-    """
-    matches = sb.matches(competition_id=competition_id, season_id=season_id)
-    match_ids = matches["match_id"].tolist()
-
-    all_events = []
-    for mid in match_ids:
-        ev = sb.events(match_id=mid, fmt="dataframe", flatten_attrs=True)
-        ev["match_id"] = mid
-        all_events.append(ev)
 
-    events = pd.concat(all_events, ignore_index=True)
+    source: StatsBombAPISource (default) or LocalOpenDataSource, or any object
+            with match_ids(competition_id, season_id) and events(match_id).
+    cache_dir: per-match on-disk cache; cached matches are never refetched.
 
-    # freeze_frame is huge: we remove it by default to save memory and speed up processing.
-    if not include_freeze_frame:
-        for col in list(events.columns):
-            if "freeze_frame" in col:
-                events.drop(columns=[col], inplace=True, errors="ignore")
-
-    return events
+    Each match is converted to an Arrow table as it arrives and its pandas frame dropped;
+    the tables are converted to one dataframe at the end, releasing Arrow buffers as
+    they are consumed. Peak memory is the Arrow copy of the competition (much smaller
+    than object columns) plus the result, and at most 2 * max_workers match frames in
+    flight, instead of every match frame plus the result. As in the EventStore, lists
+    come back as numpy arrays and object columns Arrow cannot type as JSON strings.
+    To keep only one match in memory, consume iter_competition_events instead.
+    """
+    frames = iter_competition_events(
+        competition_id,
+        season_id,
+        include_freeze_frame=include_freeze_frame,
+        source=source,
+        cache_dir=cache_dir,
+        max_workers=max_workers,
+    )
+    tables = [pa.Table.from_pandas(_arrow_safe(ev), preserve_index=False) for ev in frames]
+    if not tables:
+        return pd.DataFrame()
+    table = pa.concat_tables(tables, promote_options="permissive")
+    del tables
+    return table.to_pandas(split_blocks=True, self_destruct=True)
@@ -0,0 +1,69 @@
+"""
+Memory report and model-input check for the compact-schema mode of
+basic_clean / build_features / add_future_labels (compact=True).
+
+    ref = add_future_labels(build_features(basic_clean(events)))
+    small = add_future_labels(build_features(basic_clean(events, compact=True), compact=True), compact=True)
+    print(compare_memory(ref, small).head(10))
+    check_model_inputs(ref, small)  # raises if any model input moved beyond float32 tolerance
+"""
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+from data.labeling import LABEL_COLS
+from data.preprocessing import FEATURE_COLS
+
+def memory_report(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per column: dtype and MiB (deep, i.e. including Python string objects),
+    largest first.
+    """
+    mib = df.memory_usage(index=False, deep=True) / 2**20
+    report = pd.DataFrame({"dtype": df.dtypes.astype(str), "mib": mib})
+    return report.sort_values("mib", ascending=False).rename_axis("column")
+
+def compare_memory(reference: pd.DataFrame, compact: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-column memory of two versions of a frame plus a TOTAL row; ratio = reference / compact.
+    """
+    ref, small = memory_report(reference), memory_report(compact)
+    out = ref.join(small, how="outer", lsuffix="_reference", rsuffix="_compact")
+    out.loc["TOTAL"] = ["", ref["mib"].sum(), "", small["mib"].sum()]
+    out["ratio"] = out["mib_reference"].astype(float) / out["mib_compact"].astype(float)
+    return out.sort_values("mib_reference", ascending=False)
+
+def check_model_inputs(
+    reference: pd.DataFrame,
+    compact: pd.DataFrame,
+    feature_cols: list[str] = FEATURE_COLS,
+    label_cols: list[str] = LABEL_COLS,
+    rtol: float = 1e-6,
+    atol: float = 1e-4,
+) -> dict:
+    """
+    Checks that the compact frame gives the same model inputs as the reference:
+    X = df[feature_cols].astype(float) within float32 tolerance (rtol, atol) and identical
+    labels. Raises ValueError otherwise; returns {"max_abs_diff", "max_rel_diff", "worst_feature"}.
+    """
+    if len(reference) != len(compact):
+        raise ValueError(f"row counts differ: {len(reference)} vs {len(compact)}")
+
+    X_ref = reference[feature_cols].astype(float).to_numpy()
+    X_new = compact[feature_cols].astype(float).to_numpy()
+    diff = np.abs(X_ref - X_new)
+    rel = diff / np.maximum(np.abs(X_ref), np.finfo(np.float32).tiny)
+    col_max = diff.max(axis=0) if len(diff) else np.zeros(len(feature_cols))
+    worst = feature_cols[int(np.argmax(col_max))]
+    if not np.allclose(X_new, X_ref, rtol=rtol, atol=atol, equal_nan=True):
+        raise ValueError(f"model inputs differ beyond rtol={rtol}, atol={atol}: max |diff| {col_max.max():.3g} in {worst}")
+
+    for c in label_cols:
+        if c in reference.columns and not np.array_equal(reference[c].to_numpy(), compact[c].to_numpy()):
+            raise ValueError(f"label column {c} differs")
+
+    return {
+        "max_abs_diff": float(col_max.max()) if len(col_max) else 0.0,
+        "max_rel_diff": float(rel.max()) if rel.size else 0.0,
+        "worst_feature": worst,
+    }
@@ -1,18 +1,46 @@
 from __future__ import annotations
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+
+from tracing import traced
 
 PITCH_LENGTH = 120.0  # StatsBomb
 PITCH_WIDTH = 80.0
 
+# Model inputs, in the order the scaler and PVNet expect them
+FEATURE_COLS = [
+    "start_x","start_y","end_x","end_y",
+    "dist_to_goal","angle_to_goal_center",
+    "dx","dy","progress_x",
+    "time_seconds",
+    "is_pass","is_carry","is_dribble","is_shot",
+    "pass_success","dribble_success",
+]
+
+# basic_clean string columns: object str by default, categorical with compact=True
+NAME_COLS = ["type_name", "team_name", "possession_team_name", "player_name"]
+
 def _to_float(series: pd.Series) -> pd.Series:
     return pd.to_numeric(series, errors="coerce")
 
-def basic_clean(events: pd.DataFrame) -> pd.DataFrame:
+def str_category(series: pd.Series) -> pd.Categorical:
+    """
+    series.astype(str) as a Categorical (same values, NaN -> "nan"), without building
+    the per-row Python strings: only the distinct values are converted.
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    names, inverse = np.unique(np.asarray(pd.Index(uniques).astype(str), dtype=object), return_inverse=True)
+    return pd.Categorical.from_codes(inverse[codes], categories=names)
+
+@traced("data.basic_clean")
+def basic_clean(events: pd.DataFrame, copy: bool = True, compact: bool = False) -> pd.DataFrame:
     """
     Cleans and creates minimal columns, sorts events by match/period/index.
+    copy=False skips the defensive copy: missing columns are added to `events` itself.
+    compact=True makes the NAME_COLS categoricals instead of object strings (same values).
     """
-    df = events.copy()
+    df = events.copy() if copy else events
 
     needed = [
         "competition_id","season_id",
@@ -31,18 +59,108 @@ def basic_clean(events: pd.DataFrame) -> pd.DataFrame:
     else:
         df = df.sort_values(["match_id", "period", "minute", "second"])
 
-    df["type_name"] = df["type"].astype(str)
-    df["team_name"] = df["team"].astype(str)
-    df["possession_team_name"] = df["possession_team"].astype(str)
-    df["player_name"] = df["player"].astype(str)
+    as_str = str_category if compact else (lambda s: s.astype(str))
+    df["type_name"] = as_str(df["type"])
+    df["team_name"] = as_str(df["team"])
+    df["possession_team_name"] = as_str(df["possession_team"])
+    df["player_name"] = as_str(df["player"])
 
     return df.reset_index(drop=True)
 
 def extract_xy(loc) -> tuple[float, float]:
-    if isinstance(loc, (list, tuple)) and len(loc) >= 2:
+    if isinstance(loc, (list, tuple, np.ndarray)) and len(loc) >= 2:
         return float(loc[0]), float(loc[1])
     return np.nan, np.nan
 
+def _xy_from_arrow_list(arr, dtype) -> tuple[np.ndarray, np.ndarray]:
+    if isinstance(arr, pa.ChunkedArray):
+        arr = arr.combine_chunks()
+    if pa.types.is_fixed_size_list(arr.type):
+        arr = arr.cast(pa.list_(arr.type.value_type))
+
+    n = len(arr)
+    x = np.full(n, np.nan, dtype=dtype)
+    y = np.full(n, np.nan, dtype=dtype)
+
+    # offsets/values are not re-based for sliced arrays, so they index each other directly
+    offsets = arr.offsets.to_numpy()
+    values = arr.values.cast(pa.float64()).to_numpy(zero_copy_only=False)
+    start = offsets[:-1]
+    ok = (np.diff(offsets) >= 2) & arr.is_valid().to_numpy(zero_copy_only=False)
+
+    x[ok] = values[start[ok]]
+    y[ok] = values[start[ok] + 1]
+    return x, y
+
+def decode_xy(values, dtype=np.float32) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized extract_xy: x/y arrays (NaN where the location is missing) from
+      - object Series/arrays of [x, y] lists, tuples or ndarrays
+      - Arrow list arrays (pa.Array, pa.ChunkedArray, or pandas ArrowDtype Series)
+      - already split coordinates: an (N, 2) array or an (x, y) pair of arrays
+    Object columns are converted to Arrow lists in C++; inputs Arrow cannot type
+    (e.g. strings mixed with lists) fall back to extract_xy per element.
+    """
+    if isinstance(values, tuple) and len(values) == 2:
+        return (
+            _to_float(pd.Series(values[0])).to_numpy(dtype=dtype, na_value=np.nan),
+            _to_float(pd.Series(values[1])).to_numpy(dtype=dtype, na_value=np.nan),
+        )
+
+    if isinstance(values, np.ndarray) and values.ndim == 2:
+        return values[:, 0].astype(dtype), values[:, 1].astype(dtype)
+
+    if isinstance(values, pd.Series):
+        values = values.array
+    if isinstance(values, pd.api.extensions.ExtensionArray) and isinstance(values.dtype, pd.ArrowDtype):
+        values = pa.array(values)
+
+    if isinstance(values, (pa.Array, pa.ChunkedArray)):
+        return _xy_from_arrow_list(values, dtype)
+
+    values = np.asarray(values, dtype=object)
+    try:
+        arr = pa.array(values, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+        arr = None
+    if arr is not None and (pa.types.is_list(arr.type) or pa.types.is_large_list(arr.type)) \
+            and (pa.types.is_integer(arr.type.value_type) or pa.types.is_floating(arr.type.value_type)):
+        return _xy_from_arrow_list(arr, dtype)
+    if arr is not None and arr.null_count == len(arr):
+        return np.full(len(values), np.nan, dtype=dtype), np.full(len(values), np.nan, dtype=dtype)
+
+    x = np.full(len(values), np.nan, dtype=dtype)
+    y = np.full(len(values), np.nan, dtype=dtype)
+    for i, loc in enumerate(values):
+        x[i], y[i] = extract_xy(loc)
+    return x, y
+
+def location_xy(df: pd.DataFrame, col: str, dtype=np.float32) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (x, y, present) for a location column; uses <col>_x/<col>_y when the frame is already flattened.
+    present marks non-missing raw values (used to pick the first available end location).
+    """
+    if f"{col}_x" in df.columns and f"{col}_y" in df.columns:
+        x, y = decode_xy((df[f"{col}_x"], df[f"{col}_y"]), dtype=dtype)
+        return x, y, ~np.isnan(x)
+    x, y = decode_xy(df[col], dtype=dtype)
+    return x, y, df[col].notna().to_numpy()
+
+def end_location_xy(df: pd.DataFrame, dtype=np.float32) -> tuple[np.ndarray, np.ndarray]:
+    """
+    End location: pass_end_location, else carry_end_location, else shot_end_location.
+    """
+    ex, ey, present = location_xy(df, "pass_end_location", dtype=dtype)
+    for c in ("carry_end_location", "shot_end_location"):
+        take = ~present
+        if not take.any():
+            break
+        cx, cy, c_present = location_xy(df, c, dtype=dtype)
+        ex[take] = cx[take]
+        ey[take] = cy[take]
+        present = present | c_present
+    return ex, ey
+
 def add_temporal_features(df: pd.DataFrame) -> pd.DataFrame:
     out = df.copy()
     out["minute"] = _to_float(out["minute"]).fillna(0).astype(int)
@@ -53,14 +171,12 @@ def add_temporal_features(df: pd.DataFrame) -> pd.DataFrame:
 def add_spatial_features(df: pd.DataFrame) -> pd.DataFrame:
     out = df.copy()
 
-    sx, sy = zip(*out["location"].apply(extract_xy))
+    # float64 keeps features bit-identical to the historical extract_xy path
+    sx, sy, _ = location_xy(out, "location", dtype=np.float64)
     out["start_x"] = sx
     out["start_y"] = sy
 
-    end_loc = out["pass_end_location"].where(out["pass_end_location"].notna(), out["carry_end_location"])
-    end_loc = end_loc.where(end_loc.notna(), out["shot_end_location"])
-
-    ex, ey = zip(*end_loc.apply(extract_xy))
+    ex, ey = end_location_xy(out, dtype=np.float64)
     out["end_x"] = ex
     out["end_y"] = ey
 
@@ -87,7 +203,108 @@ def add_event_outcome_features(df: pd.DataFrame) -> pd.DataFrame:
     out["dribble_success"] = ((out["is_dribble"] == 1) & (out["dribble_outcome"].isna())).astype(int)
     return out
 
-def build_features(df: pd.DataFrame) -> pd.DataFrame:
+SPATIAL_COLS = [
+    "start_x","start_y","end_x","end_y","dist_to_goal","angle_to_goal_center",
+    "dx","dy","progress_x"
+]
+FLAG_COLS = ["is_pass","is_carry","is_dribble","is_shot","pass_success","dribble_success"]
+
+def compact_features(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compact dtypes for the build_features columns present in df: float32 spatial
+    features, int8 flags, int32 time_seconds, int16 minute/second, categorical names.
+    """
+    dtypes = {c: np.float32 for c in SPATIAL_COLS}
+    dtypes.update({c: np.int8 for c in FLAG_COLS})
+    dtypes.update({"time_seconds": np.int32, "minute": np.int16, "second": np.int16})
+    out = df.astype({c: t for c, t in dtypes.items() if c in df.columns and df[c].dtype != t})
+    for c in NAME_COLS:
+        if c in out.columns and not isinstance(out[c].dtype, pd.CategoricalDtype):
+            out[c] = str_category(out[c])
+    return out
+
+def _build_features_block(df: pd.DataFrame, compact: bool = False) -> pd.DataFrame:
+    """
+    Single pass version of build_features: every derived column is written into
+    preallocated column-major blocks which are attached to df without copying it.
+    minute/second are overwritten in `df`. Output is identical to build_features.
+    compact=True computes the spatial block in float32 and the flags in int8.
+    """
+    n = len(df)
+    derived = ["time_seconds"] + SPATIAL_COLS + FLAG_COLS
+    existing = [c for c in derived if c in df.columns]
+    if existing:
+        df = df.drop(columns=existing)
+
+    # temporal
+    float_dtype, flag_dtype = (np.float32, np.int8) if compact else (np.float64, np.int64)
+    minute = _to_float(df["minute"]).fillna(0).to_numpy().astype(np.int64)
+    second = _to_float(df["second"]).fillna(0).to_numpy().astype(np.int64)
+    time_seconds = minute * 60 + second
+    if compact:
+        minute, second, time_seconds = minute.astype(np.int16), second.astype(np.int16), time_seconds.astype(np.int32)
+    df["minute"] = minute
+    df["second"] = second
+
+    # spatial: one float block, one column per feature
+    block = np.empty((n, len(SPATIAL_COLS)), dtype=float_dtype, order="F")
+    sx, sy, ex, ey, dist, angle, dx, dy, progress = (block[:, j] for j in range(len(SPATIAL_COLS)))
+
+    sx[:], sy[:], _ = location_xy(df, "location", dtype=float_dtype)
+    ex[:], ey[:] = end_location_xy(df, dtype=float_dtype)
+
+    goal_x, goal_y = PITCH_LENGTH, PITCH_WIDTH / 2.0
+    np.subtract(goal_x, sx, out=dx)  # dx/dy used as scratch before their final values
+    np.subtract(goal_y, sy, out=dy)
+    np.square(dx, out=dist)
+    dist += np.square(dy)
+    np.sqrt(dist, out=dist)
+    np.arctan2(dy, dx, out=angle)
+
+    np.subtract(ex, sx, out=dx)
+    np.subtract(ey, sy, out=dy)
+    progress[:] = dx
+    block[np.isnan(block)] = 0.0
+
+    # outcome flags: one int block
+    flags = np.empty((n, len(FLAG_COLS)), dtype=flag_dtype, order="F")
+    type_name = df["type_name"]  # compared as a Series: categoricals compare their codes
+    is_pass = (type_name == "Pass").to_numpy()
+    is_dribble = (type_name == "Dribble").to_numpy()
+    flags[:, 0] = is_pass
+    flags[:, 1] = (type_name == "Carry").to_numpy()
+    flags[:, 2] = is_dribble
+    flags[:, 3] = (type_name == "Shot").to_numpy()
+    # pass_outcome NaN => completato
+    flags[:, 4] = is_pass & df["pass_outcome"].isna().to_numpy()
+    # dribble_outcome NaN => completato
+    flags[:, 5] = is_dribble & df["dribble_outcome"].isna().to_numpy()
+
+    if compact:
+        for c in NAME_COLS:
+            if c in df.columns and not isinstance(df[c].dtype, pd.CategoricalDtype):
+                df[c] = str_category(df[c])
+
+    return pd.concat(
+        [
+            df,
+            pd.DataFrame({"time_seconds": time_seconds}, index=df.index),
+            pd.DataFrame(block, columns=SPATIAL_COLS, index=df.index, copy=False),
+            pd.DataFrame(flags, columns=FLAG_COLS, index=df.index, copy=False),
+        ],
+        axis=1,
+    )
+
+@traced("data.build_features")
+def build_features(df: pd.DataFrame, copy: bool = True, compact: bool = False) -> pd.DataFrame:
+    """
+    copy=False: copy-free single pass (see _build_features_block); `df` is modified.
+    compact=True: float32 features, int8 flags, categorical names (compact_features);
+    model inputs match the default within float32 precision (data/memory.py).
+    """
+    if not copy:
+        return _build_features_block(df, compact=compact)
+
     out = df.copy()
     out = add_temporal_features(out)
     out = add_spatial_features(out)
@@ -100,4 +317,4 @@ def build_features(df: pd.DataFrame) -> pd.DataFrame:
     for c in num_cols:
         out[c] = pd.to_numeric(out[c], errors="coerce").fillna(0.0)
 
-    return out
+    return compact_features(out) if compact else out
@@ -0,0 +1,87 @@
+"""
+Possession sequences for the sequence model (models/pvnet.py SequencePVNet).
+
+Sequences are runs of consecutive rows of one (match_id, possession) - the groups
+add_future_labels labels over - described by offsets into a row array, so X is never
+copied per sequence:
+
+    offsets = possession_sequences(df, train_rows, max_len=cfg.SEQ_MAX_LEN)
+    # sequence s = X[train_rows[offsets[s]:offsets[s + 1]]]
+    batches = bucket_batches(np.diff(offsets), max_tokens=cfg.BATCH_SIZE, rng=rng)
+"""
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+from data.labeling import _possession_codes
+
+def possession_sequences(df: pd.DataFrame, rows=None, max_len: int | None = 64) -> np.ndarray:
+    """
+    Offsets of the possession sequences of df[rows] (all rows if None): sequence s is
+    rows[offsets[s]:offsets[s + 1]]. A sequence is a run of rows that follow each other
+    in df and share (match_id, possession); runs longer than max_len are cut into pieces
+    of max_len events. Rows without a match or possession are sequences of one event.
+    """
+    rows = np.arange(len(df), dtype=np.int64) if rows is None else np.asarray(rows, dtype=np.int64)
+    n = len(rows)
+    if n == 0:
+        return np.zeros(1, dtype=np.int64)
+
+    codes = _possession_codes(df)[rows]
+    new_run = np.ones(n, dtype=bool)
+    new_run[1:] = (codes[1:] != codes[:-1]) | (rows[1:] != rows[:-1] + 1) | (codes[1:] < 0)
+    if max_len is not None:
+        run_start = np.flatnonzero(new_run)
+        pos = np.arange(n) - np.repeat(run_start, np.diff(np.r_[run_start, n]))
+        new_run |= pos % int(max_len) == 0
+    return np.r_[np.flatnonzero(new_run), n].astype(np.int64)
+
+def bucket_batches(
+    lengths: np.ndarray,
+    max_tokens: int,
+    rng: np.random.Generator | None = None,
+    max_pad_frac: float = 0.1,
+) -> list[np.ndarray]:
+    """
+    Sequence ids per batch: sequences sorted by length (random tie-break with rng) and
+    packed so that batch size * longest sequence <= max_tokens (padded tokens per batch,
+    at least one sequence). A batch only mixes lengths within max_pad_frac of its longest
+    sequence, so at most that fraction of any batch is padding.
+    With rng the batch order is shuffled; without it the plan is deterministic.
+    """
+    lengths = np.asarray(lengths, dtype=np.int64)
+    n = len(lengths)
+    if rng is None:
+        order = np.argsort(lengths, kind="stable")
+    else:
+        order = np.lexsort((rng.random(n), lengths))
+    sorted_len = lengths[order]
+
+    batches = []
+    i = 0
+    while i < n:
+        # members at most max_pad_frac shorter than the longest one, and the largest count
+        # whose count * longest fits the budget (lengths grow along the batch)
+        end = np.searchsorted(sorted_len, int(sorted_len[i] / (1.0 - max_pad_frac)), side="right")
+        lo, hi = 1, max(1, min(end - i, max_tokens // sorted_len[i]))
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if mid * sorted_len[i + mid - 1] <= max_tokens:
+                lo = mid
+            else:
+                hi = mid - 1
+        count = lo
+        batches.append(order[i:i + count])
+        i += count
+
+    if rng is not None:
+        batches = [batches[j] for j in rng.permutation(len(batches))]
+    return batches
+
+def padding_waste(lengths: np.ndarray, batches: list[np.ndarray]) -> float:
+    """
+    Fraction of padded positions in a batch plan (0 = no padding).
+    """
+    lengths = np.asarray(lengths, dtype=np.int64)
+    padded = sum(len(b) * int(lengths[b].max()) for b in batches if len(b))
+    return 1.0 - lengths.sum() / padded if padded else 0.0
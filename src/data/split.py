@@ -2,26 +2,123 @@ from __future__ import annotations
 import numpy as np
 import pandas as pd
 
+from tracing import traced
+
+def _shuffled_matches(n_matches: int, seed) -> list[int]:
+    # same permutation split_by_match applies to its list of match ids
+    order = list(range(n_matches))
+    np.random.default_rng(seed).shuffle(order)
+    return order
+
+def _split_sizes(n: int, train_frac: float, val_frac: float, test_frac: float) -> tuple[int, int]:
+    assert abs(train_frac + val_frac + test_frac - 1.0) < 1e-6
+    return int(n * train_frac), int(n * val_frac)
+
+@traced("data.split_by_match")
 def split_by_match(df: pd.DataFrame, train_frac=0.70, val_frac=0.15, test_frac=0.15, seed=42):
     """
     Split per match_id.
     """
-    assert abs(train_frac + val_frac + test_frac - 1.0) < 1e-6
+    codes, match_ids = pd.factorize(df["match_id"])  # first-appearance order, NaN -> -1
+    order = _shuffled_matches(len(match_ids), seed)
+    n_train, n_val = _split_sizes(len(match_ids), train_frac, val_frac, test_frac)
 
-    match_ids = df["match_id"].dropna().unique().tolist()
-    rng = np.random.default_rng(seed)
-    rng.shuffle(match_ids)
+    # one pass over the rows: split of every match, then of every row
+    split_of_match = np.empty(len(match_ids), dtype=np.int8)
+    split_of_match[order[:n_train]] = 0
+    split_of_match[order[n_train:n_train + n_val]] = 1
+    split_of_match[order[n_train + n_val:]] = 2
+    split_of_row = np.where(codes >= 0, split_of_match[codes], -1)
 
-    n = len(match_ids)
-    n_train = int(n * train_frac)
-    n_val = int(n * val_frac)
+    train_df = df.iloc[np.flatnonzero(split_of_row == 0)].reset_index(drop=True)
+    val_df = df.iloc[np.flatnonzero(split_of_row == 1)].reset_index(drop=True)
+    test_df = df.iloc[np.flatnonzero(split_of_row == 2)].reset_index(drop=True)
 
-    train_ids = set(match_ids[:n_train])
-    val_ids = set(match_ids[n_train:n_train+n_val])
-    test_ids = set(match_ids[n_train+n_val:])
+    return train_df, val_df, test_df
 
-    train_df = df[df["match_id"].isin(train_ids)].reset_index(drop=True)
-    val_df = df[df["match_id"].isin(val_ids)].reset_index(drop=True)
-    test_df = df[df["match_id"].isin(test_ids)].reset_index(drop=True)
+class MatchIndex:
+    """
+    Row offsets of every match in a frame whose matches are contiguous blocks of rows
+    (order_by_match): match i owns rows offsets[i]:offsets[i + 1].
 
-    return train_df, val_df, test_df
+    Splits and folds are row index arrays (or slices) into that frame and the arrays built
+    from it, so no split is ever materialized: pass them to make_loader(..., rows=...)
+    or take df.iloc[rows] only where a frame is needed.
+    """
+    def __init__(self, match_ids: np.ndarray, offsets: np.ndarray):
+        self.match_ids = np.asarray(match_ids)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, col: str = "match_id") -> "MatchIndex":
+        ids = df[col].to_numpy()
+        if pd.isna(ids).any():
+            raise ValueError(f"{col} has missing values; use order_by_match to drop them")
+        starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]]) if len(ids) else np.zeros(0, dtype=np.int64)
+        match_ids = ids[starts]
+        if len(pd.unique(match_ids)) != len(match_ids):
+            raise ValueError(f"rows of a {col} are not contiguous; use order_by_match first")
+        return cls(match_ids, np.r_[starts, len(ids)])
+
+    def __len__(self):
+        return len(self.match_ids)
+
+    @property
+    def n_rows(self) -> int:
+        return int(self.offsets[-1])
+
+    def match_rows(self, i: int) -> slice:
+        return slice(int(self.offsets[i]), int(self.offsets[i + 1]))
+
+    def rows(self, matches) -> np.ndarray:
+        """
+        Row indices of the given match positions, in row order.
+        """
+        matches = np.sort(np.asarray(matches, dtype=np.int64))
+        start, length = self.offsets[matches], self.offsets[matches + 1] - self.offsets[matches]
+        # arange over every block at once: shift a global arange by each block's start
+        return np.arange(length.sum()) + np.repeat(start - (np.cumsum(length) - length), length)
+
+    def split(self, train_frac=0.70, val_frac=0.15, test_frac=0.15, seed=42):
+        """
+        (train_rows, val_rows, test_rows): the same matches split_by_match puts in each split
+        for this frame, as row indices instead of copied frames.
+        """
+        order = _shuffled_matches(len(self), seed)
+        n_train, n_val = _split_sizes(len(self), train_frac, val_frac, test_frac)
+        return (
+            self.rows(order[:n_train]),
+            self.rows(order[n_train:n_train + n_val]),
+            self.rows(order[n_train + n_val:]),
+        )
+
+    def kfold(self, n_folds: int = 5, seed=42) -> list[tuple[np.ndarray, np.ndarray]]:
+        """
+        Grouped k-fold: [(train_rows, val_rows)] per fold; every match is in the validation
+        rows of exactly one fold and never in train and val of the same fold.
+        """
+        if not 2 <= n_folds <= len(self):
+            raise ValueError(f"n_folds must be in [2, {len(self)}], got {n_folds}")
+        groups = np.array_split(np.asarray(_shuffled_matches(len(self), seed)), n_folds)
+        folds = []
+        for k in range(n_folds):
+            train = np.concatenate([g for j, g in enumerate(groups) if j != k])
+            folds.append((self.rows(train), self.rows(groups[k])))
+        return folds
+
+@traced("data.order_by_match")
+def order_by_match(df: pd.DataFrame, col: str = "match_id") -> tuple[pd.DataFrame, MatchIndex]:
+    """
+    (frame with contiguous matches, its MatchIndex). Rows without a match are dropped.
+    Frames that are already match-contiguous (event store / streaming output) are
+    returned as they are; otherwise rows are stably regrouped by first appearance of
+    their match (one copy), keeping the event order inside every match.
+    """
+    if df[col].isna().any():
+        df = df[df[col].notna()].reset_index(drop=True)
+    try:
+        return df, MatchIndex.from_frame(df, col)
+    except ValueError:
+        codes, _ = pd.factorize(df[col])
+        df = df.iloc[np.argsort(codes, kind="stable")].reset_index(drop=True)
+        return df, MatchIndex.from_frame(df, col)
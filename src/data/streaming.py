@@ -0,0 +1,187 @@
+from __future__ import annotations
+import tempfile
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from data.labeling import add_future_labels
+from data.load_statsbomb import StatsBombAPISource, iter_competition_events
+from data.preprocessing import FLAG_COLS, SPATIAL_COLS, basic_clean, build_features, compact_features
+from tracing import traced
+
+_LOCATION = pa.list_(pa.float64())
+
+# Fixed projection (columns and Arrow types) for write_processed_parquet(schema=STREAM_SCHEMA):
+# the columns the model, labels and dashboard read, typed the same in every row group.
+STREAM_SCHEMA = pa.schema(
+    [
+        ("competition_id", pa.int64()),
+        ("season_id", pa.int64()),
+        ("match_id", pa.int64()),
+        ("period", pa.int64()),
+        ("index", pa.int64()),
+        ("minute", pa.int64()),
+        ("second", pa.int64()),
+        ("timestamp", pa.string()),
+        ("possession", pa.int64()),
+        ("team_name", pa.string()),
+        ("possession_team_name", pa.string()),
+        ("player_name", pa.string()),
+        ("type_name", pa.string()),
+        ("location", _LOCATION),
+        ("pass_end_location", _LOCATION),
+        ("carry_end_location", _LOCATION),
+        ("shot_end_location", _LOCATION),
+        ("pass_outcome", pa.string()),
+        ("dribble_outcome", pa.string()),
+        ("shot_outcome", pa.string()),
+        ("time_seconds", pa.int64()),
+    ]
+    + [(c, pa.float64()) for c in SPATIAL_COLS]
+    + [(c, pa.int64()) for c in FLAG_COLS]
+    + [
+        ("is_shot_event", pa.int64()),
+        ("is_goal_event", pa.int64()),
+        ("shot_within_k", pa.int64()),
+        ("goal_within_k", pa.int64()),
+    ]
+)
+
+def process_match(events: pd.DataFrame, k: int = 10, compact: bool = False) -> pd.DataFrame:
+    """
+    basic_clean -> build_features -> add_future_labels on the events of one match
+    (or of several complete matches). Every step is per match, so this equals the
+    rows of those matches in the batch pipeline. `events` is consumed (modified).
+    compact=True runs every step in compact-schema mode (categoricals, float32, int8).
+    """
+    df = basic_clean(events, copy=False, compact=compact)
+    df = build_features(df, copy=False, compact=compact)
+    return add_future_labels(df, k=k, compact=compact)
+
+def iter_processed_matches(
+    frames: Iterable[pd.DataFrame],
+    k: int = 10,
+    batch_matches: int = 1,
+    compact: bool = False,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yields featurized + labeled events, batch_matches matches at a time.
+    frames: raw events, one (or more complete) match per frame, e.g. iter_competition_events.
+    Only the current batch is held in memory. Values equal the batch pipeline; object
+    column dtypes can differ when a match lacks a column the others have.
+    """
+    def combine(batch):
+        if len(batch) == 1:
+            return batch[0]
+        df = pd.concat(batch, ignore_index=True)
+        # categoricals with different categories concatenate to object: re-encode once per batch
+        return compact_features(df) if compact else df
+
+    batch = []
+    for ev in frames:
+        batch.append(process_match(ev, k=k, compact=compact))
+        if len(batch) >= batch_matches:
+            yield combine(batch)
+            batch = []
+    if batch:
+        yield combine(batch)
+
+def iter_competitions_events(
+    competitions: Iterable[tuple[int, int]],
+    source=None,
+    cache_dir: str | Path | None = None,
+    max_workers: int = 8,
+) -> Iterator[pd.DataFrame]:
+    """
+    Raw events of several (competition_id, season_id), one match per frame, in ascending
+    match_id across all competitions: the row order basic_clean gives the concatenated events.
+    """
+    source = source if source is not None else StatsBombAPISource()
+
+    keyed = sorted(
+        (int(mid), comp, season)
+        for comp, season in competitions
+        for mid in source.match_ids(comp, season)
+    )
+
+    # consecutive matches of the same competition are fetched by one pool
+    i = 0
+    while i < len(keyed):
+        _, comp, season = keyed[i]
+        j = i
+        while j < len(keyed) and keyed[j][1:] == (comp, season):
+            j += 1
+        for ev in iter_competition_events(
+            comp,
+            season,
+            source=source,
+            cache_dir=cache_dir,
+            max_workers=max_workers,
+            match_ids=[mid for mid, _, _ in keyed[i:j]],
+        ):
+            ev["competition_id"] = comp
+            ev["season_id"] = season
+            yield ev
+        i = j
+
+def _align(table: pa.Table, schema: pa.Schema) -> pa.Table:
+    # schema's columns in its order, the ones table lacks as nulls
+    n = len(table)
+    columns = [
+        table.column(f.name).cast(f.type) if f.name in table.column_names else pa.nulls(n, f.type)
+        for f in schema
+    ]
+    return pa.Table.from_arrays(columns, schema=schema)
+
+@traced("data.write_processed_parquet", rows=lambda n_rows, *args, **kwargs: n_rows)
+def write_processed_parquet(
+    frames: Iterable[pd.DataFrame],
+    path: str | Path,
+    k: int = 10,
+    batch_matches: int = 8,
+    schema: pa.Schema | None = None,
+    compact: bool = False,
+) -> int:
+    """
+    Streams processed matches into one Parquet file (a row group per batch).
+    Memory stays at one batch regardless of the number of matches. Returns rows written.
+
+    schema=None writes every processed column, like the batch pipeline: the first batch's
+    columns, then columns first seen in later batches; a batch lacking a column gets nulls,
+    and a column that is all-null in one batch takes its type from the others. Batches are
+    spooled to temporary part files until the schema is known, then copied into path.
+    schema=STREAM_SCHEMA (or any schema) writes that projection directly instead.
+    compact=True processes in compact-schema mode (see process_match).
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    batches = iter_processed_matches(frames, k=k, batch_matches=batch_matches, compact=compact)
+
+    n_rows = 0
+    if schema is not None:
+        with pq.ParquetWriter(path, schema) as writer:
+            for df in batches:
+                table = pa.Table.from_pandas(df[[c for c in schema.names if c in df.columns]], preserve_index=False)
+                writer.write_table(_align(table, schema))
+                n_rows += len(df)
+        return n_rows
+
+    with tempfile.TemporaryDirectory(dir=path.parent, prefix=f".{path.name}.") as tmp:
+        parts, schemas = [], []
+        for df in batches:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            parts.append(Path(tmp) / f"part-{len(parts):05d}.parquet")
+            pq.write_table(table, parts[-1])
+            schemas.append(table.schema.remove_metadata())
+            n_rows += len(df)
+        if not parts:
+            return 0
+
+        schema = pa.unify_schemas(schemas, promote_options="permissive")
+        with pq.ParquetWriter(path, schema) as writer:
+            for part in parts:
+                writer.write_table(_align(pq.read_table(part), schema))
+    return n_rows
@@ -0,0 +1 @@
+# empty
\ No newline at end of file
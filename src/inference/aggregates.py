@@ -0,0 +1,137 @@
+"""
+Pre-aggregated dashboard artifacts built from test_predictions.parquet.
+
+The Match Analysis and Pitch Maps pages read these per-(match_id, team_name)
+tables instead of the full event table:
+
+  - dashboard_match_index.parquet   one row per (match, team): events, non-zero actions, value total
+  - dashboard_timeline.parquet      value per minute_bucket + cumulative value
+  - dashboard_top_actions.parquet   top-N actions by value
+  - dashboard_actions.parquet       non-zero value actions, only the columns the pitch maps draw
+  - dashboard_value_grid.npz        binned value sums/counts for the heatmaps (inference/value_grid.py)
+
+All tables are sorted by (team_name, match_id) and written in small row groups, so
+the dashboard's filtered reads (utils/io.py) skip every row group of other teams/matches
+using the Parquet min/max statistics. write_sorted_parquet does the same for
+test_predictions.parquet.
+"""
+from __future__ import annotations
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from inference.value_grid import write_value_grid
+from tracing import traced
+
+VALUE_COL = "action_value_dashboard"
+KEYS = ["team_name", "match_id"]
+
+MATCH_INDEX_FILE = "dashboard_match_index.parquet"
+TIMELINE_FILE = "dashboard_timeline.parquet"
+TOP_ACTIONS_FILE = "dashboard_top_actions.parquet"
+ACTIONS_FILE = "dashboard_actions.parquet"
+
+# rows per row group of the dashboard files: a (team, match) slice spans one or two groups
+DASHBOARD_ROW_GROUP_ROWS = 16384
+
+# columns of prediction files needed to build every table
+SOURCE_COLS = [
+    "match_id", "team_name", "player_name", "type_name", "minute", "second", "minute_bucket",
+    "start_x", "start_y", "end_x", "end_y", "p_shot", "p_goal", VALUE_COL,
+]
+TOP_ACTION_COLS = [
+    "match_id", "minute", "second", "team_name", "player_name", "type_name",
+    "start_x", "start_y", "end_x", "end_y", "p_shot", "p_goal", VALUE_COL,
+]
+ACTION_COLS = [
+    "match_id", "team_name", "player_name", "type_name", "minute", "second",
+    "start_x", "start_y", "end_x", "end_y", VALUE_COL,
+]
+_FLOAT32_COLS = ["start_x", "start_y", "end_x", "end_y", "p_shot", "p_goal"]
+_CATEGORY_COLS = ["team_name", "player_name", "type_name"]
+
+def _compact(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.reset_index(drop=True)
+    for c in df.columns:
+        if c in _FLOAT32_COLS:
+            df[c] = df[c].astype(np.float32)
+        elif c in _CATEGORY_COLS:
+            df[c] = df[c].astype("category")
+    return df
+
+def write_sorted_parquet(
+    df: pd.DataFrame,
+    path: str | Path,
+    sort_by: list[str] = KEYS,
+    row_group_size: int = DASHBOARD_ROW_GROUP_ROWS,
+) -> Path:
+    """
+    Writes df sorted by sort_by (stable: row order within a key is kept) in row groups of
+    row_group_size rows, with statistics, so filters on sort_by prune row groups on read.
+    """
+    df = df.sort_values(sort_by, kind="stable")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pq.write_table(table, path, row_group_size=int(row_group_size), write_statistics=True)
+    return Path(path)
+
+@traced("inference.build_dashboard_aggregates", rows=None)
+def build_dashboard_aggregates(preds: pd.DataFrame, top_n: int = 30) -> dict[str, pd.DataFrame]:
+    """
+    {file name: table} for the dashboard pages (see module docstring).
+    preds: scored events (score_frame / test_predictions.parquet columns).
+    """
+    d = preds[[c for c in SOURCE_COLS if c in preds.columns]]
+    d = d[d["team_name"].notna() & d["match_id"].notna()]
+    value = d[VALUE_COL]
+    nonzero = value != 0.0
+
+    match_index = (
+        d.assign(_nonzero=nonzero)
+        .groupby(KEYS, sort=True)
+        .agg(events=(VALUE_COL, "size"), actions=("_nonzero", "sum"), value_total=(VALUE_COL, "sum"))
+        .reset_index()
+    )
+
+    timeline = d.groupby(KEYS + ["minute_bucket"], sort=True)[VALUE_COL].sum().reset_index()
+    timeline["cum_value"] = timeline.groupby(KEYS, sort=False)[VALUE_COL].cumsum()
+
+    top_actions = (
+        d.sort_values(VALUE_COL, ascending=False, kind="stable")
+        .groupby(KEYS, sort=False)
+        .head(int(top_n))
+    )
+    top_actions = top_actions.sort_values(KEYS + [VALUE_COL], ascending=[True, True, False], kind="stable")
+    top_actions = top_actions[[c for c in TOP_ACTION_COLS if c in top_actions.columns]]
+
+    actions = d[nonzero]
+    actions = actions.sort_values(KEYS, kind="stable")[[c for c in ACTION_COLS if c in actions.columns]]
+
+    return {
+        MATCH_INDEX_FILE: match_index,
+        TIMELINE_FILE: timeline,
+        TOP_ACTIONS_FILE: _compact(top_actions),
+        ACTIONS_FILE: _compact(actions),
+    }
+
+def write_dashboard_aggregates(preds: pd.DataFrame, artifacts_dir: str | Path, top_n: int = 30) -> list[Path]:
+    """
+    Writes the aggregate tables and the value grid next to test_predictions.parquet. Returns their paths.
+    """
+    artifacts_dir = Path(artifacts_dir)
+    artifacts_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for name, table in build_dashboard_aggregates(preds, top_n=top_n).items():
+        paths.append(write_sorted_parquet(table, artifacts_dir / name))
+    paths.append(write_value_grid(preds, artifacts_dir, value_col=VALUE_COL))
+    return paths
+
+def write_dashboard_aggregates_from_parquet(predictions_path: str | Path, artifacts_dir: str | Path, top_n: int = 30) -> list[Path]:
+    """
+    Same as write_dashboard_aggregates, reading only the needed columns of a predictions file.
+    """
+    available = set(pq.read_schema(predictions_path).names)
+    preds = pd.read_parquet(predictions_path, columns=[c for c in SOURCE_COLS if c in available])
+    return write_dashboard_aggregates(preds, artifacts_dir, top_n=top_n)
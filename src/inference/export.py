@@ -0,0 +1,208 @@
+"""
+CPU deployment artifacts for a trained PVNet.
+
+    cd src
+    python -m inference.export --artifacts ../artifacts [--int8] [--no-onnx]
+
+Writes next to model.pth:
+  - pvnet_scorer.pt        TorchScript, raw features -> [p_shot, p_goal]
+  - pvnet_scorer.onnx      same graph in ONNX (input "features", output "probs")
+  - pvnet_scorer_int8.pt   optional dynamic-int8 TorchScript variant
+
+The StandardScaler is folded into the first Linear and dropout is removed,
+so a scoring call is a single forward pass on unscaled features (the int8
+variant keeps standardization as a float op in front of the quantized layers).
+"""
+from __future__ import annotations
+import argparse
+import copy
+from pathlib import Path
+
+import joblib
+import numpy as np
+import torch
+import torch.nn as nn
+
+from config import Config
+from inference.predict import load_model, predict_proba
+import tracing
+from tracing import traced
+
+SCORER_TS = "pvnet_scorer.pt"
+SCORER_ONNX = "pvnet_scorer.onnx"
+SCORER_INT8_TS = "pvnet_scorer_int8.pt"
+
+class Standardize(nn.Module):
+    """
+    (x - mean) / scale as a float affine op, kept in front of the int8 layers.
+    """
+    def __init__(self, mean: np.ndarray, scale: np.ndarray):
+        super().__init__()
+        self.register_buffer("inv_scale", torch.as_tensor(1.0 / scale, dtype=torch.float32))
+        self.register_buffer("shift", torch.as_tensor(-mean / scale, dtype=torch.float32))
+
+    def forward(self, x):
+        return x * self.inv_scale + self.shift
+
+def _scaler_stats(scaler, n_in: int) -> tuple[np.ndarray, np.ndarray]:
+    mean = getattr(scaler, "mean_", None)
+    scale = getattr(scaler, "scale_", None)
+    mean = np.zeros(n_in) if mean is None else np.asarray(mean, dtype=np.float64)
+    scale = np.ones(n_in) if scale is None else np.asarray(scale, dtype=np.float64)
+    return mean, scale
+
+def fold_scaler(model, scaler) -> nn.Sequential:
+    """
+    Eval-only copy of PVNet taking unscaled features and returning probabilities:
+    Linear(W / scale, b - W @ (mean / scale)) -> ReLU -> Linear -> ReLU -> Linear -> Sigmoid.
+    """
+    layers = [copy.deepcopy(m) for m in model.net if not isinstance(m, nn.Dropout)]
+    first = layers[0]
+
+    W = first.weight.detach().double()
+    b = first.bias.detach().double()
+    mean, scale = (torch.as_tensor(a) for a in _scaler_stats(scaler, W.shape[1]))
+
+    # W @ ((x - mean) / scale) + b == (W / scale) @ x + (b - W @ (mean / scale))
+    with torch.no_grad():
+        first.weight.copy_((W / scale).to(first.weight.dtype))
+        first.bias.copy_((b - W @ (mean / scale)).to(first.bias.dtype))
+
+    scorer = nn.Sequential(*layers, nn.Sigmoid()).cpu().eval()
+    for p in scorer.parameters():
+        p.requires_grad_(False)
+    return scorer
+
+def quantize_int8(model, scaler) -> nn.Module:
+    """
+    Dynamic int8 quantization of the Linear layers (per-channel int8 weights, activations quantized per batch).
+    The scaler is NOT folded here: raw features span very different ranges (time_seconds vs flags)
+    and per-tensor int8 activations would wipe out the small ones, so standardization stays in float.
+    """
+    layers = [copy.deepcopy(m) for m in model.net if not isinstance(m, nn.Dropout)]
+    mean, scale = _scaler_stats(scaler, layers[0].in_features)
+    scorer = nn.Sequential(Standardize(mean, scale), *layers, nn.Sigmoid()).cpu().eval()
+    qconfig = torch.ao.quantization.per_channel_dynamic_qconfig
+    return torch.ao.quantization.quantize_dynamic(scorer, {nn.Linear: qconfig}, dtype=torch.qint8)
+
+def export_torchscript(scorer: nn.Module, path: str | Path, in_dim: int) -> Path:
+    example = torch.zeros(2, in_dim, dtype=torch.float32)
+    with torch.no_grad():
+        ts = torch.jit.freeze(torch.jit.trace(scorer, example))
+    ts.save(str(path))
+    return Path(path)
+
+def export_onnx(scorer: nn.Module, path: str | Path, in_dim: int) -> Path:
+    example = torch.zeros(2, in_dim, dtype=torch.float32)
+    torch.onnx.export(
+        scorer,
+        (example,),
+        str(path),
+        input_names=["features"],
+        output_names=["probs"],
+        dynamic_axes={"features": {0: "batch"}, "probs": {0: "batch"}},
+        dynamo=False,
+    )
+    return Path(path)
+
+def parity(reference_probs: np.ndarray, probs: np.ndarray) -> dict:
+    """
+    Max/mean absolute difference of p_shot and p_goal against the eager model.
+    """
+    diff = np.abs(np.asarray(probs, dtype=np.float64) - reference_probs.astype(np.float64))
+    return {
+        "p_shot_max_abs": float(diff[:, 0].max()),
+        "p_goal_max_abs": float(diff[:, 1].max()),
+        "mean_abs": float(diff.mean()),
+    }
+
+def check_parity(path: Path, report: dict, atol: float) -> None:
+    """
+    Deletes the artifact at path and raises ValueError when its max |diff| exceeds atol.
+    """
+    worst = max(report["p_shot_max_abs"], report["p_goal_max_abs"])
+    if worst > atol:
+        path.unlink(missing_ok=True)
+        raise ValueError(f"{path.name} differs from the eager model by up to {worst:.2e} (> atol {atol:.0e}); "
+                         "artifact deleted")
+
+@traced("inference.export_all", rows=None)
+def export_all(
+    artifacts_dir: str | Path,
+    X_check: np.ndarray | None = None,
+    int8: bool = False,
+    onnx: bool = True,
+    atol: float = 1e-5,
+    int8_atol: float = 0.1,
+) -> dict:
+    """
+    Builds the folded scorer, writes the artifacts next to model.pth and checks parity
+    with the eager model + scaler on X_check (unscaled features; random if None).
+    An artifact whose max |dp| exceeds atol (int8_atol for the int8 variant, which is
+    ~0.06 off on synthetic events) is deleted and ValueError raised (check_parity).
+    Returns {artifact name: parity dict}.
+    """
+    artifacts_dir = Path(artifacts_dir)
+    model, meta = load_model(artifacts_dir / "model.pth")
+    if meta.get("arch") == "sequence":
+        raise ValueError("only per-event PVNet checkpoints are supported here; score SequencePVNet with inference.predict")
+    scaler = joblib.load(artifacts_dir / "scaler.joblib")
+    in_dim = meta["in_dim"]
+
+    if X_check is None:
+        rng = np.random.default_rng(0)
+        X_check = scaler.mean_ + rng.standard_normal((4096, in_dim)) * scaler.scale_
+    X_check = np.asarray(X_check, dtype=np.float64)
+    reference = predict_proba(model, scaler.transform(X_check))
+    x = torch.as_tensor(X_check, dtype=torch.float32)
+
+    scorer = fold_scaler(model, scaler)
+    report = {}
+
+    path = export_torchscript(scorer, artifacts_dir / SCORER_TS, in_dim)
+    with torch.no_grad():
+        report[path.name] = parity(reference, torch.jit.load(str(path))(x).numpy())
+    check_parity(path, report[path.name], atol)
+
+    if onnx:
+        import onnxruntime as ort
+        path = export_onnx(scorer, artifacts_dir / SCORER_ONNX, in_dim)
+        sess = ort.InferenceSession(str(path), providers=["CPUExecutionProvider"])
+        report[path.name] = parity(reference, sess.run(None, {"features": X_check.astype(np.float32)})[0])
+        del sess
+        check_parity(path, report[path.name], atol)
+
+    if int8:
+        path = export_torchscript(quantize_int8(model, scaler), artifacts_dir / SCORER_INT8_TS, in_dim)
+        with torch.no_grad():
+            report[path.name] = parity(reference, torch.jit.load(str(path))(x).numpy())
+        check_parity(path, report[path.name], int8_atol)
+
+    return report
+
+def main():
+    cfg = Config()
+    ap = argparse.ArgumentParser(description="Export PVNet (scaler folded) to TorchScript/ONNX.")
+    ap.add_argument("--artifacts", default=str(cfg.ARTIFACTS_DIR), help="folder with model.pth and scaler.joblib")
+    ap.add_argument("--int8", action="store_true", help="also write the dynamic-int8 TorchScript variant")
+    ap.add_argument("--no-onnx", action="store_true", help="skip ONNX (needs onnx + onnxruntime)")
+    ap.add_argument("--atol", type=float, default=1e-5, help="max |dp| of the fp32 artifacts vs the eager model")
+    ap.add_argument("--int8-atol", type=float, default=0.1, help="max |dp| of the int8 artifact")
+    ap.add_argument("--profile", action="store_true", help="write a per-stage timing report (tracing.py)")
+    args = ap.parse_args()
+    cfg.PROFILE = cfg.PROFILE or args.profile
+    tracing.configure(cfg)
+
+    try:
+        report = export_all(args.artifacts, int8=args.int8, onnx=not args.no_onnx,
+                            atol=args.atol, int8_atol=args.int8_atol)
+    except ValueError as e:
+        raise SystemExit(f"export failed: {e}")
+    for name, r in report.items():
+        print(f"{name}: max|dp_shot|={r['p_shot_max_abs']:.2e} max|dp_goal|={r['p_goal_max_abs']:.2e}")
+    paths = tracing.write_report(Path(args.artifacts) / "profiles")
+    if paths:
+        print(f"Profile: {paths[0]}")
+
+if __name__ == "__main__":
+    main()
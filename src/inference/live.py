@@ -0,0 +1,376 @@
+"""
+Live action valuation: an asyncio service that scores StatsBomb-style events as they arrive.
+
+    cd src
+    python -m inference.live --artifacts ../artifacts --feed open-data/data/events/3788741.json --rate 2000
+
+Events can be raw open-data JSON (nested {"type": {"name": ...}, "pass": {...}}) or flattened
+like sb.events rows. Features are computed per event exactly as build_features does; the
+"before" value comes from the last scored event of the same (match_id, possession).
+Future-event labels do not exist live, so action_value_dashboard only uses the action mask
+(movement actions with an end location). Events without a location are skipped, as in the
+batch path, so they never become the "before" state of the next event.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import gc
+import json
+import math
+import time
+from pathlib import Path
+from typing import AsyncIterator, Callable
+
+import joblib
+import numpy as np
+import pandas as pd
+import torch
+
+from config import Config
+from data.load_statsbomb import flatten_event
+from data.preprocessing import FEATURE_COLS, PITCH_LENGTH, PITCH_WIDTH, extract_xy
+from inference.export import fold_scaler
+from inference.predict import VALID_ACTIONS, load_model
+
+END_LOCATION_KEYS = ("pass_end_location", "carry_end_location", "shot_end_location")
+
+def _is_missing(v) -> bool:
+    return v is None or (isinstance(v, float) and math.isnan(v))
+
+def _as_int(v) -> int:
+    try:
+        f = float(v)
+    except (TypeError, ValueError):
+        return 0
+    return 0 if math.isnan(f) else int(f)
+
+def normalize_event(ev: dict) -> dict:
+    """
+    Flattened event dict (sb.events row layout) from raw open-data JSON or an already flat dict.
+    """
+    if any(isinstance(ev.get(k), dict) for k in ("type", "pass", "carry", "shot", "dribble")):
+        return flatten_event(ev)
+    return ev
+
+def events_features(events: list[dict], feature_cols: list[str] = FEATURE_COLS) -> np.ndarray:
+    """
+    build_features for a batch of flattened events: (len(events), len(feature_cols)) float64.
+    Same numpy operations as the batch path, so values match it exactly.
+    """
+    n = len(events)
+    minute = np.array([_as_int(ev.get("minute")) for ev in events], dtype=np.int64)
+    second = np.array([_as_int(ev.get("second")) for ev in events], dtype=np.int64)
+
+    start = np.array([extract_xy(ev.get("location")) for ev in events], dtype=np.float64).reshape(n, 2)
+    end = np.array(
+        [extract_xy(next((ev[k] for k in END_LOCATION_KEYS if not _is_missing(ev.get(k))), None)) for ev in events],
+        dtype=np.float64,
+    ).reshape(n, 2)
+    sx, sy = start[:, 0], start[:, 1]
+    ex, ey = end[:, 0], end[:, 1]
+
+    goal_x, goal_y = PITCH_LENGTH, PITCH_WIDTH / 2.0
+    dx = ex - sx
+    type_name = np.array([str(ev.get("type")) for ev in events], dtype=object)
+    is_pass = type_name == "Pass"
+    is_dribble = type_name == "Dribble"
+    # pass_outcome / dribble_outcome missing => completato
+    pass_ok = np.array([_is_missing(ev.get("pass_outcome")) for ev in events], dtype=bool)
+    dribble_ok = np.array([_is_missing(ev.get("dribble_outcome")) for ev in events], dtype=bool)
+
+    feats = {
+        "start_x": sx,
+        "start_y": sy,
+        "end_x": ex,
+        "end_y": ey,
+        "dist_to_goal": np.sqrt((goal_x - sx)**2 + (goal_y - sy)**2),
+        "angle_to_goal_center": np.arctan2(goal_y - sy, goal_x - sx),
+        "dx": dx,
+        "dy": ey - sy,
+        "progress_x": dx,
+        "time_seconds": minute * 60 + second,
+        "is_pass": is_pass,
+        "is_carry": type_name == "Carry",
+        "is_dribble": is_dribble,
+        "is_shot": type_name == "Shot",
+        "pass_success": is_pass & pass_ok,
+        "dribble_success": is_dribble & dribble_ok,
+    }
+    X = np.column_stack([np.asarray(feats[c], dtype=np.float64) for c in feature_cols]) if n else np.zeros((0, len(feature_cols)))
+    return np.nan_to_num(X, nan=0.0, posinf=np.inf, neginf=-np.inf)
+
+class LiveScorer:
+    """
+    Synchronous core: per-match possession state + batched forward pass.
+    state[match_id] = (possession, p_shot, p_goal) of the last scored event.
+    """
+    def __init__(self, model, scaler, feature_cols: list[str] = FEATURE_COLS, w_goal: float = 5.0, eps: float = 0.005):
+        self.scorer = fold_scaler(model, scaler)
+        self.feature_cols = feature_cols
+        self.w_goal = w_goal
+        self.eps = eps
+        self.state = {}
+
+    @classmethod
+    def from_artifacts(cls, artifacts_dir: str | Path, w_goal: float = 5.0, eps: float = 0.005) -> "LiveScorer":
+        artifacts_dir = Path(artifacts_dir)
+        model, meta = load_model(artifacts_dir / "model.pth")
+        if meta.get("arch") == "sequence":
+            raise ValueError("only per-event PVNet checkpoints are supported here; score SequencePVNet with inference.predict")
+        scaler = joblib.load(artifacts_dir / "scaler.joblib")
+        scorer = cls(model, scaler, feature_cols=meta["feature_cols"], w_goal=w_goal, eps=eps)
+        scorer.warmup()
+        return scorer
+
+    def warmup(self) -> None:
+        """
+        One throwaway forward pass, so the first real event does not pay for lazy initialization.
+        """
+        self.score([{"match_id": None, "type": "Pass", "location": [60.0, 40.0]}])
+        self.state.clear()
+
+    def end_match(self, match_id) -> None:
+        self.state.pop(match_id, None)
+
+    @torch.no_grad()
+    def score(self, events: list[dict]) -> list[dict | None]:
+        """
+        Scores events (in arrival order) with one forward pass and updates the possession state.
+        Returns one result per event; None for events without a location, which are neither
+        scored nor used as the "before" state (the batch path drops them: location.notna()).
+        """
+        events = [normalize_event(ev) for ev in events]
+        located = [ev for ev in events if not _is_missing(ev.get("location"))]
+        X = events_features(located, self.feature_cols).astype(np.float32)
+        probs = iter(self.scorer(torch.from_numpy(X)).numpy().tolist())
+
+        out = []
+        state = {}  # applied once the whole batch is scored, so a failing batch leaves self.state as it was
+        for ev in events:
+            if _is_missing(ev.get("location")):
+                out.append(None)
+                continue
+            p_shot, p_goal = next(probs)
+            match_id = ev.get("match_id")
+            possession = ev.get("possession")
+            prev = state[match_id] if match_id in state else self.state.get(match_id)
+            if prev is not None and prev[0] == possession and not _is_missing(possession):
+                p_shot_before, p_goal_before = prev[1], prev[2]
+            else:
+                # first event of a possession: before == current
+                p_shot_before, p_goal_before = p_shot, p_goal
+            state[match_id] = (possession, p_shot, p_goal)
+
+            value_raw = (p_shot + self.w_goal * p_goal) - (p_shot_before + self.w_goal * p_goal_before)
+            has_end = any(not _is_missing(ev.get(k)) for k in END_LOCATION_KEYS)
+            value = value_raw if (str(ev.get("type")) in VALID_ACTIONS and has_end) else 0.0
+            if abs(value) < self.eps:
+                value = 0.0
+
+            out.append({
+                "match_id": match_id,
+                "id": ev.get("id"),
+                "index": ev.get("index"),
+                "possession": possession,
+                "team_name": str(ev.get("team")),
+                "player_name": str(ev.get("player")),
+                "type_name": str(ev.get("type")),
+                "p_shot": p_shot,
+                "p_goal": p_goal,
+                "p_shot_before": p_shot_before,
+                "p_goal_before": p_goal_before,
+                "action_value_raw": value_raw,
+                "action_value_dashboard": value,
+            })
+        self.state.update(state)
+        return out
+
+class LiveScoringService:
+    """
+    asyncio front-end: feeds put events on a queue, one worker drains it in micro-batches
+    (up to max_batch events already waiting) so bursts cost one forward pass.
+    Every emitted result carries latency_ms = emit time - arrival time.
+    Events without a location produce no result (LiveScorer.score). An event that cannot be
+    scored is dropped: counted in errors and passed to on_error(ev, exc).
+    """
+    def __init__(
+        self,
+        scorer: LiveScorer,
+        max_batch: int = 64,
+        max_queue: int = 100_000,
+        on_error: Callable[[dict, Exception], None] | None = None,
+    ):
+        self.scorer = scorer
+        self.max_batch = max_batch
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.on_error = on_error
+        self.errors = 0
+
+    async def submit(self, ev: dict) -> None:
+        await self.queue.put((time.perf_counter(), ev))
+
+    def _score(self, batch: list[tuple[float, dict]]) -> list[tuple[float, dict]]:
+        # (arrival time, result) per scored event; a failing batch is retried event by event
+        try:
+            return list(zip([t_in for t_in, _ in batch], self.scorer.score([ev for _, ev in batch])))
+        except Exception as e:
+            if len(batch) == 1:
+                self.errors += 1
+                if self.on_error is not None:
+                    self.on_error(batch[0][1], e)
+                return []
+        scored = []
+        for item in batch:
+            scored.extend(self._score([item]))
+        return scored
+
+    async def _worker(self, sink: Callable[[dict], None]) -> None:
+        while True:
+            item = await self.queue.get()
+            if item is None:
+                return
+            batch = [item]
+            stop = False
+            while len(batch) < self.max_batch and not self.queue.empty():
+                nxt = self.queue.get_nowait()
+                if nxt is None:
+                    stop = True
+                    break
+                batch.append(nxt)
+
+            scored = self._score(batch)
+            now = time.perf_counter()
+            for t_in, res in scored:
+                if res is None:
+                    continue
+                res["latency_ms"] = (now - t_in) * 1e3
+                sink(res)
+            if stop:
+                return
+
+    @staticmethod
+    async def _unless_worker_fails(aw, worker: asyncio.Task):
+        """
+        Awaits aw; if the worker stops first (it only stops after the end marker, so it failed),
+        aw is cancelled and the worker's exception raised instead of waiting on a queue nobody drains.
+        """
+        task = asyncio.ensure_future(aw)
+        await asyncio.wait({task, worker}, return_when=asyncio.FIRST_COMPLETED)
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            worker.result()
+        return task.result()
+
+    async def run(self, feeds: list[AsyncIterator[dict]], sink: Callable[[dict], None]) -> None:
+        """
+        Consumes all feeds concurrently until they are exhausted, emitting results to sink.
+        """
+        worker = asyncio.create_task(self._worker(sink))
+
+        async def pump(feed):
+            async for ev in feed:
+                await self.submit(ev)
+
+        await self._unless_worker_fails(asyncio.gather(*(pump(f) for f in feeds)), worker)
+        await self._unless_worker_fails(self.queue.put(None), worker)
+        await worker
+
+def _read_events_file(path: Path) -> list[dict]:
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path).to_dict("records")
+    with open(path, "r", encoding="utf-8") as f:
+        if path.suffix == ".jsonl":
+            return [json.loads(line) for line in f if line.strip()]
+        return json.load(f)
+
+async def replay_file(
+    path: str | Path,
+    match_id=None,
+    rate: float | None = None,
+    speed: float | None = None,
+) -> AsyncIterator[dict]:
+    """
+    File-replay stand-in for a live feed: open-data events JSON, JSON lines or Parquet.
+    rate: events per second; speed: match-clock multiplier (60 = one match minute per second);
+    neither: as fast as possible (load test). match_id defaults to the file stem for open-data files.
+    """
+    path = Path(path)
+    events = _read_events_file(path)
+    if match_id is None and path.stem.isdigit():
+        match_id = int(path.stem)
+
+    t0 = time.perf_counter()
+    for i, ev in enumerate(events):
+        if match_id is not None and "match_id" not in ev:
+            ev["match_id"] = match_id
+        if rate:
+            due = i / rate
+        elif speed:
+            due = (_as_int(ev.get("minute")) * 60 + _as_int(ev.get("second"))) / speed
+        else:
+            due = None
+
+        if due is None:
+            if i % 256 == 0:
+                await asyncio.sleep(0)  # let the worker run
+        else:
+            # behind schedule: still yield to the loop so the worker is never starved
+            await asyncio.sleep(max(0.0, t0 + due - time.perf_counter()))
+        yield ev
+
+def latency_summary(latencies_ms: list[float]) -> dict:
+    lat = np.asarray(latencies_ms, dtype=np.float64)
+    if len(lat) == 0:
+        return {"events": 0}
+    return {
+        "events": int(len(lat)),
+        "p50_ms": float(np.percentile(lat, 50)),
+        "p99_ms": float(np.percentile(lat, 99)),
+        "max_ms": float(lat.max()),
+    }
+
+def main():
+    cfg = Config()
+    ap = argparse.ArgumentParser(description="Replay event files through the live PVNet scoring service.")
+    ap.add_argument("--artifacts", default=str(cfg.ARTIFACTS_DIR))
+    ap.add_argument("--feed", nargs="+", required=True, help="event files (open-data JSON, .jsonl or .parquet), one per match")
+    ap.add_argument("--rate", type=float, default=None, help="events/s per feed (default: as fast as possible)")
+    ap.add_argument("--speed", type=float, default=None, help="match-clock multiplier instead of --rate")
+    ap.add_argument("--max-batch", type=int, default=64)
+    ap.add_argument("--out", default=None, help="optional JSON lines output of the action values")
+    args = ap.parse_args()
+
+    torch.set_num_threads(1)
+    scorer = LiveScorer.from_artifacts(args.artifacts, w_goal=cfg.W_GOAL, eps=cfg.VALUE_EPS)
+    service = LiveScoringService(scorer, max_batch=args.max_batch)
+    # startup objects (model, artifacts) never need to be scanned again by the GC
+    gc.collect()
+    gc.freeze()
+
+    latencies = []
+    out_f = open(args.out, "w") if args.out else None
+
+    def sink(res: dict) -> None:
+        latencies.append(res["latency_ms"])
+        if out_f is not None:
+            out_f.write(json.dumps(res, default=str) + "\n")
+
+    feeds = [replay_file(p, rate=args.rate, speed=args.speed) for p in args.feed]
+    t0 = time.perf_counter()
+    try:
+        asyncio.run(service.run(feeds, sink))
+    finally:
+        if out_f is not None:
+            out_f.close()
+    elapsed = time.perf_counter() - t0
+
+    s = latency_summary(latencies)
+    print(f"{s['events']} events in {elapsed:.2f}s ({s['events'] / max(elapsed, 1e-9):,.0f} events/s)")
+    if service.errors:
+        print(f"{service.errors} events could not be scored and were dropped")
+    if s["events"]:
+        print(f"latency p50={s['p50_ms']:.3f}ms p99={s['p99_ms']:.3f}ms max={s['max_ms']:.3f}ms")
+
+if __name__ == "__main__":
+    main()
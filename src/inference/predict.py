@@ -0,0 +1,287 @@
+"""
+Batch scoring of processed events with a trained PVNet.
+
+    cd src
+    python -m inference.predict --events events.parquet --artifacts ../artifacts \
+        --out ../artifacts/test_predictions.parquet
+
+Events must be featurized (build_features) and ordered by match/period/index.
+Each event is scored once; the "before" state is the prediction of the previous
+event of the same (match_id, possession), so no second forward pass is needed.
+Sequence checkpoints (SequencePVNet) are scored per possession of each chunk.
+"""
+from __future__ import annotations
+import argparse
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import torch
+
+from config import Config
+from data.preprocessing import FEATURE_COLS
+from data.sequences import possession_sequences
+from inference.aggregates import write_dashboard_aggregates_from_parquet
+from models.pvnet import PVNet, SequencePVNet
+from training.train_loop import SequenceBatchLoader
+import tracing
+from tracing import traced
+
+VALID_ACTIONS = {"Pass", "Carry", "Dribble", "Shot"}
+
+def load_model(model_path: str | Path, device=None) -> tuple[PVNet | SequencePVNet, dict]:
+    """
+    PVNet (or SequencePVNet for arch="sequence") in eval mode + checkpoint metadata
+    (in_dim, feature_cols, hidden_dim, dropout[, arch, context, max_len]).
+    """
+    device = device if device is not None else torch.device("cpu")
+    ckpt = torch.load(model_path, map_location=device, weights_only=False)
+    if ckpt.get("arch") == "sequence":
+        model = SequencePVNet(in_dim=ckpt["in_dim"], hidden_dim=ckpt["hidden_dim"], dropout=ckpt["dropout"],
+                              context=ckpt["context"], max_len=ckpt.get("max_len"))
+    else:
+        model = PVNet(in_dim=ckpt["in_dim"], hidden_dim=ckpt["hidden_dim"], dropout=ckpt["dropout"])
+    model.load_state_dict(ckpt["model_state_dict"])
+    model.to(device).eval()
+    meta = {k: v for k, v in ckpt.items() if k != "model_state_dict"}
+    meta.setdefault("feature_cols", FEATURE_COLS)
+    return model, meta
+
+@traced("inference.predict_proba")
+@torch.no_grad()
+def predict_proba(model, X_scaled: np.ndarray, batch_size: int = 65536, device=None, offsets=None) -> np.ndarray:
+    """
+    (N, 2) float32 probabilities [p_shot, p_goal].
+    Sequence models also need offsets: possession_sequences of the rows of X_scaled.
+    """
+    device = device if device is not None else next(model.parameters()).device
+    out = np.empty((len(X_scaled), 2), dtype=np.float32)
+    if getattr(model, "sequence", False):
+        if offsets is None:
+            raise ValueError("sequence models need the possession offsets of X_scaled (possession_sequences)")
+        loader = SequenceBatchLoader(X_scaled, np.zeros(len(X_scaled)), np.zeros(len(X_scaled)), offsets,
+                                     batch_size=batch_size, shuffle=False, device=device)
+        for rows, xb, _ in loader.batches_with_rows():
+            out[rows] = torch.sigmoid(model(xb)).cpu().numpy()
+        return out
+    for i in range(0, len(X_scaled), batch_size):
+        xb = torch.as_tensor(X_scaled[i:i + batch_size], dtype=torch.float32, device=device)
+        out[i:i + batch_size] = torch.sigmoid(model(xb)).cpu().numpy()
+    return out
+
+def previous_in_possession(df: pd.DataFrame, carry: dict | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    prev_pos[i] = row of the previous event of the same (match_id, possession) in df, -1 if none.
+    from_carry[i] = True when that previous event is the last one seen in an earlier chunk
+    (looked up in carry, keyed by (match_id, possession)).
+    """
+    n = len(df)
+    pos = pd.Series(np.arange(n), index=df.index)
+    prev_pos = pos.groupby([df["match_id"], df["possession"]]).shift(1).fillna(-1).to_numpy(dtype=np.int64)
+
+    from_carry = np.zeros(n, dtype=bool)
+    if carry:
+        first = np.flatnonzero(prev_pos < 0)
+        mids = df["match_id"].to_numpy()[first]
+        poss = df["possession"].to_numpy()[first]
+        for i, key in zip(first, zip(mids.tolist(), poss.tolist())):
+            if key in carry:
+                from_carry[i] = True
+    return prev_pos, from_carry
+
+def add_action_values(out: pd.DataFrame, w_goal: float = 5.0, eps: float = 0.005) -> pd.DataFrame:
+    """
+    Adds minute_bucket, action_value_raw, action_value_dashboard, value_pos, value_neg
+    (needs p_shot, p_goal, p_shot_before, p_goal_before). Modifies out in place.
+    """
+    # minute bucket for timeline charts
+    if "minute" in out.columns:
+        out["minute_bucket"] = out["minute"].astype(float).fillna(0).astype(int)
+    elif "second" in out.columns:
+        out["minute_bucket"] = (out["second"] // 60).astype(int)
+    else:
+        out["minute_bucket"] = 0
+
+    V_before = out["p_shot_before"] + w_goal * out["p_goal_before"]
+    V_curr = out["p_shot"] + w_goal * out["p_goal"]
+    out["action_value_raw"] = V_curr - V_before
+
+    # Dashboard value: movement actions with an end location, plus anything labeled as leading to shot/goal
+    is_valid_action = out["type_name"].isin(VALID_ACTIONS)
+    no_end = pd.Series(False, index=out.index)
+    has_end = (
+        out.get("pass_end_location", no_end).notna()
+        | out.get("carry_end_location", no_end).notna()
+        | out.get("shot_end_location", no_end).notna()
+    ).fillna(False)
+    label_mask = (out.get("shot_within_k", 0) == 1) | (out.get("goal_within_k", 0) == 1)
+
+    value = np.where((is_valid_action & has_end) | label_mask, out["action_value_raw"], 0.0)
+    # remove tiny noise but do not clip negatives asymmetrically
+    value[np.abs(value) < eps] = 0.0
+    out["action_value_dashboard"] = value
+
+    out["value_pos"] = out["action_value_dashboard"].clip(lower=0.0)
+    out["value_neg"] = out["action_value_dashboard"].clip(upper=0.0)
+    return out
+
+@traced("inference.score_frame")
+def score_frame(
+    df: pd.DataFrame,
+    model,
+    scaler,
+    feature_cols: list[str] = FEATURE_COLS,
+    batch_size: int = 65536,
+    carry: dict | None = None,
+    w_goal: float = 5.0,
+    eps: float = 0.005,
+) -> pd.DataFrame:
+    """
+    Scores one chunk of events and adds the test_predictions.parquet columns.
+    carry: {(match_id, possession): (p_shot, p_goal)} of the last event per possession of
+    the previous chunk; updated in place for the next chunk.
+    """
+    out = df.copy()
+    X = scaler.transform(out[feature_cols].astype(float).values)
+    # possessions of the chunk, cut like the training sequences (a chunk boundary also cuts one)
+    offsets = possession_sequences(out, max_len=model.max_len) if getattr(model, "sequence", False) else None
+    probs = predict_proba(model, X, batch_size=batch_size, offsets=offsets)
+
+    prev_pos, from_carry = previous_in_possession(out, carry)
+    has_prev = prev_pos >= 0
+
+    before = probs.copy()  # first event of a possession: before == current
+    before[has_prev] = probs[prev_pos[has_prev]]
+    if from_carry.any():
+        keys = zip(out["match_id"].to_numpy()[from_carry].tolist(), out["possession"].to_numpy()[from_carry].tolist())
+        before[from_carry] = np.array([carry[k] for k in keys], dtype=np.float32)
+
+    out["p_shot"] = probs[:, 0]
+    out["p_goal"] = probs[:, 1]
+    out["p_shot_before"] = before[:, 0]
+    out["p_goal_before"] = before[:, 1]
+    add_action_values(out, w_goal=w_goal, eps=eps)
+
+    if carry is not None:
+        # matches are contiguous: only possessions of matches in this chunk can continue
+        last = out.groupby(["match_id", "possession"], sort=False)[["p_shot", "p_goal"]].last()
+        chunk_matches = set(out["match_id"].dropna().unique().tolist())
+        for key in [k for k in carry if k[0] not in chunk_matches]:
+            del carry[key]
+        carry.update(zip(last.index.tolist(), map(tuple, last.to_numpy())))
+    return out
+
+# Columns score_frame adds, with the types it produces
+SCORED_COLUMNS = pa.schema([
+    ("p_shot", pa.float32()),
+    ("p_goal", pa.float32()),
+    ("p_shot_before", pa.float32()),
+    ("p_goal_before", pa.float32()),
+    ("minute_bucket", pa.int64()),
+    ("action_value_raw", pa.float32()),
+    ("action_value_dashboard", pa.float32()),
+    ("value_pos", pa.float32()),
+    ("value_neg", pa.float32()),
+])
+
+def scored_schema(events_schema: pa.Schema, columns: list[str] | None = None) -> pa.Schema:
+    """
+    Output schema of score_parquet: the input file's columns (or the `columns` read from it)
+    followed by SCORED_COLUMNS. Fixed up front, so a column that is all-null in one chunk
+    keeps its file type.
+    """
+    names = columns if columns is not None else events_schema.names
+    fields = [
+        events_schema.field(c) for c in names
+        if c not in SCORED_COLUMNS.names and not c.startswith("__index_level_")
+    ]
+    return pa.schema(fields + list(SCORED_COLUMNS))
+
+@traced("inference.score_parquet", rows=lambda stats, *args, **kwargs: stats["events"])
+def score_parquet(
+    events_path: str | Path,
+    out_path: str | Path,
+    model_path: str | Path,
+    scaler_path: str | Path,
+    chunk_rows: int = 262144,
+    batch_size: int = 65536,
+    w_goal: float = 5.0,
+    eps: float = 0.005,
+    columns: list[str] | None = None,
+) -> dict:
+    """
+    Streams events_path in chunks of chunk_rows, scores them and writes a
+    test_predictions.parquet-compatible file. Model and scaler are loaded once.
+    Returns {"events", "seconds", "events_per_second"}.
+    """
+    model, meta = load_model(model_path)
+    scaler = joblib.load(scaler_path)
+    feature_cols = meta["feature_cols"]
+
+    t0 = time.perf_counter()
+    n_events = 0
+    carry = {}
+    writer = None
+    try:
+        source = pq.ParquetFile(events_path)
+        for batch in source.iter_batches(batch_size=chunk_rows, columns=columns):
+            chunk = batch.to_pandas()
+            scored = score_frame(
+                chunk, model, scaler, feature_cols=feature_cols, batch_size=batch_size,
+                carry=carry, w_goal=w_goal, eps=eps,
+            )
+            if writer is None:
+                Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+                writer = pq.ParquetWriter(out_path, scored_schema(source.schema_arrow, columns))
+            writer.write_table(pa.Table.from_pandas(scored, schema=writer.schema, preserve_index=False))
+            n_events += len(scored)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    seconds = time.perf_counter() - t0
+    return {"events": n_events, "seconds": seconds, "events_per_second": n_events / max(seconds, 1e-9)}
+
+def main():
+    cfg = Config()
+    ap = argparse.ArgumentParser(description="Score processed events with a trained PVNet.")
+    ap.add_argument("--events", required=True, help="Parquet of featurized events")
+    ap.add_argument("--artifacts", default=str(cfg.ARTIFACTS_DIR), help="folder with model.pth and scaler.joblib")
+    ap.add_argument("--out", default=None, help="output Parquet (default: <artifacts>/test_predictions.parquet)")
+    ap.add_argument("--chunk-rows", type=int, default=262144)
+    ap.add_argument("--batch-size", type=int, default=65536)
+    ap.add_argument("--w-goal", type=float, default=cfg.W_GOAL)
+    ap.add_argument("--eps", type=float, default=cfg.VALUE_EPS)
+    ap.add_argument("--aggregates", action="store_true", help="also write the dashboard aggregate tables next to --out")
+    ap.add_argument("--profile", action="store_true", help="write a per-stage timing report (tracing.py)")
+    args = ap.parse_args()
+    cfg.PROFILE = cfg.PROFILE or args.profile
+    tracing.configure(cfg)
+
+    artifacts = Path(args.artifacts)
+    out = Path(args.out) if args.out else artifacts / "test_predictions.parquet"
+    stats = score_parquet(
+        args.events,
+        out,
+        model_path=artifacts / "model.pth",
+        scaler_path=artifacts / "scaler.joblib",
+        chunk_rows=args.chunk_rows,
+        batch_size=args.batch_size,
+        w_goal=args.w_goal,
+        eps=args.eps,
+    )
+    print(f"Saved predictions: {out}")
+    print(f"{stats['events']} events in {stats['seconds']:.2f}s ({stats['events_per_second']:,.0f} events/s)")
+    if args.aggregates:
+        for path in write_dashboard_aggregates_from_parquet(out, out.parent):
+            print(f"Saved: {path}")
+    paths = tracing.write_report(artifacts / "profiles")
+    if paths:
+        print(f"Profile: {paths[0]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Incremental player and team rankings (player_ranking_outfield.parquet,
+player_ranking_goalkeepers.parquet, team_match_ranking.parquet).
+
+RankingState keeps mergeable sufficient statistics instead of the scored events:
+
+  - per (player_name, team_name): actions, value / positive / negative totals, deep actions
+  - per (player_name, team_name): a log-bucket sketch of the value distribution
+    (DDSketch-style, relative accuracy SKETCH_ALPHA) for value_median
+  - per (match_id, team_name): team value total and actions
+
+Adding a matchday costs a groupby over its events plus a merge with the state, whose
+size depends on players and sketch buckets, not on the history. States built from
+disjoint sets of matches (e.g. one per competition) merge into the state of their union.
+
+    cd src
+    python -m inference.rankings --predictions ../artifacts/matchday_12.parquet \
+        --state ../artifacts/ranking_state --artifacts ../artifacts
+
+value_median comes from the sketch (within SKETCH_ALPHA relative error); every
+other column equals the full groupby over all events (totals accumulated in float64).
+"""
+from __future__ import annotations
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+from tracing import traced
+
+VALUE_COL = "action_value_dashboard"
+PLAYER_KEYS = ["player_name", "team_name"]
+TEAM_MATCH_KEYS = ["match_id", "team_name"]
+
+OUTFIELD_FILE = "player_ranking_outfield.parquet"
+GOALKEEPERS_FILE = "player_ranking_goalkeepers.parquet"
+TEAM_MATCH_FILE = "team_match_ranking.parquet"
+
+OUTFIELD_MAX_DEEP_RATE = 0.60  # players above it are GK-like (proxy split)
+RELIABLE_MIN_ACTIONS = 50
+DEEP_MAX_X = 20  # "deep" action: starts inside the own box area
+
+# value sketch: bucket i holds |v| in (gamma^(i-1), gamma^i], gamma = (1 + a) / (1 - a)
+SKETCH_ALPHA = 0.005
+SKETCH_MIN_ABS = 1e-6  # smaller |v| go to the zero bucket
+_LOG_GAMMA = np.log((1 + SKETCH_ALPHA) / (1 - SKETCH_ALPHA))
+_I_MIN = int(np.floor(np.log(SKETCH_MIN_ABS) / _LOG_GAMMA))
+
+_STAT_COLS = ["actions", "value_total", "value_pos_total", "value_neg_total", "deep_actions"]
+_TEAM_COLS = ["team_value_total", "actions"]
+
+def ranking_actions(events: pd.DataFrame) -> pd.DataFrame:
+    """
+    Actions counted in the rankings: non-zero value, in the attacking half or strongly
+    progressive ("attacker-like" ranking).
+    """
+    d = events[events[VALUE_COL] != 0.0]
+    return d[(d["start_x"] >= 60) | (d["progress_x"] >= 5) | (d["end_x"] >= 80)]
+
+def sketch_keys(values: np.ndarray) -> np.ndarray:
+    """
+    Signed bucket key per value; keys sort like the values (0 = |v| < SKETCH_MIN_ABS).
+    """
+    values = np.asarray(values, dtype=float)
+    mag = np.abs(values)
+    keys = np.zeros(len(values), dtype=np.int32)
+    nz = mag >= SKETCH_MIN_ABS
+    i = np.ceil(np.log(mag[nz]) / _LOG_GAMMA).astype(np.int64)
+    keys[nz] = (np.sign(values[nz]) * (i - _I_MIN + 1)).astype(np.int32)
+    return keys
+
+def sketch_values(keys: np.ndarray) -> np.ndarray:
+    """
+    Representative value of each bucket key (relative error <= SKETCH_ALPHA).
+    """
+    keys = np.asarray(keys, dtype=np.int64)
+    gamma = np.exp(_LOG_GAMMA)
+    i = np.abs(keys) + _I_MIN - 1
+    return np.where(keys == 0, 0.0, np.sign(keys) * 2.0 * gamma ** i / (gamma + 1.0))
+
+def _sum_by(df: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    return df.groupby(keys, dropna=False, sort=True).sum().reset_index()
+
+class RankingState:
+    """
+    Mergeable ranking statistics (see module docstring). Build with from_events, grow
+    with update / merge, persist with save / load, render with player_ranking / team_match_ranking.
+    """
+    def __init__(self, players=None, sketch=None, team_match=None, matches=()):
+        self.players = players if players is not None else pd.DataFrame(columns=PLAYER_KEYS + _STAT_COLS)
+        self.sketch = sketch if sketch is not None else pd.DataFrame(columns=PLAYER_KEYS + ["key", "count"])
+        self.team_match = team_match if team_match is not None else pd.DataFrame(columns=TEAM_MATCH_KEYS + _TEAM_COLS)
+        self.matches = set(matches)
+
+    @classmethod
+    def from_events(cls, events: pd.DataFrame) -> "RankingState":
+        """
+        State of scored events (score_frame / test_predictions.parquet columns).
+        """
+        d = ranking_actions(events)
+        value = d[VALUE_COL].astype(float)
+        keys = d[PLAYER_KEYS]
+
+        players = _sum_by(
+            keys.assign(
+                actions=np.int64(1),
+                value_total=value,
+                value_pos_total=d["value_pos"].astype(float),
+                value_neg_total=d["value_neg"].astype(float),
+                deep_actions=(d["start_x"] < DEEP_MAX_X).astype(np.int64),
+            ),
+            PLAYER_KEYS,
+        )
+        sketch = _sum_by(keys.assign(key=sketch_keys(value.to_numpy()), count=np.int64(1)), PLAYER_KEYS + ["key"])
+        team_match = _sum_by(
+            d[TEAM_MATCH_KEYS].assign(team_value_total=value, actions=np.int64(1)), TEAM_MATCH_KEYS
+        )
+        return cls(players, sketch, team_match, matches=events["match_id"].dropna().unique().tolist())
+
+    def merge(self, other: "RankingState") -> "RankingState":
+        """
+        State of the union of both match sets (they must not share matches).
+        """
+        overlap = self.matches & other.matches
+        if overlap:
+            raise ValueError(f"{len(overlap)} matches are already in the ranking state, e.g. {sorted(overlap)[:5]}")
+        if not self.matches:
+            return RankingState(other.players, other.sketch, other.team_match, other.matches)
+        if not other.matches:
+            return RankingState(self.players, self.sketch, self.team_match, self.matches)
+        return RankingState(
+            _sum_by(pd.concat([self.players, other.players], ignore_index=True), PLAYER_KEYS),
+            _sum_by(pd.concat([self.sketch, other.sketch], ignore_index=True), PLAYER_KEYS + ["key"]),
+            _sum_by(pd.concat([self.team_match, other.team_match], ignore_index=True), TEAM_MATCH_KEYS),
+            self.matches | other.matches,
+        )
+
+    @traced("inference.update_rankings", rows=lambda result, self, events: len(events))
+    def update(self, events: pd.DataFrame) -> "RankingState":
+        """
+        State with the scored events of new matches added.
+        """
+        return self.merge(RankingState.from_events(events))
+
+    def _medians(self) -> pd.DataFrame:
+        # per player: sketch buckets in value order, median = mean of the two middle ranks (like pandas)
+        sk = self.sketch.sort_values(PLAYER_KEYS + ["key"], kind="stable")
+        if len(sk) == 0:
+            return pd.DataFrame(columns=PLAYER_KEYS + ["value_median"])
+        counts = sk["count"].to_numpy(dtype=np.int64)
+        group = sk.groupby(PLAYER_KEYS, dropna=False, sort=False).ngroup().to_numpy()
+        first = np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+        cum = np.cumsum(counts)
+        base = np.r_[0, cum][first]
+        n = np.add.reduceat(counts, first)
+        values = sketch_values(sk["key"].to_numpy())
+        lo = values[np.searchsorted(cum, base + (n - 1) // 2, side="right")]
+        hi = values[np.searchsorted(cum, base + n // 2, side="right")]
+        medians = sk.iloc[first][PLAYER_KEYS].reset_index(drop=True)
+        medians["value_median"] = (lo + hi) / 2.0
+        return medians
+
+    def player_ranking(self) -> pd.DataFrame:
+        """
+        One row per (player_name, team_name), columns of the player ranking files.
+        """
+        p = self.players.merge(self._medians(), on=PLAYER_KEYS, how="left")
+        actions = p["actions"].astype(np.int64)
+        out = p[PLAYER_KEYS].copy()
+        out["value_total"] = p["value_total"].astype(float)
+        out["actions"] = actions
+        out["value_mean"] = out["value_total"] / actions
+        out["value_median"] = p["value_median"]
+        out["value_pos_total"] = p["value_pos_total"].astype(float)
+        out["value_neg_total"] = p["value_neg_total"].astype(float)
+        # rows without a player or team name get no depth (not split into outfield / GK-like)
+        named = p["player_name"].notna() & p["team_name"].notna()
+        out["deep_action_rate"] = (p["deep_actions"] / actions).where(named)
+        out["value_per_100_actions"] = out["value_total"] * (100.0 / actions.clip(lower=1))
+        out["is_reliable"] = actions >= RELIABLE_MIN_ACTIONS
+        return out
+
+    def team_match_ranking(self) -> pd.DataFrame:
+        out = self.team_match[TEAM_MATCH_KEYS].copy()
+        out["team_value_total"] = self.team_match["team_value_total"].astype(float)
+        out["actions"] = self.team_match["actions"].astype(np.int64)
+        out["team_value_per_100"] = out["team_value_total"] * (100.0 / out["actions"].clip(lower=1))
+        return out
+
+    def save(self, state_dir: str | Path) -> Path:
+        state_dir = Path(state_dir)
+        state_dir.mkdir(parents=True, exist_ok=True)
+        self.players.to_parquet(state_dir / "players.parquet", index=False)
+        self.sketch.to_parquet(state_dir / "sketch.parquet", index=False)
+        self.team_match.to_parquet(state_dir / "team_match.parquet", index=False)
+        pd.DataFrame({"match_id": sorted(self.matches)}).to_parquet(state_dir / "matches.parquet", index=False)
+        return state_dir
+
+    @classmethod
+    def load(cls, state_dir: str | Path) -> "RankingState":
+        state_dir = Path(state_dir)
+        return cls(
+            pd.read_parquet(state_dir / "players.parquet"),
+            pd.read_parquet(state_dir / "sketch.parquet"),
+            pd.read_parquet(state_dir / "team_match.parquet"),
+            matches=pd.read_parquet(state_dir / "matches.parquet")["match_id"].tolist(),
+        )
+
+def split_outfield_goalkeepers(ranking: pd.DataFrame, max_deep_rate: float = OUTFIELD_MAX_DEEP_RATE):
+    """
+    (outfield, GK-like) rows of a player ranking, split on deep_action_rate (proxy).
+    """
+    outfield = ranking[ranking["deep_action_rate"] <= max_deep_rate].copy()
+    gk_like = ranking[ranking["deep_action_rate"] > max_deep_rate].copy()
+    return outfield, gk_like
+
+def write_rankings(state: RankingState, artifacts_dir: str | Path) -> list[Path]:
+    """
+    Writes the outfield, GK-like and team-match ranking files. Returns their paths.
+    """
+    artifacts_dir = Path(artifacts_dir)
+    artifacts_dir.mkdir(parents=True, exist_ok=True)
+    outfield, gk_like = split_outfield_goalkeepers(state.player_ranking())
+    paths = [artifacts_dir / OUTFIELD_FILE, artifacts_dir / GOALKEEPERS_FILE, artifacts_dir / TEAM_MATCH_FILE]
+    outfield.to_parquet(paths[0], index=False)
+    gk_like.to_parquet(paths[1], index=False)
+    state.team_match_ranking().to_parquet(paths[2], index=False)
+    return paths
+
+def main():
+    cfg = Config()
+    ap = argparse.ArgumentParser(description="Add scored matches to the ranking state and rewrite the rankings.")
+    ap.add_argument("--predictions", nargs="+", required=True, help="scored events of the new matches (Parquet)")
+    ap.add_argument("--state", required=True, help="ranking state folder (created if missing)")
+    ap.add_argument("--artifacts", default=str(cfg.ARTIFACTS_DIR), help="where the ranking files are written")
+    args = ap.parse_args()
+
+    state_dir = Path(args.state)
+    state = RankingState.load(state_dir) if (state_dir / "players.parquet").exists() else RankingState()
+    n_before = len(state.matches)
+    cols = ["match_id", "player_name", "team_name", "start_x", "end_x", "progress_x", VALUE_COL, "value_pos", "value_neg"]
+    for path in args.predictions:
+        state = state.update(pd.read_parquet(path, columns=cols))
+    state.save(state_dir)
+    print(f"Ranking state: {n_before} -> {len(state.matches)} matches ({state_dir})")
+    for path in write_rankings(state, args.artifacts):
+        print(f"Saved: {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Value grid cube: pre-binned action values for the dashboard heatmaps.
+
+Every non-zero action is binned once by start location on a BASE_BINS grid and
+accumulated (sum of value, number of actions) per
+
+    group (team_name, match_id, player_name) x value sign x |value| bucket x cell
+
+The non-empty entries are stored sparse in dashboard_value_grid.npz (plain arrays,
+no pickle). A heatmap for any selection of groups (one match, a player, a whole
+season of a team) is then a masked bincount over these entries, and any coarser
+grid whose bins divide BASE_BINS (24x16, 12x8, 6x4, ...) is a block sum of it,
+with the same cells np.histogram2d gives on the raw events.
+
+|value| buckets start at the MAG_EDGES thresholds (0.00, 0.01, ..., 0.30), so
+"min |value| >= t" filters are exact for t on that grid. Reader: dashboard/utils/grid.py.
+"""
+from __future__ import annotations
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from tracing import traced
+
+VALUE_COL = "action_value_dashboard"
+VALUE_GRID_FILE = "dashboard_value_grid.npz"
+GROUP_COLS = ["team_name", "match_id", "player_name"]
+
+PITCH_LENGTH = 120
+PITCH_WIDTH = 80
+BASE_BINS = (48, 32)  # 2.5 x 2.5 cells
+MAG_EDGES = np.round(np.arange(0, 31) * 0.01, 2)
+
+def _bin_index(v: np.ndarray, n: int, upper: float) -> np.ndarray:
+    """
+    np.histogram bin of v over [0, upper] in n bins (last bin closed); -1 outside.
+    """
+    edges = np.linspace(0, upper, n + 1)
+    idx = np.searchsorted(edges, v, side="right") - 1
+    idx[v == upper] = n - 1
+    idx[(v < 0) | (v > upper) | np.isnan(v)] = -1
+    return idx
+
+@traced("inference.build_value_grid", rows=None)
+def build_value_grid(preds: pd.DataFrame, value_col: str = VALUE_COL, bins: tuple[int, int] = BASE_BINS) -> dict[str, np.ndarray]:
+    """
+    Arrays of the value grid cube (see module docstring) from scored events.
+    Events with zero or missing value, or a start location off the pitch, are left out.
+    """
+    d = preds[GROUP_COLS + ["start_x", "start_y", value_col]]
+    d = d[d["team_name"].notna() & d["match_id"].notna() & d[value_col].notna() & (d[value_col] != 0.0)]
+
+    nx, ny = bins
+    ix = _bin_index(d["start_x"].to_numpy(dtype=float), nx, PITCH_LENGTH)
+    iy = _bin_index(d["start_y"].to_numpy(dtype=float), ny, PITCH_WIDTH)
+    on_pitch = (ix >= 0) & (iy >= 0)
+    d, ix, iy = d[on_pitch], ix[on_pitch], iy[on_pitch]
+
+    value = d[value_col].to_numpy(dtype=float)
+    entries = pd.DataFrame({
+        "team_name": d["team_name"].astype(str).to_numpy(),
+        "match_id": d["match_id"].to_numpy(dtype=np.int64),
+        "player_name": d["player_name"].fillna("").astype(str).to_numpy(),
+        "positive": value > 0,
+        "mag": np.searchsorted(MAG_EDGES, np.abs(value), side="right") - 1,
+        "cell": ix * ny + iy,
+        "value": value,
+    })
+    cube = (
+        entries.groupby(GROUP_COLS + ["positive", "mag", "cell"], sort=True)["value"]
+        .agg(["sum", "size"])
+        .reset_index()
+    )
+
+    groups = cube[GROUP_COLS].drop_duplicates().reset_index(drop=True)
+    group = cube.groupby(GROUP_COLS, sort=True).ngroup().to_numpy()
+    teams, team_code = np.unique(groups["team_name"].to_numpy(dtype=str), return_inverse=True)
+    players, player_code = np.unique(groups["player_name"].to_numpy(dtype=str), return_inverse=True)
+
+    return {
+        "bins": np.asarray(bins, dtype=np.int32),
+        "mag_edges": MAG_EDGES.astype(np.float64),
+        "teams": teams,
+        "players": players,
+        "group_team": team_code.astype(np.int32),
+        "group_match": groups["match_id"].to_numpy(dtype=np.int64),
+        "group_player": player_code.astype(np.int32),
+        "group": group.astype(np.int32),
+        "positive": cube["positive"].to_numpy(dtype=bool),
+        "mag": cube["mag"].to_numpy(dtype=np.int8),
+        "cell": cube["cell"].to_numpy(dtype=np.int16),
+        "sum": cube["sum"].to_numpy(dtype=np.float32),
+        "count": cube["size"].to_numpy(dtype=np.int32),
+    }
+
+def write_value_grid(preds: pd.DataFrame, artifacts_dir: str | Path, value_col: str = VALUE_COL) -> Path:
+    """
+    Writes <artifacts_dir>/dashboard_value_grid.npz. Returns its path.
+    """
+    path = Path(artifacts_dir) / VALUE_GRID_FILE
+    np.savez_compressed(path, **build_value_grid(preds, value_col=value_col))
+    return path
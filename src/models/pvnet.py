@@ -1,5 +1,7 @@
 from __future__ import annotations
+import torch
 import torch.nn as nn
+import torch.nn.functional as F
 
 class PVNet(nn.Module):
     
@@ -17,3 +19,39 @@ class PVNet(nn.Module):
 
     def forward(self, x):
         return self.net(x)
+
+class SequencePVNet(nn.Module):
+    """
+    PVNet over possession sequences (training.train_loop.SequenceBatchLoader batches).
+
+    The first layer sees a causal window instead of one event: the features of the last
+    `context` events of the sequence up to and including the scored one (plus a flag per
+    slot that is 0 before the start of the sequence), so right padding never reaches a
+    real event. The rest is PVNet, run on the real events only: per event it costs one
+    wider first matmul, all in dense GEMMs. forward(batch) returns (n_events, 2) logits
+    in mask order, the layout of the loader's yb.
+    max_len: the cut possession_sequences applied to the training sequences (Config.SEQ_MAX_LEN);
+    scoring cuts the same way, so every event sees the context it was trained with.
+    """
+    sequence = True
+
+    def __init__(self, in_dim: int, hidden_dim: int = 128, dropout: float = 0.15, context: int = 8,
+                 max_len: int | None = None):
+        super().__init__()
+        self.context = context
+        self.max_len = max_len
+        self.net = nn.Sequential(
+            nn.Linear(context * (in_dim + 1), hidden_dim),
+            nn.ReLU(),
+            nn.Dropout(dropout),
+            nn.Linear(hidden_dim, hidden_dim),
+            nn.ReLU(),
+            nn.Dropout(dropout),
+            nn.Linear(hidden_dim, 2)
+        )
+
+    def forward(self, batch):
+        x = torch.cat([batch.x, batch.mask.unsqueeze(-1).to(batch.x.dtype)], dim=-1)  # (B, L, F + 1)
+        # windows[b, t] = events t - context + 1 .. t (oldest first), zeros before the sequence
+        windows = F.pad(x, (0, 0, self.context - 1, 0)).unfold(1, self.context, 1)  # (B, L, F + 1, context)
+        return self.net(windows[batch.mask].flatten(1))
@@ -0,0 +1,338 @@
+"""
+Lightweight per-stage instrumentation: timing spans, row counts and peak RSS.
+
+Disabled by default (span() is then a no-op). Turn it on from Config:
+
+    cfg = Config(PROFILE=True, PROFILE_STAGE="training.train_one_epoch", PROFILE_TOOL="torch")
+    tracing.configure(cfg)
+    ...  # run the pipeline
+    tracing.write_report()  # <PROFILE_DIR>/<run>.json + <run>.trace.json (chrome://tracing, Perfetto)
+
+Pipeline functions are wrapped with @traced("<package>.<function>") or open a
+span(...) themselves. Nested spans are kept (depth, parent). Peak RSS is
+per span on Linux (the VmHWM high-water mark is reset on span entry and folded
+into the parent on exit); elsewhere it falls back to the process-lifetime peak.
+The high-water mark is process-wide, so only the thread that opened the current
+root span resets and reads it; spans of other threads (e.g. the fetch pool of
+iter_competition_events) report no peak, and their memory counts towards the
+enclosing span of that thread.
+
+PROFILE_STAGE attaches cProfile (<stage>.prof + top functions in the report)
+or the PyTorch profiler (<stage>.torch.json) to every span with that name.
+"""
+from __future__ import annotations
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_PROC_STATUS = Path("/proc/self/status")
+_CLEAR_REFS = Path("/proc/self/clear_refs")
+
+def _status_kb(field: str) -> int | None:
+    try:
+        for line in _PROC_STATUS.read_text().splitlines():
+            if line.startswith(field):
+                return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+def rss_mb() -> float | None:
+    kb = _status_kb("VmRSS:")
+    return None if kb is None else kb / 1024.0
+
+def peak_rss_mb() -> float | None:
+    kb = _status_kb("VmHWM:")
+    if kb is None and resource is not None:
+        kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == "darwin":
+            kb /= 1024.0
+    return None if kb is None else kb / 1024.0
+
+def _reset_peak() -> bool:
+    try:
+        _CLEAR_REFS.write_text("5")
+        return True
+    except OSError:
+        return False
+
+def _rows_of(result, *args, **kwargs) -> int | None:
+    if isinstance(result, tuple):
+        counts = [_rows_of(r) for r in result]
+        return sum(c for c in counts if c is not None) if any(c is not None for c in counts) else None
+    if hasattr(result, "shape") and getattr(result, "shape"):
+        return int(result.shape[0])
+    return None
+
+class _NoopSpan:
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+_NOOP = _NoopSpan()
+
+class Span:
+    def __init__(self, tracer: "Tracer", name: str, rows: int | None, attrs: dict):
+        self.tracer = tracer
+        self.name = name
+        self.rows = rows
+        self.attrs = attrs
+        self.peak = 0.0
+        self.tracks_peak = False
+        self._profiler = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        stack = self.tracer._stack()
+        with self.tracer._lock:
+            # a root span with no other root open makes its thread the owner of the high-water mark
+            if not stack and self.tracer._peak_owner is None:
+                self.tracer._peak_owner = threading.get_ident()
+            self.tracks_peak = self.tracer._peak_owner == threading.get_ident()
+        if stack and self.tracks_peak:
+            # fold the parent's peak so far in before resetting the high-water mark
+            stack[-1].peak = max(stack[-1].peak, peak_rss_mb() or 0.0)
+        self.depth = len(stack)
+        self.parent = stack[-1].name if stack else None
+        stack.append(self)
+
+        if self.tracks_peak:
+            self.tracer._resettable = self.tracer._resettable and _reset_peak()
+        self.rss_start = rss_mb()
+        if self.name == self.tracer.profile_stage and not self.tracer._profiling:
+            # one profiler at a time (nested or concurrent spans of the stage are only timed)
+            self.tracer._profiling = True
+            self._profiler = self.tracer._start_profiler()
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        t1 = time.perf_counter()
+        if self._profiler is not None:
+            self.tracer._stop_profiler(self.name, self._profiler)
+            self.tracer._profiling = False
+
+        stack = self.tracer._stack()
+        stack.pop()
+        if self.tracks_peak:
+            self.peak = max(self.peak, peak_rss_mb() or 0.0)
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, self.peak)
+            else:
+                with self.tracer._lock:
+                    self.tracer._peak_owner = None
+
+        record = {
+            "name": self.name,
+            "start_s": self.t0 - self.tracer.t0,
+            "seconds": t1 - self.t0,
+            "rows": self.rows,
+            "rss_start_mb": self.rss_start,
+            "rss_end_mb": rss_mb(),
+            "peak_rss_mb": self.peak or None,
+            "depth": self.depth,
+            "parent": self.parent,
+            "thread": threading.get_ident(),
+        }
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        if self.attrs:
+            record["attrs"] = self.attrs
+        with self.tracer._lock:
+            self.tracer.spans.append(record)
+        return False
+
+class Tracer:
+    def __init__(
+        self,
+        enabled: bool = False,
+        out_dir: str | Path | None = None,
+        profile_stage: str | None = None,
+        profile_tool: str = "cprofile",
+    ):
+        if profile_tool not in ("cprofile", "torch"):
+            raise ValueError(f"profile_tool must be 'cprofile' or 'torch', got {profile_tool!r}")
+        self.enabled = enabled
+        self.out_dir = Path(out_dir) if out_dir is not None else Path("profiles")
+        self.profile_stage = profile_stage or None
+        self.profile_tool = profile_tool
+        self.run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ") + f"-{os.getpid()}"
+        self.t0 = time.perf_counter()
+        self.spans: list[dict] = []
+        self.profiles: dict[str, str] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._resettable = True
+        self._peak_owner = None  # thread id of the open root span that resets VmHWM
+        self._profiling = False
+
+    def _stack(self) -> list[Span]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def span(self, name: str, rows: int | None = None, **attrs):
+        if not self.enabled:
+            return _NOOP
+        return Span(self, name, rows, attrs)
+
+    def _start_profiler(self):
+        if self.profile_tool == "torch":
+            import torch
+            activities = [torch.profiler.ProfilerActivity.CPU]
+            if torch.cuda.is_available():
+                activities.append(torch.profiler.ProfilerActivity.CUDA)
+            prof = torch.profiler.profile(activities=activities, record_shapes=True)
+            prof.__enter__()
+            return prof
+        prof = cProfile.Profile()
+        prof.enable()
+        return prof
+
+    def _stop_profiler(self, name: str, prof):
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        n = sum(1 for s in self.spans if s["name"] == name)
+        stem = f"{self.run_id}-{name}-{n}"
+        if self.profile_tool == "torch":
+            prof.__exit__(None, None, None)
+            path = self.out_dir / f"{stem}.torch.json"
+            prof.export_chrome_trace(str(path))
+            self.profiles[stem] = str(path)
+            return
+        prof.disable()
+        path = self.out_dir / f"{stem}.prof"
+        prof.dump_stats(str(path))
+        buf = io.StringIO()
+        pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(25)
+        self.profiles[stem] = str(path)
+        self.profiles[f"{stem}.top"] = buf.getvalue()
+
+    def summary(self) -> dict:
+        """
+        Per stage name: calls, total seconds, total rows, max peak RSS.
+        """
+        stages = {}
+        for s in self.spans:
+            st = stages.setdefault(s["name"], {"calls": 0, "seconds": 0.0, "rows": 0, "peak_rss_mb": None})
+            st["calls"] += 1
+            st["seconds"] += s["seconds"]
+            st["rows"] += s["rows"] or 0
+            if s["peak_rss_mb"] is not None:
+                st["peak_rss_mb"] = max(st["peak_rss_mb"] or 0.0, s["peak_rss_mb"])
+        for st in stages.values():
+            st["rows_per_second"] = st["rows"] / st["seconds"] if st["rows"] and st["seconds"] > 0 else None
+        return stages
+
+    def report(self) -> dict:
+        return {
+            "run_id": self.run_id,
+            "peak_rss_per_span": self._resettable,
+            "stages": self.summary(),
+            "spans": sorted(self.spans, key=lambda s: s["start_s"]),
+            "profiles": self.profiles,
+        }
+
+    def chrome_trace(self) -> dict:
+        pid = os.getpid()
+        events = []
+        for s in self.spans:
+            args = {"rows": s["rows"], "peak_rss_mb": s["peak_rss_mb"]}
+            args.update(s.get("attrs", {}))
+            events.append({
+                "name": s["name"],
+                "cat": s["name"].split(".")[0],
+                "ph": "X",
+                "ts": s["start_s"] * 1e6,
+                "dur": s["seconds"] * 1e6,
+                "pid": pid,
+                "tid": s["thread"],
+                "args": args,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_report(self, out_dir: str | Path | None = None) -> tuple[Path, Path]:
+        """
+        Writes <run_id>.json (stages + spans) and <run_id>.trace.json (Chrome trace).
+        """
+        out_dir = Path(out_dir) if out_dir is not None else self.out_dir
+        out_dir.mkdir(parents=True, exist_ok=True)
+        report_path = out_dir / f"{self.run_id}.json"
+        trace_path = out_dir / f"{self.run_id}.trace.json"
+        report_path.write_text(json.dumps(self.report(), indent=2, default=str))
+        trace_path.write_text(json.dumps(self.chrome_trace(), default=str))
+        return report_path, trace_path
+
+    def print_summary(self):
+        for name, st in sorted(self.summary().items(), key=lambda kv: -kv[1]["seconds"]):
+            peak = f"{st['peak_rss_mb']:9.1f} MiB" if st["peak_rss_mb"] is not None else "        -"
+            print(f"{name:<36s} calls={st['calls']:>5d} {st['seconds']:9.3f}s rows={st['rows']:>12,d} peak={peak}")
+
+_tracer = Tracer()
+
+def get_tracer() -> Tracer:
+    return _tracer
+
+def configure(cfg) -> Tracer:
+    """
+    (Re)creates the process tracer from Config.PROFILE / PROFILE_DIR / PROFILE_STAGE / PROFILE_TOOL.
+    """
+    global _tracer
+    _tracer = Tracer(
+        enabled=cfg.PROFILE,
+        out_dir=cfg.PROFILE_DIR,
+        profile_stage=cfg.PROFILE_STAGE,
+        profile_tool=cfg.PROFILE_TOOL,
+    )
+    return _tracer
+
+def span(name: str, rows: int | None = None, **attrs):
+    """
+    with span("data.read", rows=n) as s: ...; s.rows = n_out  (no-op unless profiling is on)
+    """
+    return _tracer.span(name, rows, **attrs)
+
+def traced(name: str, rows=_rows_of):
+    """
+    Decorator: runs the function inside span(name); rows(result, *args, **kwargs) gives the
+    row count (default: len of a DataFrame / array result, summed over tuples).
+    """
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            tracer = _tracer
+            if not tracer.enabled:
+                return fn(*args, **kwargs)
+            with tracer.span(name) as s:
+                result = fn(*args, **kwargs)
+                if rows is not None:
+                    s.rows = rows(result, *args, **kwargs)
+                return result
+        return wrapper
+    return deco
+
+def write_report(out_dir: str | Path | None = None) -> tuple[Path, Path] | None:
+    if not _tracer.enabled:
+        return None
+    return _tracer.write_report(out_dir)
@@ -0,0 +1,222 @@
+"""
+Resumable training runs: checkpoints written from a background thread.
+
+A checkpoint holds everything the training loop needs to continue as if it had not
+stopped: model and optimizer state, the last finished epoch, the early-stopping state
+(best val loss, best weights, epochs without improvement, stopped flag), the history,
+and the Python / NumPy / torch RNG states (dropout and the shuffles of loaders built
+without an explicit generator= draw from them).
+
+    signature = run_signature(cfg, data=data_fingerprint(X, y_shot, y_goal, train_rows, feature_cols=FEATURE_COLS))
+    state = resume_or_start(path, model, optimizer, signature=signature, resume=cfg.RESUME_TRAINING)
+    with AsyncCheckpointer(path) as ckpt:                       # close() waits for the last write
+        for epoch in range(state["epoch"] + 1, cfg.EPOCHS + 1):
+            ...
+            ckpt.save(training_state(model, optimizer, epoch, ...))  # returns right after the snapshot
+
+The snapshot (a CPU copy of every tensor) is taken in the training thread, so the epoch
+can keep updating the weights while the copy is written; a snapshot that is still queued
+when the next one arrives is replaced by it. Files are written atomically (temp file +
+os.replace), so a crash mid-write leaves the previous checkpoint intact.
+"""
+from __future__ import annotations
+import hashlib
+import os
+import random
+import threading
+from pathlib import Path
+
+import numpy as np
+import torch
+
+# Config fields a checkpoint must agree on to be resumed (EPOCHS / patience may change)
+RESUME_FIELDS = (
+    "HIDDEN_DIM", "DROPOUT", "LR", "WEIGHT_DECAY", "BATCH_SIZE", "K_FUTURE_EVENTS", "RANDOM_SEED",
+    "SEQUENCE_MODEL", "SEQ_MAX_LEN", "SEQ_CONTEXT", "TRAIN_BF16",
+)
+
+def run_signature(cfg, **extra) -> dict:
+    """
+    What identifies a training run: the RESUME_FIELDS of cfg plus extra (e.g. the
+    data_fingerprint of the training data).
+    """
+    sig = {f: getattr(cfg, f) for f in RESUME_FIELDS if hasattr(cfg, f)}
+    sig.update(extra)
+    return sig
+
+def data_fingerprint(*arrays, **meta) -> str:
+    """
+    Hash of the training data: the bytes of arrays (numpy arrays or CPU tensors, e.g. X,
+    labels and train rows; None is skipped) and the repr of meta (e.g. competitions,
+    feature_cols). Same-size data with other values gives another fingerprint.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for key in sorted(meta):
+        h.update(f"{key}={meta[key]!r};".encode())
+    for a in arrays:
+        if a is None:
+            continue
+        a = np.ascontiguousarray(a.numpy() if isinstance(a, torch.Tensor) else a)
+        h.update(f"{a.dtype}{a.shape};".encode())
+        h.update(a.reshape(-1).view(np.uint8))
+    return h.hexdigest()
+
+def _cpu_copy(obj):
+    # deep copy with every tensor cloned to CPU (optimizer state dicts hold live tensors)
+    if isinstance(obj, torch.Tensor):
+        return obj.detach().to("cpu", copy=True)
+    if isinstance(obj, dict):
+        return {k: _cpu_copy(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_cpu_copy(v) for v in obj)
+    return obj
+
+def rng_state() -> dict:
+    state = {"python": random.getstate(), "numpy": np.random.get_state(), "torch": torch.get_rng_state()}
+    if torch.cuda.is_available():
+        state["cuda"] = torch.cuda.get_rng_state_all()
+    return state
+
+def set_rng_state(state: dict) -> None:
+    random.setstate(state["python"])
+    np.random.set_state(state["numpy"])
+    torch.set_rng_state(state["torch"])
+    if "cuda" in state and torch.cuda.is_available():
+        torch.cuda.set_rng_state_all(state["cuda"])
+
+def training_state(
+    model,
+    optimizer,
+    epoch: int,
+    best_val: float,
+    best_state: dict | None,
+    pat: int,
+    history: list,
+    stopped: bool = False,
+    signature: dict | None = None,
+) -> dict:
+    """
+    Snapshot of the loop after `epoch` finished (CPU copies, safe to write while training goes on).
+    """
+    return _cpu_copy({
+        "model_state_dict": model.state_dict(),
+        "optimizer_state_dict": optimizer.state_dict(),
+        "epoch": epoch,
+        "best_val": best_val,
+        "best_state": best_state,
+        "pat": pat,
+        "history": list(history),
+        "stopped": stopped,
+        "signature": signature or {},
+        "rng": rng_state(),
+    })
+
+def load_checkpoint(path: str | Path, model, optimizer, signature: dict | None = None) -> dict:
+    """
+    Restores model, optimizer and RNG states from a checkpoint and returns it (epoch,
+    best_val, best_state, pat, history, stopped). Raises ValueError when signature is
+    given and differs from the one the checkpoint was written with.
+    """
+    ckpt = torch.load(path, map_location="cpu", weights_only=False)
+    if signature is not None and ckpt.get("signature") != signature:
+        raise ValueError(
+            f"checkpoint {path} belongs to another run: {ckpt.get('signature')} != {signature}; "
+            "delete it or start with Config(RESUME_TRAINING=False)"
+        )
+    model.load_state_dict(ckpt["model_state_dict"])
+    optimizer.load_state_dict(ckpt["optimizer_state_dict"])
+    set_rng_state(ckpt["rng"])
+    return ckpt
+
+def resume_or_start(path: str | Path | None, model, optimizer, signature: dict | None = None, resume: bool = True) -> dict:
+    """
+    The loop state to start from: the checkpoint at path when resume is set and it exists
+    (model / optimizer / RNG restored), otherwise a fresh state with epoch 0.
+    """
+    if resume and path is not None and Path(path).exists():
+        return load_checkpoint(path, model, optimizer, signature=signature)
+    return {"epoch": 0, "best_val": float("inf"), "best_state": None, "pat": 0, "history": [], "stopped": False}
+
+class AsyncCheckpointer:
+    """
+    Writes training_state snapshots to path from one background thread (see module docstring).
+    Write errors are raised by the next save / wait / close; leaving a `with` block on an
+    exception stops the writer without raising them, so that exception is the one seen.
+    """
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._cond = threading.Condition()
+        self._pending = None
+        self._writing = False
+        self._closed = False
+        self._error = None
+        self.written = 0
+        self._thread = threading.Thread(target=self._run, name="checkpoint-writer", daemon=True)
+        self._thread.start()
+
+    def _raise_error(self):
+        if self._error is not None:
+            err, self._error = self._error, None
+            raise RuntimeError(f"writing checkpoint {self.path} failed") from err
+
+    def save(self, state: dict) -> None:
+        with self._cond:
+            self._raise_error()
+            if self._closed:
+                raise RuntimeError("checkpointer is closed")
+            self._pending = state
+            self._cond.notify_all()
+
+    def _write(self, state: dict) -> None:
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        torch.save(state, tmp)
+        os.replace(tmp, self.path)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._pending is None:
+                    return
+                state, self._pending = self._pending, None
+                self._writing = True
+            try:
+                self._write(state)
+                self.written += 1
+            except Exception as e:  # surfaced in the training thread
+                with self._cond:
+                    self._error = e
+            finally:
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
+
+    def wait(self) -> None:
+        """
+        Blocks until every snapshot passed to save is on disk.
+        """
+        with self._cond:
+            while self._pending is not None or self._writing:
+                self._cond.wait()
+            self._raise_error()
+
+    def close(self, raise_errors: bool = True) -> None:
+        """
+        Waits for the last snapshot and stops the writer (also when that write failed).
+        """
+        with self._cond:
+            while self._pending is not None or self._writing:
+                self._cond.wait()
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        if raise_errors:
+            self._raise_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(raise_errors=exc_type is None)
@@ -34,6 +34,27 @@ def compute_metrics(logits, y_true):
 
     return metrics, probs
 
+def check_metrics_close(reference: dict, candidate: dict, atol: float = 0.005) -> dict:
+    """
+    Checks that two compute_metrics results agree within atol on every metric (e.g. a
+    fast-mode run against the fp32 eager baseline). Raises ValueError otherwise;
+    returns {"<task>.<metric>": |difference|}.
+    """
+    diffs = {}
+    for task, ref in reference.items():
+        for name, value in ref.items():
+            other = candidate[task][name]
+            if value is None or other is None:
+                if value is not other:
+                    raise ValueError(f"{task}.{name}: {value} vs {other}")
+                continue
+            diffs[f"{task}.{name}"] = abs(float(value) - float(other))
+
+    worst = max(diffs, key=diffs.get) if diffs else None
+    if worst is not None and diffs[worst] > atol:
+        raise ValueError(f"metrics differ beyond atol={atol}: {worst} by {diffs[worst]:.4g}")
+    return diffs
+
 def calibration_data(probs, y_true, n_bins=10):
     out = {}
     for i, name in enumerate(["shot", "goal"]):
@@ -42,3 +63,114 @@ def calibration_data(probs, y_true, n_bins=10):
         frac_pos, mean_pred = calibration_curve(y, p, n_bins=n_bins, strategy="uniform")
         out[name] = {"mean_pred": mean_pred.tolist(), "frac_pos": frac_pos.tolist()}
     return out
+
+class StreamingMetrics:
+    """
+    One-pass, constant-memory version of compute_metrics + calibration_data.
+    update(logits, y_true) per batch; compute() / calibration() at the end return the same dicts.
+
+    Logits are binned into n_bins fixed-width bins over [-logit_clip, logit_clip] with separate
+    positive/negative counts, and ROC-AUC / PR-AUC are computed on those bins (scores in one bin
+    count as ties). Logit bins keep resolution at the small probabilities of goal_within_k.
+    Log loss, Brier and the calibration bins are exact sums.
+    """
+    TASKS = ("shot", "goal")
+
+    def __init__(self, n_bins: int = 8192, logit_clip: float = 16.0, calib_bins: int = 10):
+        self.n_bins = n_bins
+        self.logit_clip = logit_clip
+        self.calib_bins = calib_bins
+        self.calib_edges = np.linspace(0.0, 1.0, calib_bins + 1)[1:-1]
+        self.reset()
+
+    def reset(self):
+        n_tasks = len(self.TASKS)
+        self.pos_hist = np.zeros((n_tasks, self.n_bins), dtype=np.int64)
+        self.neg_hist = np.zeros((n_tasks, self.n_bins), dtype=np.int64)
+        self.log_loss_sum = np.zeros(n_tasks)
+        self.brier_sum = np.zeros(n_tasks)
+        self.calib_sum_p = np.zeros((n_tasks, self.calib_bins))
+        self.calib_sum_y = np.zeros((n_tasks, self.calib_bins))
+        self.calib_count = np.zeros((n_tasks, self.calib_bins), dtype=np.int64)
+        self.n = 0
+
+    def update(self, logits, y_true):
+        """
+        logits: (N,2), y_true: (N,2); numpy arrays or CPU tensors.
+        """
+        logits = np.asarray(logits, dtype=np.float64)
+        y_true = np.asarray(y_true)
+        scale = self.n_bins / (2.0 * self.logit_clip)
+
+        for i in range(len(self.TASKS)):
+            z = logits[:, i]
+            y = y_true[:, i].astype(bool)
+            p = sigmoid(z)
+
+            b = np.clip(((z + self.logit_clip) * scale).astype(np.int64), 0, self.n_bins - 1)
+            self.pos_hist[i] += np.bincount(b[y], minlength=self.n_bins)
+            self.neg_hist[i] += np.bincount(b[~y], minlength=self.n_bins)
+
+            pc = np.clip(p, 1e-6, 1 - 1e-6)
+            self.log_loss_sum[i] -= np.log(pc[y]).sum() + np.log1p(-pc[~y]).sum()
+            self.brier_sum[i] += np.square(p - y).sum()
+
+            c = np.searchsorted(self.calib_edges, p)
+            self.calib_sum_p[i] += np.bincount(c, weights=p, minlength=self.calib_bins)
+            self.calib_sum_y[i] += np.bincount(c, weights=y, minlength=self.calib_bins)
+            self.calib_count[i] += np.bincount(c, minlength=self.calib_bins)
+
+        self.n += len(logits)
+
+    @staticmethod
+    def _curve_areas(pos: np.ndarray, neg: np.ndarray) -> tuple[float, float]:
+        # thresholds from the highest bin down
+        tp = np.cumsum(pos[::-1])
+        fp = np.cumsum(neg[::-1])
+        P, N = tp[-1], fp[-1]
+
+        tpr = np.concatenate([[0.0], tp / P])
+        fpr = np.concatenate([[0.0], fp / N])
+        roc_auc = float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2.0))
+
+        # average precision: sum over thresholds of (R_n - R_{n-1}) * P_n
+        keep = (pos[::-1] + neg[::-1]) > 0
+        precision = tp[keep] / (tp[keep] + fp[keep])
+        recall = np.concatenate([[0.0], tp[keep] / P])
+        pr_auc = float(np.sum(np.diff(recall) * precision))
+        return roc_auc, pr_auc
+
+    def compute(self) -> dict:
+        """
+        Same structure as the metrics dict of compute_metrics.
+        """
+        metrics = {}
+        n = max(self.n, 1)
+        for i, name in enumerate(self.TASKS):
+            n_pos = int(self.pos_hist[i].sum())
+            if n_pos == 0 or n_pos == self.n:
+                auc, pr_auc = None, None
+            else:
+                auc, pr_auc = self._curve_areas(self.pos_hist[i], self.neg_hist[i])
+
+            metrics[name] = {
+                "roc_auc": auc,
+                "pr_auc": pr_auc,
+                "log_loss": float(self.log_loss_sum[i] / n),
+                "brier": float(self.brier_sum[i] / n),
+                "pos_rate": float(n_pos / n),
+            }
+        return metrics
+
+    def calibration(self) -> dict:
+        """
+        Same structure as calibration_data (uniform bins, empty bins dropped).
+        """
+        out = {}
+        for i, name in enumerate(self.TASKS):
+            nz = self.calib_count[i] > 0
+            out[name] = {
+                "mean_pred": (self.calib_sum_p[i][nz] / self.calib_count[i][nz]).tolist(),
+                "frac_pos": (self.calib_sum_y[i][nz] / self.calib_count[i][nz]).tolist(),
+            }
+        return out
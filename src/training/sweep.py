@@ -0,0 +1,294 @@
+"""
+Parallel hyperparameter sweep over Config.
+
+    cd src
+    python -m training.sweep --data ../artifacts/sweep_data --grid grid.json --workers 8
+
+The scaled train/val matrices are written once as .npy files (prepare_sweep_data)
+and every worker opens them with np.load(mmap_mode="r"), so all processes read the
+same page-cache pages instead of receiving pickled copies. grid.json maps Config
+fields to lists of values, e.g. {"HIDDEN_DIM": [64, 128], "LR": [1e-3, 3e-4]}.
+Each run trains a PVNet like the notebook (AdamW, BCEWithLogitsLoss, early stopping
+on val loss) and adds one row (val compute_metrics + epoch timings) to the results table.
+
+cross_validate runs one config over the grouped k-fold of a MatchIndex (data/split.py)
+on a single shared feature matrix: folds are row indices, scaling happens per batch.
+"""
+from __future__ import annotations
+import argparse
+import contextlib
+import dataclasses
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import multiprocessing as mp
+import numpy as np
+import pandas as pd
+import torch
+
+from config import Config
+from data.labeling import add_future_labels
+from data.preprocessing import FEATURE_COLS
+from models.pvnet import PVNet
+from training.evaluate import compute_metrics
+from training.checkpoint import AsyncCheckpointer, data_fingerprint, resume_or_start, run_signature, training_state
+from training.train_loop import eval_one_epoch, make_loader, train_one_epoch
+from training.utils import fast_training, fit_scaler, set_seed
+
+SWEEP_FIELDS = ("HIDDEN_DIM", "DROPOUT", "LR", "WEIGHT_DECAY", "BATCH_SIZE", "K_FUTURE_EVENTS")
+
+def grid(**axes) -> list[dict]:
+    """
+    Cartesian product of Config overrides: grid(LR=[1e-3, 3e-4], HIDDEN_DIM=[64, 128]) -> 4 dicts.
+    """
+    keys = list(axes)
+    return [dict(zip(keys, values)) for values in itertools.product(*(axes[k] for k in keys))]
+
+def _labels(df: pd.DataFrame, k: int, label_k: int | None) -> np.ndarray:
+    if k != label_k or "shot_within_k" not in df.columns:
+        df = add_future_labels(df, k=k)
+    return np.stack(
+        [df["shot_within_k"].to_numpy(dtype=np.float32), df["goal_within_k"].to_numpy(dtype=np.float32)], axis=1
+    )
+
+def prepare_sweep_data(
+    out_dir: str | Path,
+    train_df: pd.DataFrame,
+    val_df: pd.DataFrame,
+    scaler,
+    ks: tuple[int, ...] = (10,),
+    label_k: int | None = 10,
+    feature_cols: list[str] = FEATURE_COLS,
+) -> Path:
+    """
+    Writes X_train.npy / X_val.npy (scaled, float32, C-contiguous) and y_{split}_k{k}.npy
+    ((N, 2) [shot, goal]) for every k in ks. Frames already labeled with label_k reuse
+    their columns for that k; other ks are relabeled on the split frames.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    for split, d in (("train", train_df), ("val", val_df)):
+        X = scaler.transform(d[feature_cols].astype(float).values).astype(np.float32)
+        np.save(out_dir / f"X_{split}.npy", np.ascontiguousarray(X))
+        for k in ks:
+            np.save(out_dir / f"y_{split}_k{k}.npy", _labels(d, k, label_k))
+
+    meta = {"ks": [int(k) for k in ks], "feature_cols": list(feature_cols), "n_train": len(train_df), "n_val": len(val_df)}
+    (out_dir / "meta.json").write_text(json.dumps(meta, indent=2))
+    return out_dir
+
+def _open(data_dir: Path, split: str, k: int) -> tuple[np.ndarray, np.ndarray]:
+    y_path = data_dir / f"y_{split}_k{k}.npy"
+    if not y_path.exists():
+        raise FileNotFoundError(f"No labels for K_FUTURE_EVENTS={k} in {data_dir}; add it to prepare_sweep_data(ks=...)")
+    return np.load(data_dir / f"X_{split}.npy", mmap_mode="r"), np.load(y_path, mmap_mode="r")
+
+def _loader_fingerprint(loader) -> str:
+    # the rows a loader trains on (TensorBatchLoader / SequenceBatchLoader keep X, y and rows)
+    rows = loader.rows.cpu() if isinstance(loader.rows, torch.Tensor) else loader.rows
+    return data_fingerprint(loader.X.cpu(), loader.y.cpu(), rows)
+
+def fit(cfg: Config, train_loader, val_loader, in_dim: int, device=None,
+        checkpoint_path: str | Path | None = None) -> tuple[PVNet, dict]:
+    """
+    The notebook training loop: AdamW + BCEWithLogitsLoss, best val_loss state kept,
+    early stopping after EARLY_STOPPING_PATIENCE epochs without improvement.
+    Config's fast CPU mode (TRAIN_BF16, TRAIN_COMPILE, TORCH_THREADS) applies as in the notebook.
+    checkpoint_path: every epoch is checkpointed there in the background (training/checkpoint.py),
+    and a run with the same settings and training data continues from it (Config.RESUME_TRAINING).
+    """
+    device = device if device is not None else torch.device("cpu")
+    model = PVNet(in_dim=in_dim, hidden_dim=cfg.HIDDEN_DIM, dropout=cfg.DROPOUT).to(device)
+    criterion = torch.nn.BCEWithLogitsLoss().to(device)
+    optimizer = torch.optim.AdamW(model.parameters(), lr=cfg.LR, weight_decay=cfg.WEIGHT_DECAY)
+    train_model, train_criterion = fast_training(model, criterion, cfg)
+
+    signature = None
+    if checkpoint_path is not None:  # hashing the training data is only needed to match checkpoints
+        signature = run_signature(cfg, in_dim=in_dim, data=_loader_fingerprint(train_loader))
+    state = resume_or_start(checkpoint_path, model, optimizer, signature=signature, resume=cfg.RESUME_TRAINING)
+    best_val, best_state, pat, history = state["best_val"], state["best_state"], state["pat"], state["history"]
+    with (AsyncCheckpointer(checkpoint_path) if checkpoint_path is not None else contextlib.nullcontext()) as checkpointer:
+        for epoch in range(state["epoch"] + 1, cfg.EPOCHS + 1):
+            if state["stopped"]:
+                break
+            t0 = time.perf_counter()
+            tr_loss = train_one_epoch(train_model, train_loader, optimizer, train_criterion, device, autocast=cfg.TRAIN_BF16)
+            va_loss, _, _ = eval_one_epoch(train_model, val_loader, train_criterion, device, autocast=cfg.TRAIN_BF16)
+            history.append({"epoch": epoch, "train_loss": tr_loss, "val_loss": va_loss, "seconds": time.perf_counter() - t0})
+
+            if va_loss < best_val - 1e-5:
+                best_val, pat = va_loss, 0
+                best_state = {k: v.detach().cpu().clone() for k, v in model.state_dict().items()}
+            else:
+                pat += 1
+            stopped = pat >= cfg.EARLY_STOPPING_PATIENCE
+            if checkpointer is not None:
+                checkpointer.save(training_state(model, optimizer, epoch, best_val, best_state, pat, history,
+                                                 stopped=stopped, signature=signature))
+            if stopped:
+                break
+
+    if best_state is not None:
+        model.load_state_dict(best_state)
+    best_epoch = next((h["epoch"] for h in history if h["val_loss"] == best_val), 0)
+    return model, {"best_val_loss": best_val, "best_epoch": best_epoch, "history": history}
+
+def run_config(overrides: dict, data_dir: str | Path, base: Config | None = None) -> dict:
+    """
+    Trains one configuration on the memory-mapped sweep data; returns one results row.
+    """
+    cfg = dataclasses.replace(base if base is not None else Config(), **overrides)
+    data_dir = Path(data_dir)
+    set_seed(cfg.RANDOM_SEED)
+
+    X_train, y_train = _open(data_dir, "train", cfg.K_FUTURE_EVENTS)
+    X_val, y_val = _open(data_dir, "val", cfg.K_FUTURE_EVENTS)
+    train_loader = make_loader(X_train, y_train[:, 0], y_train[:, 1], batch_size=cfg.BATCH_SIZE, shuffle=True)
+    val_loader = make_loader(X_val, y_val[:, 0], y_val[:, 1], batch_size=cfg.BATCH_SIZE, shuffle=False)
+
+    t0 = time.perf_counter()
+    model, fit_info = fit(cfg, train_loader, val_loader, in_dim=X_train.shape[1])
+    _, val_logits, val_y = eval_one_epoch(model, val_loader, torch.nn.BCEWithLogitsLoss(), torch.device("cpu"))
+    metrics, _ = compute_metrics(val_logits, val_y)
+
+    epoch_seconds = [h["seconds"] for h in fit_info["history"]]
+    row = {f: getattr(cfg, f) for f in SWEEP_FIELDS}
+    row.update({k: v for k, v in overrides.items() if k not in row})
+    row.update(
+        {
+            "best_val_loss": fit_info["best_val_loss"],
+            "best_epoch": fit_info["best_epoch"],
+            "epochs_run": len(epoch_seconds),
+            "epoch_seconds_mean": float(np.mean(epoch_seconds)),
+            "epoch_seconds_max": float(np.max(epoch_seconds)),
+            "train_seconds": time.perf_counter() - t0,
+            "pid": os.getpid(),
+        }
+    )
+    for task, m in metrics.items():
+        for name, value in m.items():
+            row[f"{task}_{name}"] = value
+    return row
+
+def cross_validate(
+    cfg: Config,
+    X: np.ndarray,
+    y_shot: np.ndarray,
+    y_goal: np.ndarray,
+    index,
+    n_folds: int = 5,
+    device=None,
+) -> pd.DataFrame:
+    """
+    Grouped k-fold CV of one config: X / y_shot / y_goal are unscaled arrays aligned with
+    the frame of index (MatchIndex). Every fold fits its scaler on its train rows and
+    trains on row indices into X, so no fold copies the data. One row per fold.
+    """
+    device = device if device is not None else torch.device("cpu")
+    rows = []
+    for k, (train_rows, val_rows) in enumerate(index.kfold(n_folds, seed=cfg.RANDOM_SEED)):
+        set_seed(cfg.RANDOM_SEED)
+        scaler = fit_scaler(X, train_rows)
+        train_loader = make_loader(X, y_shot, y_goal, batch_size=cfg.BATCH_SIZE, shuffle=True, device=device,
+                                   rows=train_rows, scaler=scaler)
+        val_loader = make_loader(X, y_shot, y_goal, batch_size=cfg.BATCH_SIZE, shuffle=False, device=device,
+                                 rows=val_rows, scaler=scaler)
+
+        t0 = time.perf_counter()
+        model, fit_info = fit(cfg, train_loader, val_loader, in_dim=X.shape[1], device=device)
+        _, val_logits, val_y = eval_one_epoch(model, val_loader, torch.nn.BCEWithLogitsLoss(), device)
+        metrics, _ = compute_metrics(val_logits, val_y)
+
+        row = {
+            "fold": k,
+            "n_train": len(train_rows),
+            "n_val": len(val_rows),
+            "best_val_loss": fit_info["best_val_loss"],
+            "best_epoch": fit_info["best_epoch"],
+            "train_seconds": time.perf_counter() - t0,
+        }
+        for task, m in metrics.items():
+            for name, value in m.items():
+                row[f"{task}_{name}"] = value
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+def _init_worker(threads: int):
+    torch.set_num_threads(threads)
+
+def _check_overrides(configs: list[dict]):
+    fields = {f.name for f in dataclasses.fields(Config)}
+    unknown = sorted({k for c in configs for k in c} - fields)
+    if unknown:
+        raise ValueError(f"Unknown Config fields in sweep: {unknown}")
+
+def run_sweep(
+    configs: list[dict],
+    data_dir: str | Path,
+    max_workers: int | None = None,
+    threads_per_worker: int = 1,
+    base: Config | None = None,
+    results_path: str | Path | None = None,
+) -> pd.DataFrame:
+    """
+    Runs every config (dict of Config overrides) in a process pool and returns the results
+    table, one row per config in input order. results_path (csv) is rewritten after every
+    finished run so a long sweep can be inspected, or resumed by hand, while it runs.
+    """
+    _check_overrides(configs)
+    if max_workers is None:
+        max_workers = max(1, (os.cpu_count() or 1) // threads_per_worker)
+
+    rows = [None] * len(configs)
+    ctx = mp.get_context("spawn")  # fresh interpreters: no forked torch thread pools
+    with ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=ctx, initializer=_init_worker, initargs=(threads_per_worker,)
+    ) as pool:
+        futures = {pool.submit(run_config, c, str(data_dir), base): i for i, c in enumerate(configs)}
+        for fut in as_completed(futures):
+            i = futures[fut]
+            try:
+                rows[i] = {"run_id": i, **fut.result()}
+            except Exception as e:
+                rows[i] = {"run_id": i, **configs[i], "error": repr(e)}
+            if results_path is not None:
+                pd.DataFrame([r for r in rows if r is not None]).sort_values("run_id").to_csv(results_path, index=False)
+
+    return pd.DataFrame(rows)
+
+def main():
+    cfg = Config()
+    ap = argparse.ArgumentParser(description="Parallel PVNet hyperparameter sweep.")
+    ap.add_argument("--data", required=True, help="folder written by prepare_sweep_data")
+    ap.add_argument("--grid", required=True, help='JSON file {"FIELD": [values, ...]} or list of override dicts')
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--threads-per-worker", type=int, default=1)
+    ap.add_argument("--epochs", type=int, default=cfg.EPOCHS)
+    ap.add_argument("--out", default=None, help="results csv (default: <data>/sweep_results.csv)")
+    args = ap.parse_args()
+
+    spec = json.loads(Path(args.grid).read_text())
+    configs = spec if isinstance(spec, list) else grid(**spec)
+    out = Path(args.out) if args.out else Path(args.data) / "sweep_results.csv"
+
+    t0 = time.perf_counter()
+    results = run_sweep(
+        configs,
+        args.data,
+        max_workers=args.workers,
+        threads_per_worker=args.threads_per_worker,
+        base=dataclasses.replace(cfg, EPOCHS=args.epochs),
+        results_path=out,
+    )
+    print(f"{len(results)} runs in {time.perf_counter() - t0:.1f}s -> {out}")
+    if "best_val_loss" in results.columns:
+        print(results.sort_values("best_val_loss").head(10).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
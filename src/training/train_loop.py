@@ -1,26 +1,210 @@
 from __future__ import annotations
+import warnings
+
+import numpy as np
 import torch
-from torch.utils.data import DataLoader, TensorDataset
 
-def make_loader(X, y_shot, y_goal, batch_size=4096, shuffle=True):
-    ds = TensorDataset(
-        torch.tensor(X, dtype=torch.float32),
-        torch.tensor(y_shot, dtype=torch.float32),
-        torch.tensor(y_goal, dtype=torch.float32),
+from data.sequences import bucket_batches
+from tracing import traced
+
+def _as_float32_tensor(a) -> torch.Tensor:
+    # shares memory with float32 arrays; read-only inputs (pandas CoW .values, np.load memmaps)
+    # are fine since the loader never writes to them
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="The given NumPy array is not writable")
+        return torch.as_tensor(a, dtype=torch.float32)
+
+class TensorBatchLoader:
+    """
+    In-memory replacement for TensorDataset + DataLoader.
+    X (N, F) float32 and y (N, 2) [shot, goal] are kept contiguous; an epoch applies
+    one permutation (a single gather) and yields (xb, yb) batches as slices of it.
+    Memory-mapped X (np.load(mmap_mode="r"), e.g. the sweep data) is never gathered whole:
+    only the row order is shuffled and each batch is gathered on its own, so processes
+    sharing the file keep reading the same page-cache pages instead of private copies.
+
+    rows: optional row indices (e.g. a MatchIndex split or fold) to iterate over instead
+    of all N rows; batches are then gathered from the shared X, so splits and folds of
+    one matrix need no copies. scaler: optional fitted StandardScaler applied to each
+    batch, so X can stay unscaled and be shared by folds with different scalers.
+    """
+    def __init__(self, X, y_shot, y_goal, batch_size=4096, shuffle=True, device=None, generator=None,
+                 rows=None, scaler=None):
+        device = device if device is not None else torch.device("cpu")
+        # a device copy is private anyway; on CPU a memmap stays shared (see _batches)
+        self.gather_batches = isinstance(X, np.memmap) and torch.device(device).type == "cpu"
+        self.X = _as_float32_tensor(X).to(device).contiguous()
+        y = np.stack([np.asarray(y_shot, dtype=np.float32), np.asarray(y_goal, dtype=np.float32)], axis=1)
+        self.y = torch.from_numpy(y).to(device)
+        self.rows = torch.as_tensor(np.asarray(rows, dtype=np.int64), device=device) if rows is not None else None
+        self.mean, self.scale = None, None
+        if scaler is not None:
+            self.mean = torch.as_tensor(scaler.mean_, dtype=torch.float32, device=device)
+            self.scale = torch.as_tensor(scaler.scale_, dtype=torch.float32, device=device)
+        self.batch_size = int(batch_size)
+        self.shuffle = shuffle
+        self.generator = generator
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.rows) if self.rows is not None else len(self.X)
+
+    def __len__(self):
+        return (self.n_rows + self.batch_size - 1) // self.batch_size
+
+    def _batches(self):
+        X, y = self.X, self.y
+        order = self.rows
+        if self.shuffle:
+            perm = torch.randperm(self.n_rows, generator=self.generator).to(X.device)
+            order = perm if self.rows is None else self.rows[perm]
+            if not self.gather_batches:
+                X, y, order = X[order], y[order], None  # one gather per epoch, batches are slices of it
+        if order is not None:
+            for i in range(0, len(order), self.batch_size):
+                idx = order[i:i + self.batch_size]
+                yield X[idx], y[idx]
+            return
+        for i in range(0, len(X), self.batch_size):
+            yield X[i:i + self.batch_size], y[i:i + self.batch_size]
+
+    def __iter__(self):
+        for xb, yb in self._batches():
+            if self.mean is not None:
+                xb = (xb - self.mean) / self.scale
+            yield xb, yb
+
+def make_loader(X, y_shot, y_goal, batch_size=4096, shuffle=True, device=None, rows=None, scaler=None):
+    return TensorBatchLoader(
+        X, y_shot, y_goal, batch_size=batch_size, shuffle=shuffle, device=device, rows=rows, scaler=scaler
+    )
+
+class PaddedBatch:
+    """
+    Sequences of one bucket, right-padded: x (B, L, F) and mask (B, L) of the real events.
+    size(0) is the number of real events (the rows of yb), so per-event loss averaging
+    in train_one_epoch / eval_one_epoch is the same as for flat (N, F) batches.
+    """
+    def __init__(self, x: torch.Tensor, mask: torch.Tensor, n_events: int):
+        self.x = x
+        self.mask = mask
+        self.n_events = n_events
+
+    def to(self, device) -> "PaddedBatch":
+        return PaddedBatch(self.x.to(device), self.mask.to(device), self.n_events)
+
+    def size(self, dim: int = 0) -> int:
+        return self.n_events if dim == 0 else self.x.size(dim)
+
+class SequenceBatchLoader:
+    """
+    TensorBatchLoader for sequence models: yields (PaddedBatch, yb) where yb (n_events, 2)
+    holds the labels of the real events in mask order (sequence by sequence).
+
+    offsets: possession_sequences(df, rows, max_len) - sequence s is rows[offsets[s]:offsets[s + 1]].
+    batch_size is a token budget (padded events per batch), so batches hold about as many
+    events as the flat loader's. Sequences are length-bucketed (bucket_batches); with
+    shuffle=True the tie-breaks and batch order change every epoch.
+    """
+    def __init__(self, X, y_shot, y_goal, offsets, batch_size=4096, shuffle=True, device=None, generator=None,
+                 rows=None, scaler=None):
+        device = device if device is not None else torch.device("cpu")
+        # a device copy is private anyway; on CPU a memmap stays shared (see _batches)
+        self.gather_batches = isinstance(X, np.memmap) and torch.device(device).type == "cpu"
+        self.X = _as_float32_tensor(X).to(device).contiguous()
+        y = np.stack([np.asarray(y_shot, dtype=np.float32), np.asarray(y_goal, dtype=np.float32)], axis=1)
+        self.y = torch.from_numpy(y).to(device)
+        self.rows = np.arange(len(X), dtype=np.int64) if rows is None else np.asarray(rows, dtype=np.int64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.lengths = np.diff(self.offsets)
+        self.mean, self.scale = None, None
+        if scaler is not None:
+            self.mean = torch.as_tensor(scaler.mean_, dtype=torch.float32, device=device)
+            self.scale = torch.as_tensor(scaler.scale_, dtype=torch.float32, device=device)
+        self.batch_size = int(batch_size)
+        self.shuffle = shuffle
+        self.generator = generator
+        self.device = device
+
+    @property
+    def n_rows(self) -> int:
+        return int(self.lengths.sum())
+
+    def plan(self, rng: np.random.Generator | None = None) -> list[np.ndarray]:
+        return bucket_batches(self.lengths, self.batch_size, rng=rng)
+
+    def __len__(self):
+        return len(self.plan())
+
+    def batches_with_rows(self):
+        """
+        (rows, PaddedBatch, yb) per batch; rows are the X rows of yb, in the same order.
+        """
+        rng = None
+        if self.shuffle:
+            rng = np.random.default_rng(int(torch.randint(2**62, (1,), generator=self.generator)))
+        for seqs in self.plan(rng):
+            lengths = self.lengths[seqs]
+            steps = np.arange(lengths.max())
+            mask = steps < lengths[:, None]
+            pos = np.where(mask, self.offsets[seqs][:, None] + steps, 0)
+            rows = self.rows[pos]  # (B, L); padded positions point at a real row and are masked below
+            mask_t = torch.from_numpy(mask).to(self.device)
+
+            xb = self.X[torch.from_numpy(rows).to(self.device)]
+            if self.mean is not None:
+                xb = (xb - self.mean) / self.scale
+            xb = xb.masked_fill(~mask_t[..., None], 0.0)
+            flat_rows = rows[mask]
+            yb = self.y[torch.from_numpy(flat_rows).to(self.device)]
+            yield flat_rows, PaddedBatch(xb, mask_t, len(flat_rows)), yb
+
+    def __iter__(self):
+        for _, xb, yb in self.batches_with_rows():
+            yield xb, yb
+
+def make_sequence_loader(X, y_shot, y_goal, offsets, batch_size=4096, shuffle=True, device=None, rows=None,
+                         scaler=None):
+    return SequenceBatchLoader(
+        X, y_shot, y_goal, offsets, batch_size=batch_size, shuffle=shuffle, device=device, rows=rows, scaler=scaler
     )
-    return DataLoader(ds, batch_size=batch_size, shuffle=shuffle, num_workers=0)
 
-def train_one_epoch(model, loader, optimizer, criterion, device):
+def _n_rows(loader) -> int | None:
+    if hasattr(loader, "n_rows"):
+        return loader.n_rows
+    data = getattr(loader, "dataset", None)
+    return len(data) if data is not None else None
+
+def _unpack(batch, device):
+    # TensorBatchLoader yields (xb, yb); a DataLoader over TensorDataset yields (xb, yb_shot, yb_goal)
+    if len(batch) == 2:
+        xb, yb = batch
+    else:
+        xb, yb_shot, yb_goal = batch
+        yb = torch.stack([yb_shot, yb_goal], dim=1)
+    return xb.to(device), yb.to(device)
+
+def _autocast(device, enabled: bool):
+    # bfloat16 autocast (matmuls in bf16, losses and reductions stay fp32); no-op when disabled
+    return torch.autocast(device_type=torch.device(device).type, dtype=torch.bfloat16, enabled=enabled)
+
+@traced("training.train_one_epoch", rows=lambda loss, model, loader, *args, **kwargs: _n_rows(loader))
+def train_one_epoch(model, loader, optimizer, criterion, device, autocast: bool = False):
+    """
+    One pass over loader; returns the mean per-event loss. autocast=True runs the forward
+    pass and loss under bfloat16 autocast (Config.TRAIN_BF16); gradients and the
+    optimizer step stay fp32.
+    """
     model.train()
     total_loss = 0.0
     n = 0
-    for xb, yb_shot, yb_goal in loader:
-        xb = xb.to(device)
-        yb = torch.stack([yb_shot, yb_goal], dim=1).to(device)
+    for batch in loader:
+        xb, yb = _unpack(batch, device)
 
         optimizer.zero_grad()
-        logits = model(xb)
-        loss = criterion(logits, yb)
+        with _autocast(device, autocast):
+            logits = model(xb)
+            loss = criterion(logits, yb)
         loss.backward()
         optimizer.step()
 
@@ -29,25 +213,35 @@ def train_one_epoch(model, loader, optimizer, criterion, device):
 
     return total_loss / max(n, 1)
 
+@traced("training.eval_one_epoch", rows=lambda out, model, loader, *args, **kwargs: _n_rows(loader))
 @torch.no_grad()
-def eval_one_epoch(model, loader, criterion, device):
+def eval_one_epoch(model, loader, criterion, device, metrics=None, autocast: bool = False):
+    """
+    Returns (loss, logits, y). With a StreamingMetrics in metrics, batches are accumulated
+    there instead of being kept, and logits / y are None (memory independent of dataset size).
+    autocast=True evaluates under bfloat16 autocast; logits are returned as float32.
+    """
     model.eval()
     total_loss = 0.0
     n = 0
     all_logits = []
     all_y = []
 
-    for xb, yb_shot, yb_goal in loader:
-        xb = xb.to(device)
-        yb = torch.stack([yb_shot, yb_goal], dim=1).to(device)
+    for batch in loader:
+        xb, yb = _unpack(batch, device)
 
-        logits = model(xb)
-        loss = criterion(logits, yb)
+        with _autocast(device, autocast):
+            logits = model(xb)
+            loss = criterion(logits, yb)
+        logits = logits.float()
 
         total_loss += loss.item() * xb.size(0)
         n += xb.size(0)
-        all_logits.append(logits.detach().cpu())
-        all_y.append(yb.detach().cpu())
+        if metrics is not None:
+            metrics.update(logits.detach().cpu().numpy(), yb.detach().cpu().numpy())
+        else:
+            all_logits.append(logits.detach().cpu())
+            all_y.append(yb.detach().cpu())
 
     if all_logits:
         all_logits = torch.cat(all_logits, dim=0).numpy()
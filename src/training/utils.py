@@ -2,6 +2,7 @@ from __future__ import annotations
 import random
 import numpy as np
 import torch
+from sklearn.preprocessing import StandardScaler
 
 def set_seed(seed: int = 42):
     random.seed(seed)
@@ -11,3 +12,43 @@ def set_seed(seed: int = 42):
 
 def get_device():
     return torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+def fit_scaler(X, rows=None, chunk_rows: int = 262144):
+    """
+    StandardScaler fitted on X[rows] (all rows if None), reading chunk_rows rows at a
+    time so the selected rows are never copied out as a whole.
+    """
+    rows = np.arange(len(X)) if rows is None else np.asarray(rows)
+    scaler = StandardScaler()
+    for i in range(0, len(rows), chunk_rows):
+        scaler.partial_fit(np.asarray(X[rows[i:i + chunk_rows]], dtype=np.float64))
+    return scaler
+
+def set_threads(num_threads: int = 0, interop_threads: int = 0):
+    """
+    Intra-op / inter-op thread counts; 0 keeps the current value. The inter-op pool can
+    only be sized before PyTorch first uses it, later requests are ignored.
+    """
+    if num_threads > 0:
+        torch.set_num_threads(num_threads)
+    if interop_threads > 0 and interop_threads != torch.get_num_interop_threads():
+        try:
+            torch.set_num_interop_threads(interop_threads)
+        except RuntimeError:
+            pass
+
+def fast_training(model, criterion, cfg):
+    """
+    (model, criterion) to pass to train_one_epoch / eval_one_epoch for Config's fast CPU
+    mode: thread counts applied, both torch.compile'd with TRAIN_COMPILE. The compiled
+    modules share parameters with the originals, so optimizers, state_dict() and saving
+    keep using `model`. bfloat16 autocast is the loops' autocast=cfg.TRAIN_BF16.
+    """
+    set_threads(cfg.TORCH_THREADS, cfg.TORCH_INTEROP_THREADS)
+    if cfg.TRAIN_COMPILE:
+        # dropout masks from the eager RNG (same seed, same masks as an eager run); inductor's
+        # own generator is also slower on CPU. Passed per compile: compilation happens lazily
+        # on the first call, and the process-wide inductor config stays untouched
+        options = {"fallback_random": True}
+        model, criterion = torch.compile(model, options=options), torch.compile(criterion, options=options)
+    return model, criterion